@@ -4,9 +4,23 @@ from auth.jwt import verify_token
 from database import get_database
 from bson import ObjectId
 from crud.token_blacklist import is_token_blacklisted
+from config import settings
+from utils.cache import TTLCache
 
 security = HTTPBearer()
 
+# Resolved users by id, so polling endpoints skip the users lookup
+_user_cache = TTLCache(max_entries=settings.user_cache_max_entries, default_ttl=settings.user_cache_ttl)
+
+
+def invalidate_cached_user(user_id: str) -> None:
+    """Drop a user from the cache after logout or a change to the user"""
+    _user_cache.pop(user_id)
+
+
+def user_cache_stats() -> dict:
+    return _user_cache.stats()
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
@@ -15,6 +29,9 @@ async def get_current_user(
     try:
         token = credentials.credentials
         
+        # Verify the signature first so malformed tokens never reach the blacklist
+        user_id = verify_token(token)
+        
         # Check if token is blacklisted
         if await is_token_blacklisted(token):
             raise HTTPException(
@@ -22,10 +39,12 @@ async def get_current_user(
                 detail="Token has been revoked"
             )
         
-        user_id = verify_token(token)
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            return dict(cached)
         
         db = get_database()
-        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        user = await db.users.find_one({"_id": ObjectId(user_id)}, {"email": 1, "name": 1})
         
         if user is None:
             raise HTTPException(
@@ -33,11 +52,13 @@ async def get_current_user(
                 detail="User not found"
             )
         
-        return {
+        current_user = {
             "id": str(user["_id"]),
             "email": user["email"],
             "name": user["name"]
         }
+        _user_cache.set(user_id, current_user)
+        return dict(current_user)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,61 @@
+"""
+Argon2 password hashing off the event loop.
+
+Argon2 is deliberately slow, so hashing and verification run in a small
+dedicated thread pool (argon2-cffi releases the GIL while hashing). At most
+`password_hash_max_pending` operations may be running or queued; beyond that
+callers get PasswordHashingBusy, which the auth routes turn into a 503 so a
+login storm is shed instead of stalling every other request.
+"""
+
+from passlib.hash import argon2
+from concurrent.futures import ThreadPoolExecutor
+from config import settings
+from typing import Optional
+import asyncio
+
+hashing_executor: Optional[ThreadPoolExecutor] = None
+_pending = 0
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when too many hash operations are already queued"""
+
+
+def get_hashing_executor() -> ThreadPoolExecutor:
+    global hashing_executor
+    if hashing_executor is None:
+        hashing_executor = ThreadPoolExecutor(
+            max_workers=settings.password_hash_workers,
+            thread_name_prefix="argon2"
+        )
+    return hashing_executor
+
+
+def close_hashing_executor() -> None:
+    global hashing_executor
+    if hashing_executor is not None:
+        hashing_executor.shutdown(wait=False, cancel_futures=True)
+        hashing_executor = None
+
+
+async def _run(fn, *args):
+    global _pending
+    if _pending >= settings.password_hash_max_pending:
+        raise PasswordHashingBusy("Too many authentication requests, please retry shortly")
+
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_hashing_executor(), fn, *args)
+    finally:
+        _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    return await _run(argon2.hash, password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify password against hash"""
+    return await _run(argon2.verify, plain_password, hashed_password)
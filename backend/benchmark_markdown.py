@@ -0,0 +1,193 @@
+"""
+Benchmark for markdown stripping in CSV exports.
+
+Formats a synthetic export (pages x issues, with accepted sources) through
+format_issue_with_reason_for_csv, once with the previous pass-by-pass
+strip_markdown and once with the current tokenizer, and checks that both
+produce identical cells. Every issue has its own description, flagged text
+and reasoning; only source titles and snippets repeat, so the memo hit rate
+reported next to the timing comes from those.
+
+Usage:
+    python benchmark_markdown.py [page_count]
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+import re
+import time
+
+import utils.text_processing as text_processing
+
+
+# Previous implementation: thirteen sequential re.sub passes per string
+
+def legacy_strip_markdown(text: str) -> str:
+    if not text:
+        return ""
+    text = re.sub(r'```[\s\S]*?```', '', text)
+    text = re.sub(r'`([^`]+)`', r'\1', text)
+    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
+    text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', r'\1', text)
+    text = re.sub(r'\*\*([^\*]+)\*\*', r'\1', text)
+    text = re.sub(r'__([^_]+)__', r'\1', text)
+    text = re.sub(r'\*([^\*]+)\*', r'\1', text)
+    text = re.sub(r'_([^_]+)_', r'\1', text)
+    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^[\-\*_]{3,}$', '', text, flags=re.MULTILINE)
+    text = re.sub(r'^>\s+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'\n{3,}', '\n\n', text)
+    text = re.sub(r' {2,}', ' ', text)
+    return text.strip()
+
+
+# Issue fields are generated per issue, as Claude writes them: every
+# description, flagged text and reasoning in the export is different. Only
+# source titles and snippets repeat, since research keeps citing the same pages.
+
+METRICS = [
+    "30-year fixed mortgage rate", "median home price", "FHA loan limit",
+    "average closing cost", "conforming loan limit", "rent growth", "inventory level",
+]
+MONTHS = ["January", "March", "June", "September", "November"]
+
+DESCRIPTIONS = [
+    "Outdated {metric} for {place}",
+    "**Stale {metric}** in section {section} on {place}",
+    "The {place} page cites *{year}* {metric} figures as current",
+    "## Outdated {metric}\nSection {section} describes {place} data from {year}.",
+    "{metric} in the {place} table is from {month} {year}",
+]
+
+FLAGGED_TEXTS = [
+    "According to {year} data, the {metric} in {place} was {value}%",
+    "The report from {month} {day}, {year} shows the {metric} at **{value}%**.",
+    "In Q{quarter} {year}, the {metric} for {place} rose by {value}%.",
+    "See the [{year} {metric} report](https://example.com/{place_slug}-{year}) for details",
+    "The {metric} has been rising since mid {year} across {place}.",
+]
+
+REASONINGS = [
+    "**Found Date:** {month} {year} ({place})\n**Current Date:** October 2026\n**Age:** {age} months\n"
+    "**Threshold:** 12 months\n**Verdict:** STALE. Confidence: {confidence}%",
+    "The {metric} is presented as current but comes from a *{year}* survey of {place}.\n\n\n"
+    "A newer edition was published in 2026. Confidence: {confidence}%",
+    "### Evidence\n> In Q{quarter} {year}, the {metric} for {place} rose by {value}%.\n\n"
+    "- Found date: Q{quarter} {year}\n- Age: {age} months\n- Confidence: {confidence}%",
+    "The figure `{value}%` matches the [{place} index](https://example.com/{place_slug}) "
+    "for {year},  which has since changed (section {section}).",
+]
+
+PLACES = ["Austin", "Denver", "Phoenix", "Atlanta", "Tampa", "Raleigh", "Boise", "Nashville"]
+
+
+def issue_text(template: str, rng: random.Random, number: int) -> str:
+    """Fill a template; the issue number in the place name keeps every text unique"""
+    place = f"{rng.choice(PLACES)} district {number}"
+    year = rng.randint(2015, 2024)
+    return template.format(
+        metric=rng.choice(METRICS),
+        place=place,
+        place_slug=place.lower().replace(" ", "-"),
+        section=rng.randint(1, 40),
+        year=year,
+        month=rng.choice(MONTHS),
+        day=rng.randint(1, 28),
+        quarter=rng.randint(1, 4),
+        value=round(rng.uniform(0.5, 9.5), 2),
+        age=(2026 - year) * 12 + rng.randint(0, 11),
+        confidence=rng.randint(70, 99),
+    )
+
+
+SOURCES = [
+    ("Primary Mortgage Market Survey", "https://www.freddiemac.com/pmms", "2026-10-09"),
+    ("**Mortgage Rates** - Federal Reserve Economic Data", "https://fred.stlouisfed.org/series/MORTGAGE30US", ""),
+    ("Housing Market Report Q3 2026", "https://example.com/housing-q3-2026", "2026-09-30"),
+    ("[Census] New Residential Sales", "https://www.census.gov/construction/nrs", "2026-10-01"),
+]
+
+SNIPPETS = [
+    "The 30-year fixed-rate mortgage averaged 6.3% as of October 9, 2026.",
+    "Rates fell for the *third* consecutive week.",
+    "Seasonally adjusted annual rate of 676,000 in September 2026.",
+]
+
+
+def build_export(page_count: int, seed: int = 11) -> list:
+    """Issue dicts for page_count pages, as the CSV export formats them"""
+    rng = random.Random(seed)
+    issues = []
+    for _ in range(page_count):
+        for _ in range(rng.randint(2, 12)):
+            number = len(issues)
+            sources = []
+            for title, url, pub_date in rng.sample(SOURCES, rng.randint(0, 3)):
+                sources.append({
+                    "title": title,
+                    "url": url,
+                    "snippet": rng.choice(SNIPPETS),
+                    "publicationDate": pub_date,
+                    "isAccepted": rng.random() < 0.7,
+                })
+            issues.append({
+                "description": issue_text(rng.choice(DESCRIPTIONS), rng, number),
+                "flaggedText": issue_text(rng.choice(FLAGGED_TEXTS), rng, number),
+                "reasoning": issue_text(rng.choice(REASONINGS), rng, number),
+                "suggestedSources": sources,
+            })
+    return issues
+
+
+def format_all(issues: list, strip) -> list:
+    original = text_processing.strip_markdown
+    text_processing.strip_markdown = strip
+    try:
+        return [text_processing.format_issue_with_reason_for_csv(issue) for issue in issues]
+    finally:
+        text_processing.strip_markdown = original
+
+
+def time_it(fn, repeat: int = 3) -> tuple:
+    """Best of repeat runs, and the memo hit rate of the last one"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        # Each export starts with a cold memo
+        text_processing._strip_memo.cache_clear()
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    memo = text_processing._strip_memo.cache_info()
+    lookups = memo.hits + memo.misses
+    return best, result, memo.hits / lookups if lookups else 0.0
+
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    issues = build_export(page_count)
+
+    legacy_time, legacy_cells, _ = time_it(lambda: format_all(issues, legacy_strip_markdown))
+    tokenizer_time, tokenizer_cells, _ = time_it(lambda: format_all(issues, text_processing._strip))
+    current_time, current_cells, hit_rate = time_it(lambda: format_all(issues, text_processing.strip_markdown))
+
+    mismatches = sum(
+        1 for a, b, c in zip(legacy_cells, tokenizer_cells, current_cells) if not a == b == c
+    )
+
+    print(f"\n=== Markdown stripping benchmark ({page_count} pages, {len(issues)} issue cells) ===")
+    print(f"Sequential passes (legacy): {legacy_time * 1000:8.1f} ms  ({len(issues) / legacy_time:,.0f} cells/s)")
+    print(f"Tokenizer only:             {tokenizer_time * 1000:8.1f} ms  ({len(issues) / tokenizer_time:,.0f} cells/s)")
+    print(f"Tokenizer + memo:           {current_time * 1000:8.1f} ms  ({len(issues) / current_time:,.0f} cells/s)"
+          f"  memo hit rate {hit_rate:.1%}")
+    print(f"Speedup: {legacy_time / tokenizer_time:.2f}x without memo, {legacy_time / current_time:.2f}x with memo")
+    print(f"Cell mismatches: {mismatches}")
+
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,443 @@
+"""
+Offline end-to-end benchmark for the analysis backend.
+
+Replaces Firecrawl, Claude and Perplexity with local stand-ins (configurable
+latency, 5xx error rate and 429 rate) registered in services.clients, and
+runs against mongomock-motor or a local MongoDB. For each batch size it
+measures:
+
+  pipeline    process_analysis over N URLs (latency = per-URL total from the
+              run profile)
+  export      GET /runs/{id}/export as CSV (latency = per request)
+  issues      GET /issues paged with cursors (latency = per page)
+  research    POST .../research for up to 100 issues (latency = per issue)
+  validators  validate_issues on N simulated Claude responses (per call)
+
+and reports throughput with p50/p99 latency. No network access is needed.
+Other settings (DETECTION_CONCURRENCY, FIRECRAWL_CONCURRENCY, ...) are read
+from the environment as usual; provider rate ceilings are lifted unless
+--provider-rps is given.
+
+Usage:
+    python benchmark_pipeline.py [--sizes 1,10,100,1000,10000]
+        [--scrape-ms 20] [--llm-ms 50] [--search-ms 30]
+        [--error-rate 0.0] [--throttle-rate 0.0] [--provider-rps N]
+        [--mongodb-uri mongodb://localhost:27017] [--json results.json]
+"""
+
+import os
+import sys
+sys.path.append('.')
+
+# Dummy credentials: nothing leaves the process
+for name in ("JWT_SECRET", "CLAUDE_API_KEY", "FIRECRAWL_API_KEY", "PERPLEXITY_API_KEY"):
+    os.environ.setdefault(name, "benchmark")
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import zlib
+from datetime import datetime
+from types import SimpleNamespace
+
+import httpx
+from bson import ObjectId
+
+from config import settings
+import database
+from services import clients
+
+BENCHMARK_DB = "updateq_benchmark"
+RESEARCH_ISSUES = 100
+EXPORT_REPEATS = 5
+ISSUES_PER_RESPONSE = 5
+
+DOMAIN_CONTEXT = {
+    "description": "Mortgage and housing market guides",
+    "entityTypes": "rates, prices, regulations",
+    "stalenessRules": "Rates older than 12 months are stale"
+}
+
+VALID_ISSUE = {
+    "description": "Outdated mortgage rate",
+    "flaggedText": "According to November 2023 data, mortgage rates averaged 7.2%",
+    "reasoning": "Found Date: November 2023, Current Date: October 2026, Age: 35 months, "
+                 "Threshold: 12 months, Verdict: STALE. Confidence: 95%"
+}
+REJECTED_ISSUE = {
+    "description": "Heading flagged",
+    "flaggedText": "Current Rates",
+    "reasoning": "This section may be outdated."
+}
+
+PARAGRAPHS = [
+    "In {year}, the average 30-year fixed mortgage rate was {rate}% according to the annual survey.",
+    "Home prices rose {rate}% year over year as of Q{quarter} {year}, led by the Sun Belt metros.",
+    "Most lenders require a minimum credit score of 620 for a conventional loan.",
+    "FHA loans allow down payments as low as 3.5% for qualified borrowers.",
+    "As of {month} {year}, the conforming loan limit for single-family homes was ${limit},000.",
+    "Closing costs typically run between 2% and 5% of the purchase price.",
+]
+MONTHS = ["January", "March", "June", "September", "November"]
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def page_markdown(url: str, chars: int) -> str:
+    """Deterministic page for a URL, with dated paragraphs for the pre-filter"""
+    rng = random.Random(zlib.crc32(url.encode()))
+    parts = [f"# Guide for {url}"]
+    size = len(parts[0])
+    section = 1
+    while size < chars:
+        if rng.random() < 0.2:
+            parts.append(f"## Section {section}")
+            section += 1
+        parts.append(rng.choice(PARAGRAPHS).format(
+            year=rng.randint(2019, 2026),
+            rate=round(rng.uniform(2, 8), 1),
+            quarter=rng.randint(1, 4),
+            month=rng.choice(MONTHS),
+            limit=rng.randint(500, 800)
+        ))
+        size += len(parts[-1]) + 2
+    return "\n\n".join(parts)
+
+
+class FakeProviderError(Exception):
+    """Upstream error shaped like the SDK errors (status_code, response.headers)"""
+
+    def __init__(self, provider: str, status_code: int, retry_after: float = None):
+        super().__init__(f"{provider} returned HTTP {status_code}")
+        self.status_code = status_code
+        headers = {"retry-after": str(retry_after)} if retry_after else {}
+        self.response = SimpleNamespace(status_code=status_code, headers=headers)
+
+
+class FakeProvider:
+    """Latency and failure model shared by the stand-ins"""
+
+    def __init__(self, name: str, latency_ms: float, error_rate: float, throttle_rate: float, seed: int):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    def latency(self) -> float:
+        # Log-normal around the median, like real API latency
+        return self.latency_ms / 1000 * math.exp(self.rng.gauss(0, 0.5))
+
+    def failure(self) -> int:
+        """HTTP status to fail this call with, or 0"""
+        self.calls += 1
+        roll = self.rng.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return 0
+
+
+class FakeFirecrawl:
+    """Stand-in for FirecrawlApp; scrape() blocks like the real SDK"""
+
+    def __init__(self, provider: FakeProvider, page_chars: int):
+        self.provider = provider
+        self.page_chars = page_chars
+
+    def scrape(self, url: str, **options):
+        time.sleep(self.provider.latency())
+        status_code = self.provider.failure()
+        if status_code:
+            raise FakeProviderError("firecrawl", status_code, 0.05 if status_code == 429 else None)
+        return SimpleNamespace(
+            markdown=page_markdown(url, self.page_chars),
+            html="",
+            metadata={"title": f"Guide for {url}", "description": "Benchmark page"}
+        )
+
+
+class FakeClaude:
+    """Stand-in for AsyncAnthropic: client.messages.create(...)"""
+
+    def __init__(self, provider: FakeProvider):
+        self.provider = provider
+        self.messages = self
+
+    async def create(self, model: str, max_tokens: int, messages: list):
+        await asyncio.sleep(self.provider.latency())
+        status_code = self.provider.failure()
+        if status_code:
+            raise FakeProviderError("claude", status_code, 0.05 if status_code == 429 else None)
+
+        prompt = messages[0]["content"]
+        if max_tokens <= 100:
+            # Research query generation
+            text = "current 30-year fixed mortgage rates October 2026"
+        else:
+            count = zlib.crc32(prompt.encode()) % 4
+            issues = [VALID_ISSUE if i % 3 else REJECTED_ISSUE for i in range(count)]
+            text = "Here are the stale items I found:\n" + json.dumps(issues)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(input_tokens=len(prompt) // 4, output_tokens=len(text) // 4)
+        )
+
+    async def close(self):
+        pass
+
+
+def fake_perplexity_client(provider: FakeProvider) -> httpx.AsyncClient:
+    """httpx client whose transport answers like Perplexity's chat completions"""
+    sources = json.dumps([
+        {
+            "url": f"https://www.example.gov/rates/{i}",
+            "title": f"Weekly mortgage rate survey {i}",
+            "snippet": "The 30-year fixed-rate mortgage averaged 6.3% as of October 9, 2026.",
+            "date": "2026-10-09",
+            "confidence": "High"
+        }
+        for i in range(3)
+    ])
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(provider.latency())
+        status_code = provider.failure()
+        if status_code == 429:
+            return httpx.Response(429, headers={"Retry-After": "0.05"}, request=request)
+        if status_code:
+            return httpx.Response(status_code, request=request)
+        return httpx.Response(200, json={
+            "choices": [{"message": {"content": sources}}],
+            "citations": [f"https://www.example.gov/rates/{i}" for i in range(3)],
+            "usage": {"prompt_tokens": 400, "completion_tokens": 250}
+        }, request=request)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def install_fakes(args) -> dict:
+    providers = {
+        "firecrawl": FakeProvider("firecrawl", args.scrape_ms, args.error_rate, args.throttle_rate, 1),
+        "claude": FakeProvider("claude", args.llm_ms, args.error_rate, args.throttle_rate, 2),
+        "perplexity": FakeProvider("perplexity", args.search_ms, args.error_rate, args.throttle_rate, 3),
+    }
+    clients.firecrawl_app = FakeFirecrawl(providers["firecrawl"], args.page_chars)
+    clients.llm_client = FakeClaude(providers["claude"])
+    clients.http_client = fake_perplexity_client(providers["perplexity"])
+    return providers
+
+
+async def connect(mongodb_uri: str) -> None:
+    if mongodb_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongodb_uri)
+        await client.drop_database(BENCHMARK_DB)
+    else:
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("Install mongomock-motor or pass --mongodb-uri for a local MongoDB")
+        client = AsyncMongoMockClient()
+    database.client = client
+    database.db = client[BENCHMARK_DB]
+
+    from indexes import ensure_indexes
+    await ensure_indexes()
+
+
+def report(scenario: str, size: int, items: int, seconds: float, latencies: list) -> dict:
+    return {
+        "scenario": scenario,
+        "size": size,
+        "items": items,
+        "seconds": round(seconds, 3),
+        "throughput": round(items / seconds, 1) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+
+async def bench_pipeline(size: int, user_id: str) -> tuple:
+    from services.pipeline import process_analysis
+
+    db = database.get_database()
+    urls = [f"https://bench.example.com/{size}/page-{i}" for i in range(size)]
+    run = await db.analysis_runs.insert_one({
+        "user_id": ObjectId(user_id),
+        "timestamp": datetime.utcnow(),
+        "url_count": size,
+        "completed_count": 0,
+        "total_issues": 0,
+        "max_issue_count": 0,
+        "pending_jobs": 1,
+        "status": "processing",
+        "domain_context": DOMAIN_CONTEXT
+    })
+    run_id = str(run.inserted_id)
+
+    started = time.perf_counter()
+    await process_analysis(run_id, user_id, urls, DOMAIN_CONTEXT)
+    elapsed = time.perf_counter() - started
+
+    doc = await db.analysis_runs.find_one({"_id": run.inserted_id}, {"profile": 1, "status": 1})
+    latencies = [entry["total_ms"] / 1000 for entry in doc.get("profile", [])]
+    return run_id, report("pipeline", size, size, elapsed, latencies)
+
+
+async def bench_export(size: int, run_id: str, api: httpx.AsyncClient) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(EXPORT_REPEATS):
+        request_started = time.perf_counter()
+        response = await api.get(f"/api/v1/analysis/runs/{run_id}/export")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - request_started)
+    return report("export", size, size * EXPORT_REPEATS, time.perf_counter() - started, latencies)
+
+
+async def bench_issues(size: int, run_id: str, api: httpx.AsyncClient) -> tuple:
+    latencies = []
+    issues = []
+    cursor = None
+    started = time.perf_counter()
+    while True:
+        params = {"runId": run_id, "limit": settings.issue_page_size}
+        if cursor:
+            params["cursor"] = cursor
+        request_started = time.perf_counter()
+        response = await api.get("/api/v1/analysis/issues", params=params)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - request_started)
+        page = response.json()
+        issues.extend(page["issues"])
+        cursor = page.get("nextCursor")
+        if not cursor:
+            break
+    return issues, report("issues", size, len(issues), time.perf_counter() - started, latencies)
+
+
+async def bench_research(size: int, run_id: str, issues: list, api: httpx.AsyncClient) -> dict:
+    selected = issues[:RESEARCH_ISSUES]
+    limit = asyncio.Semaphore(10)
+    latencies = []
+
+    async def research(issue: dict):
+        async with limit:
+            request_started = time.perf_counter()
+            response = await api.post(f"/api/v1/analysis/runs/{run_id}/issues/{issue['issue']['id']}/research")
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - request_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[research(issue) for issue in selected])
+    return report("research", size, len(selected), time.perf_counter() - started, latencies)
+
+
+def bench_validators(size: int) -> dict:
+    from services.detector import validate_issues
+
+    rng = random.Random(size)
+    responses = [
+        [dict(rng.choice((VALID_ISSUE, REJECTED_ISSUE))) for _ in range(ISSUES_PER_RESPONSE)]
+        for _ in range(size)
+    ]
+    latencies = []
+    started = time.perf_counter()
+    for raw in responses:
+        call_started = time.perf_counter()
+        validate_issues(raw)
+        latencies.append(time.perf_counter() - call_started)
+    return report("validators", size, size * ISSUES_PER_RESPONSE, time.perf_counter() - started, latencies)
+
+
+async def run(args) -> list:
+    sizes = [int(size) for size in args.sizes.split(",")]
+    settings.run_profile_max_urls = max(sizes)
+    if args.provider_rps:
+        rates = (args.provider_rps,) * 3
+    else:
+        rates = (1e6, 1e6, 1e6)
+    settings.claude_requests_per_second, settings.firecrawl_requests_per_second, \
+        settings.perplexity_requests_per_second = rates
+
+    await connect(args.mongodb_uri)
+    providers = install_fakes(args)
+
+    import main
+    from auth.dependencies import get_current_user
+
+    user_id = str(ObjectId())
+    main.app.dependency_overrides[get_current_user] = lambda: {"id": user_id, "email": "bench@example.com", "name": "Benchmark"}
+    api = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://benchmark", timeout=None)
+
+    results = []
+    try:
+        for size in sizes:
+            run_id, pipeline = await bench_pipeline(size, user_id)
+            issues, issue_paging = await bench_issues(size, run_id, api)
+            results += [
+                pipeline,
+                await bench_export(size, run_id, api),
+                issue_paging,
+                await bench_research(size, run_id, issues, api),
+                bench_validators(size),
+            ]
+            for result in results[-5:]:
+                print_result(result)
+    finally:
+        await api.aclose()
+        await clients.close_clients()
+        if args.mongodb_uri:
+            await database.client.drop_database(BENCHMARK_DB)
+
+    print("\nProvider calls: " + ", ".join(f"{name}={provider.calls}" for name, provider in providers.items()))
+    return results
+
+
+def print_result(result: dict) -> None:
+    p50 = f"{result['p50_ms']:9.2f}" if result["p50_ms"] is not None else "        -"
+    p99 = f"{result['p99_ms']:9.2f}" if result["p99_ms"] is not None else "        -"
+    throughput = f"{result['throughput']:12,.1f}" if result["throughput"] is not None else "           -"
+    print(f"{result['scenario']:11} {result['size']:6} {result['items']:8} {result['seconds']:9.3f}s {throughput}/s  p50 {p50} ms  p99 {p99} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1,10,100,1000,10000", help="Comma-separated batch sizes (URLs)")
+    parser.add_argument("--scrape-ms", type=float, default=20.0, help="Median Firecrawl latency")
+    parser.add_argument("--llm-ms", type=float, default=50.0, help="Median Claude latency")
+    parser.add_argument("--search-ms", type=float, default=30.0, help="Median Perplexity latency")
+    parser.add_argument("--page-chars", type=int, default=6000, help="Size of each scraped page")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of provider calls failing with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of provider calls failing with 429")
+    parser.add_argument("--provider-rps", type=float, default=None, help="Rate limiter ceiling per provider (default: unlimited)")
+    parser.add_argument("--mongodb-uri", default=None, help="Local MongoDB to use instead of mongomock-motor")
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    print(f"\n=== Offline pipeline benchmark (scrape {args.scrape_ms:g} ms, LLM {args.llm_ms:g} ms, "
+          f"search {args.search_ms:g} ms, errors {args.error_rate:g}, 429s {args.throttle_rate:g}) ===")
+    print(f"{'scenario':11} {'size':>6} {'items':>8} {'wall':>10} {'throughput':>14}")
+    results = asyncio.run(run(args))
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Micro-benchmark for the detector's issue validators.
+
+Runs is_heading_only, contains_temporal_marker, has_structured_evidence and
+extract_confidence_from_reasoning over a batch of synthetic candidate issues,
+compares them with the previous per-pattern implementations and checks that
+both return identical results.
+
+Usage:
+    python benchmark_validation.py [issue_count]
+"""
+
+import sys
+sys.path.append('.')
+
+import random
+import re
+import time
+
+from services.detector import (
+    is_heading_only,
+    contains_temporal_marker,
+    has_structured_evidence,
+    extract_confidence_from_reasoning
+)
+
+
+# Previous implementations: one re.match/re.search call per pattern string
+
+def legacy_is_heading_only(text: str) -> bool:
+    if not text or len(text.strip()) == 0:
+        return True
+    text = text.strip()
+    heading_patterns = [
+        r'^[A-Z][a-zA-Z\s\-]+$',
+        r'^#+\s+',
+        r'^[A-Z\s]+$',
+        r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',
+    ]
+    word_count = len(text.split())
+    if word_count <= 6:
+        for pattern in heading_patterns:
+            if re.match(pattern, text):
+                return True
+    if word_count <= 8 and not any(char in text for char in '.!?,;:'):
+        return True
+    return False
+
+
+def legacy_contains_temporal_marker(text: str) -> bool:
+    if not text:
+        return False
+    temporal_patterns = [
+        r'\b\d{4}\b',
+        r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}\b',
+        r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\.?\s+\d{1,2},?\s+\d{4}\b',
+        r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',
+        r'\b\d+\.?\d*%\b',
+        r'\b\d+\s+(months?|years?|days?|weeks?)\s+ago\b',
+        r'\b(Q[1-4]|quarter)\s+\d{4}\b',
+        r'\b(as of|since|from|until|through)\s+\d{4}\b',
+        r'\b(early|mid|late)\s+\d{4}\b',
+    ]
+    for pattern in temporal_patterns:
+        if re.search(pattern, text, re.IGNORECASE):
+            return True
+    return False
+
+
+def legacy_has_structured_evidence(reasoning: str) -> bool:
+    if not reasoning:
+        return False
+    required_elements = [r'Found Date:', r'Current Date:', r'Age:', r'Threshold:']
+    matches = sum(1 for elem in required_elements if re.search(elem, reasoning, re.IGNORECASE))
+    return matches >= 3
+
+
+def legacy_extract_confidence_from_reasoning(reasoning: str) -> float:
+    if not reasoning:
+        return 0.5
+    confidence_patterns = [
+        r'confidence[:\s]+(\d+)%',
+        r'(\d+)%\s+confident',
+        r'confidence[:\s]+(\d+\.\d+)',
+    ]
+    for pattern in confidence_patterns:
+        match = re.search(pattern, reasoning, re.IGNORECASE)
+        if match:
+            value = float(match.group(1))
+            if value > 1.0:
+                value = value / 100.0
+            return min(max(value, 0.0), 1.0)
+    high_confidence_phrases = ['explicit date', 'clearly states', 'specifically mentions', 'found date:']
+    medium_confidence_phrases = ['inferred', 'appears to', 'suggests', 'likely']
+    low_confidence_phrases = ['possibly', 'may be', 'might be', 'unclear', 'ambiguous']
+    reasoning_lower = reasoning.lower()
+    if any(phrase in reasoning_lower for phrase in high_confidence_phrases):
+        return 0.9
+    elif any(phrase in reasoning_lower for phrase in low_confidence_phrases):
+        return 0.4
+    elif any(phrase in reasoning_lower for phrase in medium_confidence_phrases):
+        return 0.6
+    return 0.5
+
+
+FLAGGED_TEXTS = [
+    "Home-Buying Loan Types",
+    "LOAN CATEGORIES",
+    "## Current Rates",
+    "According to 2023 data, interest rates were 6.5%",
+    "The report from November 21, 2023 shows declining rates.",
+    "In Q4 2024, mortgage applications increased by 15%.",
+    "Data from 3 months ago shows improvement",
+    "The report dated 12/15/2023 indicates a shift in lending.",
+    "Most lenders offer several types of fixed and adjustable loans, depending on your credit.",
+    "Prices have been rising since mid 2022 across most metro areas.",
+]
+
+REASONINGS = [
+    "Found Date: 2023, Current Date: December 2025, Age: 2 years, Threshold: 1 year, Verdict: STALE. Confidence: 95%",
+    "Found Date: November 2023. Current Date: December 2025. Age: 25 months. Verdict: STALE. Evidence type: EXPLICIT_DATE",
+    "This likely refers to older data and may be outdated.",
+    "The statistic appears to be from a prior year; 80% confident it is stale.",
+    "Found date: Q4 2024, Current date: Dec 2025, Threshold: 6 months. Confidence: 0.85",
+    "Content is current and should not be flagged.",
+    "The page clearly states rates from 2022 which is older than the threshold.",
+    "Possibly stale, unclear whether the figure was updated.",
+]
+
+
+def build_issues(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    return [
+        {
+            "flaggedText": rng.choice(FLAGGED_TEXTS),
+            "reasoning": rng.choice(REASONINGS) * rng.randint(1, 3),
+        }
+        for _ in range(count)
+    ]
+
+
+def validate_all(issues: list, heading, temporal, evidence, confidence) -> list:
+    return [
+        (
+            heading(issue["flaggedText"]),
+            temporal(issue["flaggedText"]),
+            evidence(issue["reasoning"]),
+            confidence(issue["reasoning"]),
+        )
+        for issue in issues
+    ]
+
+
+def time_it(fn, repeat: int = 3) -> tuple:
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    issues = build_issues(count)
+
+    legacy_time, legacy_results = time_it(lambda: validate_all(
+        issues,
+        legacy_is_heading_only,
+        legacy_contains_temporal_marker,
+        legacy_has_structured_evidence,
+        legacy_extract_confidence_from_reasoning,
+    ))
+    current_time, current_results = time_it(lambda: validate_all(
+        issues,
+        is_heading_only,
+        contains_temporal_marker,
+        has_structured_evidence,
+        extract_confidence_from_reasoning,
+    ))
+
+    mismatches = sum(1 for a, b in zip(legacy_results, current_results) if a != b)
+
+    print(f"\n=== Validator benchmark ({count} candidate issues) ===")
+    print(f"Per-pattern (legacy): {legacy_time * 1000:8.1f} ms  ({count / legacy_time:,.0f} issues/s)")
+    print(f"Compiled alternation: {current_time * 1000:8.1f} ms  ({count / current_time:,.0f} issues/s)")
+    print(f"Speedup: {legacy_time / current_time:.2f}x")
+    print(f"Result mismatches: {mismatches}")
+
+    return mismatches == 0
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
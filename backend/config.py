@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -14,11 +14,125 @@ class Settings(BaseSettings):
     perplexity_api_key: str
     playwright_timeout: int = 15000  # Kept for backward compatibility (not used)
 
+    # Analysis pipeline concurrency (per batch)
+    firecrawl_concurrency: int = 5
+    detection_concurrency: int = 3
+
+    # Shared upstream API clients (see services/clients.py)
+    llm_timeout: float = 60.0
+    llm_max_connections: int = 20
+    firecrawl_pool_size: int = 8
+    http_timeout: float = 30.0
+    http_max_connections: int = 20
+
+    # Adaptive per-provider rate limits and retries (see services/rate_limit.py)
+    claude_requests_per_second: float = 5.0  # Ceiling; 429s lower the live rate
+    firecrawl_requests_per_second: float = 2.0
+    perplexity_requests_per_second: float = 1.0
+    upstream_max_attempts: int = 5
+    upstream_backoff_base: float = 1.0
+    upstream_backoff_max: float = 30.0
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30.0
+
+    # Extraction cache (see services/extraction_cache.py)
+    extraction_cache_ttl: int = 86400
+    extraction_cache_domain_ttls: str = ""  # e.g. "news.example.com=3600,docs.example.com=604800"
+    extraction_cache_max_entries: int = 500
+    extraction_cache_max_bytes: int = 100_000_000
+
+    # Detection memoization (see services/detection_cache.py)
+    detection_cache_ttl: int = 86400
+    detection_cache_max_entries: int = 2000
+    detection_cache_bucket_days: int = 1
+
+    # Chunked detection (see services/chunking.py)
+    detection_chunk_chars: int = 8000
+    detection_chunk_overlap: int = 400
+    detection_chunk_concurrency: int = 4
+    detection_max_chunks: int = 40
+
+    # Only send paragraphs with temporal markers (plus neighbours) to Claude
+    detection_prefilter: bool = True
+    detection_prefilter_context: int = 1
+
+    # In-process token revocation caches (see crud/token_blacklist.py)
+    token_revocation_cache_ttl: float = 30.0
+    token_cache_max_entries: int = 10000
+
+    # Argon2 hashing pool (see auth/hashing.py)
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 32
+    password_hash_retry_after: int = 2
+
+    # Analysis job queue and workers (see crud/jobs.py and worker.py)
+    embedded_worker: bool = True  # Also run a worker inside the API process
+    worker_concurrency: int = 2  # Jobs run at once per worker
+    job_lease_seconds: int = 120
+    job_heartbeat_seconds: int = 30
+    job_poll_interval: float = 2.0
+    job_max_attempts: int = 3
+
+    # Bulk runs: sitemap / uploaded URL lists split into shards of jobs
+    bulk_max_urls: int = 50000
+    bulk_shard_size: int = 100
+    bulk_max_upload_bytes: int = 10_000_000
+    sitemap_max_bytes: int = 10_000_000  # Per sitemap file as downloaded
+    sitemap_max_uncompressed_bytes: int = 50_000_000  # Per sitemap after gunzip (the protocol's limit)
+    sitemap_timeout: float = 60.0  # Whole crawl, including nested sitemaps
+
+    # Results returned per GET /runs/{id} call (see nextOffset)
+    run_results_page_size: int = 500
+    run_results_page_max: int = 2000
+
+    # Run progress event stream (see services/run_events.py)
+    run_events_poll_interval: float = 1.0
+    run_events_lag_seconds: float = 5.0
+    run_events_keepalive_seconds: float = 15.0
+    run_events_replay_batch: int = 500  # Stored results replayed per query on connect
+
+    # Resolved users in get_current_user (see auth/dependencies.py)
+    user_cache_ttl: float = 60.0
+    user_cache_max_entries: int = 10000
+
+    # Per-run performance profile: slowest URLs kept on the run document
+    run_profile_max_urls: int = 200
+
+    # Page size for the cross-run issue query
+    issue_page_size: int = 100
+    issue_page_max: int = 500
+
+    # Page size for the runs list
+    run_page_size: int = 50
+    run_page_max: int = 200
+
+    # Logging and metrics (see utils/telemetry.py)
+    log_level: str = "INFO"
+    log_levels: str = ""  # Per-logger overrides, e.g. "services.detector=DEBUG,worker=WARNING"
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.cors_origins.split(",")]
 
+    @property
+    def extraction_cache_domain_ttl_map(self) -> Dict[str, int]:
+        ttls = {}
+        for entry in self.extraction_cache_domain_ttls.split(","):
+            if "=" in entry:
+                domain, ttl = entry.split("=", 1)
+                ttls[domain.strip().lower()] = int(ttl)
+        return ttls
+
+    @property
+    def log_level_map(self) -> Dict[str, str]:
+        levels = {}
+        for entry in self.log_levels.split(","):
+            if "=" in entry:
+                name, level = entry.split("=", 1)
+                levels[name.strip()] = level.strip().upper()
+        return levels
+
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
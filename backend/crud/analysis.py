@@ -0,0 +1,504 @@
+"""
+Storage for analysis results and issues.
+
+A run document in `analysis_runs` only holds run-level fields. Each URL result
+is its own document in `analysis_results` and each issue its own document in
+`analysis_issues`, so editing one issue is a targeted update whose cost does not
+depend on the size of the run.
+"""
+
+from database import get_database
+from utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from pymongo import ReturnDocument, UpdateOne
+from bson import ObjectId
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+# Storage-only keys that are not part of the API shape of a result or issue
+RESULT_STORAGE_FIELDS = ("_id", "run_id", "user_id", "position", "completed_at")
+ISSUE_STORAGE_FIELDS = (
+    "_id", "run_id", "user_id", "result_id", "result_position", "position", "url", "page_title", "created_at"
+)
+
+# Fields of a run document shown in the runs list; everything else stays on the server
+RUN_LIST_FIELDS = {
+    "timestamp": 1,
+    "url_count": 1,
+    "completed_count": 1,
+    "total_issues": 1,
+    "status": 1,
+    "domain_context.description": 1
+}
+# Issue list pages need the API shape plus run id, URL and page title
+ISSUE_LIST_EXCLUDED = {"user_id": 0, "result_id": 0, "result_position": 0, "position": 0}
+
+# Startup migrations, recorded in `migrations` once they have run to completion
+EMBEDDED_RESULTS_MIGRATION = "embedded_results"
+ISSUE_CREATED_AT_MIGRATION = "issue_created_at"
+
+
+def result_from_doc(doc: dict) -> dict:
+    return {k: v for k, v in doc.items() if k not in RESULT_STORAGE_FIELDS}
+
+
+def issue_from_doc(doc: dict) -> dict:
+    return {k: v for k, v in doc.items() if k not in ISSUE_STORAGE_FIELDS}
+
+
+def _result_doc(run_id: ObjectId, user_id: ObjectId, position: int, result: dict) -> dict:
+    doc = {k: v for k, v in result.items() if k != "issues"}
+    doc.update({"run_id": run_id, "user_id": user_id, "position": position})
+    return doc
+
+
+def _issue_doc(run_id: ObjectId, user_id: ObjectId, result_id: ObjectId, result_position: int,
+               result: dict, position: int, issue: dict, created_at: datetime) -> dict:
+    doc = dict(issue)
+    doc.update({
+        "run_id": run_id,
+        "user_id": user_id,
+        "result_id": result_id,
+        "result_position": result_position,
+        "position": position,
+        "url": result.get("url", ""),
+        "page_title": result.get("title", ""),
+        # When the issue was detected; not the _id time, which migrated issues reset
+        "created_at": created_at
+    })
+    return doc
+
+
+async def insert_results(run_id: str, user_id: str, results: List[dict], start_position: int = 0) -> None:
+    """Store URL results (with their issues) for a run, starting at start_position"""
+    if not results:
+        return
+
+    db = get_database()
+    run_oid = ObjectId(run_id)
+    user_oid = ObjectId(user_id)
+
+    result_docs = [
+        _result_doc(run_oid, user_oid, start_position + i, result)
+        for i, result in enumerate(results)
+    ]
+    inserted = await db.analysis_results.insert_many(result_docs)
+
+    now = datetime.utcnow()
+    issue_docs = []
+    for result_id, doc, result in zip(inserted.inserted_ids, result_docs, results):
+        for position, issue in enumerate(result.get("issues", [])):
+            issue_docs.append(
+                _issue_doc(run_oid, user_oid, result_id, doc["position"], result, position, issue, now)
+            )
+    if issue_docs:
+        await db.analysis_issues.insert_many(issue_docs)
+
+
+async def insert_result(run_id: str, user_id: str, position: int, result: dict) -> None:
+    """
+    Store one completed URL result. Issues are written before the result
+    document, so a stored result always has all of its issues; issues left
+    behind by an interrupted write are removed by discard_partial_results.
+    """
+    db = get_database()
+    run_oid = ObjectId(run_id)
+    user_oid = ObjectId(user_id)
+
+    doc = _result_doc(run_oid, user_oid, position, result)
+    doc["_id"] = ObjectId()
+
+    now = datetime.utcnow()
+    issue_docs = [
+        _issue_doc(run_oid, user_oid, doc["_id"], position, result, i, issue, now)
+        for i, issue in enumerate(result.get("issues", []))
+    ]
+    if issue_docs:
+        await db.analysis_issues.insert_many(issue_docs)
+    # Stamped just before the write that makes the result visible to pollers
+    doc["completed_at"] = datetime.utcnow()
+    await db.analysis_results.insert_one(doc)
+
+
+async def stored_positions(run_id: str, start: int = 0, end: Optional[int] = None) -> set:
+    """Positions in [start, end) of the URL results already stored for a run"""
+    db = get_database()
+    position = {"$gte": start}
+    if end is not None:
+        position["$lt"] = end
+    cursor = db.analysis_results.find({"run_id": ObjectId(run_id), "position": position}, {"position": 1})
+    return {doc["position"] async for doc in cursor}
+
+
+async def discard_partial_results(run_id: str, keep_positions: set, start: int = 0, end: Optional[int] = None) -> None:
+    """Remove issues in [start, end) whose result document was never written"""
+    db = get_database()
+    position = {"$gte": start, "$nin": list(keep_positions)}
+    if end is not None:
+        position["$lt"] = end
+    await db.analysis_issues.delete_many({
+        "run_id": ObjectId(run_id),
+        "result_position": position
+    })
+
+
+async def count_run_results(run_id: str) -> int:
+    db = get_database()
+    return await db.analysis_results.count_documents({"run_id": ObjectId(run_id)})
+
+
+async def count_run_issues(run_id: str) -> int:
+    db = get_database()
+    return await db.analysis_issues.count_documents({"run_id": ObjectId(run_id)})
+
+
+async def iter_run_results(run_id: str, urls: Optional[List[str]] = None,
+                           start: int = 0, end: Optional[int] = None) -> AsyncIterator[dict]:
+    """
+    Yield a run's results in input order, each with its issues nested,
+    optionally only positions start..end. Merge-joins two sorted cursors, so
+    memory use does not grow with the run.
+    """
+    db = get_database()
+    run_oid = ObjectId(run_id)
+
+    result_filter = {"run_id": run_oid}
+    issue_filter = {"run_id": run_oid}
+    if urls is not None:
+        result_filter["url"] = {"$in": urls}
+        issue_filter["url"] = {"$in": urls}
+    if start or end is not None:
+        positions = {"$gte": start}
+        if end is not None:
+            positions["$lt"] = end
+        result_filter["position"] = positions
+        issue_filter["result_position"] = positions
+
+    issues = db.analysis_issues.find(issue_filter).sort([("result_position", 1), ("position", 1)])
+    pending_issue = await anext(issues, None)
+
+    async for doc in db.analysis_results.find(result_filter).sort("position", 1):
+        result = result_from_doc(doc)
+        result["issues"] = []
+        # Skip issues of results that are not stored (yet), then collect this one's
+        while pending_issue is not None and pending_issue["result_position"] < doc["position"]:
+            pending_issue = await anext(issues, None)
+        while pending_issue is not None and pending_issue["result_position"] == doc["position"]:
+            result["issues"].append(issue_from_doc(pending_issue))
+            pending_issue = await anext(issues, None)
+        yield result
+
+    await issues.close()
+
+
+async def get_run_results(run_id: str, urls: Optional[List[str]] = None,
+                          start: int = 0, end: Optional[int] = None) -> List[dict]:
+    """Results for a run in input order, each with its issues nested as before"""
+    return [result async for result in iter_run_results(run_id, urls, start, end)]
+
+
+async def max_issue_count(run_id: str, urls: Optional[List[str]] = None) -> int:
+    """Largest number of issues on any one result of a run (optionally of some URLs)"""
+    db = get_database()
+    match = {"run_id": ObjectId(run_id)}
+    if urls is not None:
+        match["url"] = {"$in": urls}
+    cursor = db.analysis_issues.aggregate([
+        {"$match": match},
+        {"$group": {"_id": "$result_position", "count": {"$sum": 1}}},
+        {"$group": {"_id": None, "max": {"$max": "$count"}}}
+    ])
+    async for doc in cursor:
+        return doc["max"] or 0
+    return 0
+
+
+async def find_issue(run_id: str, user_id: str, issue_id: str) -> Optional[dict]:
+    db = get_database()
+    return await db.analysis_issues.find_one({
+        "run_id": ObjectId(run_id),
+        "user_id": ObjectId(user_id),
+        "id": issue_id
+    })
+
+
+async def update_issue_fields(run_id: str, user_id: str, issue_id: str, fields: dict,
+                              stamp_assigned_at: bool = False) -> Optional[dict]:
+    """
+    Apply a partial update to one issue and return it, or None if not found.
+    stamp_assigned_at sets assignedAt only if the issue has never been assigned.
+    """
+    db = get_database()
+    issue_filter = {
+        "run_id": ObjectId(run_id),
+        "user_id": ObjectId(user_id),
+        "id": issue_id
+    }
+
+    if stamp_assigned_at:
+        # Matches a missing or null assignedAt, so the first assignment time is kept
+        await db.analysis_issues.update_one(
+            {**issue_filter, "assignedAt": None},
+            {"$set": {"assignedAt": datetime.utcnow()}}
+        )
+
+    if not fields:
+        return await db.analysis_issues.find_one(issue_filter)
+
+    return await db.analysis_issues.find_one_and_update(
+        issue_filter,
+        {"$set": fields},
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def set_issue_sources(run_id: str, user_id: str, issue_id: str, sources: List[dict]) -> bool:
+    db = get_database()
+    result = await db.analysis_issues.update_one(
+        {
+            "run_id": ObjectId(run_id),
+            "user_id": ObjectId(user_id),
+            "id": issue_id
+        },
+        {"$set": {"suggestedSources": sources}}
+    )
+    return result.matched_count > 0
+
+
+async def query_issues(
+    user_id: str,
+    status: Optional[List[str]] = None,
+    exclude_status: Optional[List[str]] = None,
+    assigned_to: Optional[str] = None,
+    due_after: Optional[datetime] = None,
+    due_before: Optional[datetime] = None,
+    url: Optional[str] = None,
+    run_id: Optional[str] = None,
+    sort_field: str = "_id",
+    direction: int = 1,
+    limit: int = 100,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of a user's issues across runs, sorted on (sort_field, _id).
+    Returns the issue documents and the cursor for the next page, if any.
+    Raises ValueError for a malformed cursor.
+    """
+    db = get_database()
+
+    query = {"user_id": ObjectId(user_id)}
+    if status and not exclude_status:
+        query["status"] = status[0] if len(status) == 1 else {"$in": status}
+    elif status or exclude_status:
+        # $nin also matches issues without a status
+        query["status"] = {"$in": status} if status else {}
+        query["status"]["$nin"] = exclude_status
+    if assigned_to is not None:
+        query["assignedTo"] = assigned_to
+    if due_after is not None or due_before is not None:
+        due = {}
+        if due_after is not None:
+            due["$gte"] = due_after
+        if due_before is not None:
+            due["$lt"] = due_before
+        query["dueDate"] = due
+    if url is not None:
+        query["url"] = url
+    if run_id is not None:
+        query["run_id"] = ObjectId(run_id)
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        query = {"$and": [query, keyset_filter(sort_field, direction, value, last_id)]}
+
+    sort = [("_id", direction)] if sort_field == "_id" else [(sort_field, direction), ("_id", direction)]
+    docs = await db.analysis_issues.find(query, ISSUE_LIST_EXCLUDED).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+    return docs, next_cursor
+
+
+async def summarize_issues(user_id: str) -> dict:
+    """
+    Issue counts for the dashboard, computed in MongoDB: by triage state
+    (unassigned, assigned, researched, resolved) and per assigned writer.
+    """
+    db = get_database()
+    pipeline = [
+        {"$match": {"user_id": ObjectId(user_id)}},
+        {"$group": {
+            "_id": {
+                "assignedTo": "$assignedTo",
+                "resolved": {"$eq": ["$status", "resolved"]},
+                "researched": {"$gt": [{"$size": {"$ifNull": ["$suggestedSources", []]}}, 0]}
+            },
+            "count": {"$sum": 1}
+        }}
+    ]
+
+    summary = {"unassigned": 0, "assigned": 0, "researched": 0, "resolved": 0, "total": 0, "writers": {}}
+    async for group in db.analysis_issues.aggregate(pipeline):
+        key, count = group["_id"], group["count"]
+        summary["total"] += count
+        if key["resolved"]:
+            summary["resolved"] += count
+        elif key["researched"]:
+            summary["researched"] += count
+        elif key.get("assignedTo"):
+            summary["assigned"] += count
+        else:
+            summary["unassigned"] += count
+
+        if key.get("assignedTo"):
+            writer = summary["writers"].setdefault(key["assignedTo"], {"active": 0, "completed": 0})
+            writer["completed" if key["resolved"] else "active"] += count
+    return summary
+
+
+async def summarize_runs(user_id: str) -> dict:
+    """Run count and URL / issue totals across all of a user's runs"""
+    db = get_database()
+    pipeline = [
+        {"$match": {"user_id": ObjectId(user_id)}},
+        {"$group": {
+            "_id": None,
+            "runs": {"$sum": 1},
+            "urls": {"$sum": "$url_count"},
+            "issues": {"$sum": "$total_issues"}
+        }}
+    ]
+    totals = await db.analysis_runs.aggregate(pipeline).to_list(length=1)
+    if not totals:
+        return {"runs": 0, "urls": 0, "issues": 0}
+    return {key: totals[0][key] for key in ("runs", "urls", "issues")}
+
+
+async def query_runs(
+    user_id: str,
+    limit: int = 50,
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of a user's runs, newest first, with only the RUN_LIST_FIELDS.
+    Returns the run documents and the cursor for the next page, if any.
+    Raises ValueError for a malformed cursor.
+    """
+    db = get_database()
+
+    query = {"user_id": ObjectId(user_id)}
+    if cursor:
+        value, last_id = decode_cursor(cursor)
+        query = {"$and": [query, keyset_filter("timestamp", -1, value, last_id)]}
+
+    sort = [("timestamp", -1), ("_id", -1)]
+    docs = await db.analysis_runs.find(query, RUN_LIST_FIELDS).sort(sort).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], "timestamp")
+    return docs, next_cursor
+
+
+async def delete_run_results(run_id: str) -> None:
+    db = get_database()
+    run_oid = ObjectId(run_id)
+    await db.analysis_issues.delete_many({"run_id": run_oid})
+    await db.analysis_results.delete_many({"run_id": run_oid})
+
+
+async def _migration_done(name: str) -> bool:
+    db = get_database()
+    return await db.migrations.find_one({"_id": name}, {"_id": 1}) is not None
+
+
+async def _record_migration(name: str) -> None:
+    db = get_database()
+    await db.migrations.update_one(
+        {"_id": name},
+        {"$setOnInsert": {"completed_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+
+def _run_created_at(run: dict) -> datetime:
+    """When a run's issues were detected, for issues stored before created_at was"""
+    return run.get("timestamp") or run["_id"].generation_time.replace(tzinfo=None)
+
+
+async def migrate_embedded_results() -> int:
+    """
+    Move results still embedded in legacy run documents into the results and
+    issues collections. Upserts keyed on run and position make it safe to run
+    concurrently from several processes. Completion is recorded in
+    `migrations`, so later startups skip the scan. Returns the number of runs
+    migrated.
+    """
+    if await _migration_done(EMBEDDED_RESULTS_MIGRATION):
+        return 0
+
+    db = get_database()
+    migrated = 0
+
+    async for run in db.analysis_runs.find({"results.0": {"$exists": True}}):
+        run_oid = run["_id"]
+        user_oid = run["user_id"]
+        results = run["results"]
+        created_at = _run_created_at(run)
+
+        await db.analysis_results.bulk_write([
+            UpdateOne(
+                {"run_id": run_oid, "position": position},
+                {"$setOnInsert": _result_doc(run_oid, user_oid, position, result)},
+                upsert=True
+            )
+            for position, result in enumerate(results)
+        ])
+
+        result_ids = {}
+        async for doc in db.analysis_results.find({"run_id": run_oid}, {"position": 1}):
+            result_ids[doc["position"]] = doc["_id"]
+
+        issue_ops = [
+            UpdateOne(
+                {"run_id": run_oid, "id": issue["id"]},
+                {"$setOnInsert": _issue_doc(
+                    run_oid, user_oid, result_ids[result_position], result_position, result, position, issue,
+                    created_at
+                )},
+                upsert=True
+            )
+            for result_position, result in enumerate(results)
+            for position, issue in enumerate(result.get("issues", []))
+        ]
+        if issue_ops:
+            await db.analysis_issues.bulk_write(issue_ops)
+
+        await db.analysis_runs.update_one({"_id": run_oid}, {"$unset": {"results": ""}})
+        migrated += 1
+
+    await _record_migration(EMBEDDED_RESULTS_MIGRATION)
+    return migrated
+
+
+async def backfill_issue_created_at() -> int:
+    """
+    Give issues stored before created_at existed their run's timestamp.
+    Recorded in `migrations` like migrate_embedded_results. Returns the
+    number of issues updated.
+    """
+    if await _migration_done(ISSUE_CREATED_AT_MIGRATION):
+        return 0
+
+    db = get_database()
+    updated = 0
+    async for run in db.analysis_runs.find({}, {"timestamp": 1}):
+        result = await db.analysis_issues.update_many(
+            {"run_id": run["_id"], "created_at": {"$exists": False}},
+            {"$set": {"created_at": _run_created_at(run)}}
+        )
+        updated += result.modified_count
+
+    await _record_migration(ISSUE_CREATED_AT_MIGRATION)
+    return updated
@@ -0,0 +1,210 @@
+"""
+MongoDB-backed job queue.
+
+Jobs are documents in `jobs`. A worker claims the oldest runnable job of the
+highest priority (interactive runs ahead of bulk shards) with an
+atomic find_one_and_update that sets a lease; while it works it renews the lease
+with heartbeats. A job whose worker dies stops heartbeating, its lease expires
+and another worker claims it again, up to `job_max_attempts` attempts.
+Deleting a run cancels its jobs; a worker holding one loses its lease on the
+next heartbeat.
+
+Job status: queued -> running -> completed | failed | cancelled
+"""
+
+from config import settings
+from database import get_database
+from pymongo import ReturnDocument
+from bson import ObjectId
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+# Lower sorts first: a 20-URL /start run never waits behind a sitemap's shards
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+
+def _job_doc(job_type: str, run_id: str, user_id: str, payload: dict, priority: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "type": job_type,
+        "run_id": ObjectId(run_id),
+        "user_id": ObjectId(user_id),
+        "payload": payload,
+        "status": "queued",
+        "priority": priority,
+        "attempts": 0,
+        "max_attempts": settings.job_max_attempts,
+        "lease_owner": None,
+        "lease_expires_at": None,
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+async def enqueue_job(job_type: str, run_id: str, user_id: str, payload: dict,
+                      priority: int = PRIORITY_INTERACTIVE) -> str:
+    db = get_database()
+    result = await db.jobs.insert_one(_job_doc(job_type, run_id, user_id, payload, priority))
+    return str(result.inserted_id)
+
+
+async def enqueue_jobs(job_type: str, run_id: str, user_id: str, payloads: List[dict],
+                       priority: int = PRIORITY_INTERACTIVE) -> None:
+    """Queue several jobs for one run, e.g. the shards of a bulk run"""
+    db = get_database()
+    await db.jobs.insert_many([
+        _job_doc(job_type, run_id, user_id, payload, priority) for payload in payloads
+    ])
+
+
+async def claim_job(worker_id: str) -> Optional[dict]:
+    """
+    Lease the next queued job, or a running job whose lease has expired:
+    highest priority first, oldest first within a priority
+    """
+    db = get_database()
+    now = datetime.utcnow()
+    return await db.jobs.find_one_and_update(
+        {
+            "$or": [
+                {"status": "queued"},
+                {"status": "running", "lease_expires_at": {"$lt": now}}
+            ],
+            "$expr": {"$lt": ["$attempts", "$max_attempts"]}
+        },
+        {
+            "$set": {
+                "status": "running",
+                "lease_owner": worker_id,
+                "lease_expires_at": now + timedelta(seconds=settings.job_lease_seconds),
+                "heartbeat_at": now,
+                "claimed_at": now,
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        # Jobs queued before priorities existed have none and sort first
+        sort=[("priority", 1), ("created_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def heartbeat_job(job_id: ObjectId, worker_id: str) -> bool:
+    """Extend the lease; False means the lease was lost to another worker"""
+    db = get_database()
+    now = datetime.utcnow()
+    result = await db.jobs.update_one(
+        {"_id": job_id, "lease_owner": worker_id, "status": "running"},
+        {"$set": {
+            "lease_expires_at": now + timedelta(seconds=settings.job_lease_seconds),
+            "heartbeat_at": now
+        }}
+    )
+    return result.matched_count > 0
+
+
+async def complete_job(job_id: ObjectId, worker_id: str) -> None:
+    db = get_database()
+    await db.jobs.update_one(
+        {"_id": job_id, "lease_owner": worker_id},
+        {"$set": {
+            "status": "completed",
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "updated_at": datetime.utcnow()
+        }}
+    )
+
+
+async def fail_job(job: dict, worker_id: str, error: str) -> bool:
+    """
+    Release a job after an error. It is queued again while attempts remain;
+    returns True when it has failed for good.
+    """
+    db = get_database()
+    exhausted = job["attempts"] >= job["max_attempts"]
+    await db.jobs.update_one(
+        {"_id": job["_id"], "lease_owner": worker_id},
+        {"$set": {
+            "status": "failed" if exhausted else "queued",
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "error": error,
+            "updated_at": datetime.utcnow()
+        }}
+    )
+    return exhausted
+
+
+async def release_job(job_id: ObjectId, worker_id: str) -> None:
+    """Return a job to the queue without counting the interrupted attempt"""
+    db = get_database()
+    await db.jobs.update_one(
+        {"_id": job_id, "lease_owner": worker_id, "status": "running"},
+        {
+            "$set": {
+                "status": "queued",
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "updated_at": datetime.utcnow()
+            },
+            "$inc": {"attempts": -1}
+        }
+    )
+
+
+async def cancel_run_jobs(run_id: str) -> int:
+    """Cancel a run's queued and running jobs; returns how many were cancelled"""
+    db = get_database()
+    result = await db.jobs.update_many(
+        {"run_id": ObjectId(run_id), "status": {"$in": ["queued", "running"]}},
+        {"$set": {
+            "status": "cancelled",
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "updated_at": datetime.utcnow()
+        }}
+    )
+    return result.modified_count
+
+
+async def get_run_jobs(run_id: str) -> List[dict]:
+    """A run's jobs without their URL payloads, in shard order"""
+    db = get_database()
+    cursor = db.jobs.find(
+        {"run_id": ObjectId(run_id)},
+        {"payload.offset": 1, "status": 1, "attempts": 1, "created_at": 1, "claimed_at": 1}
+    )
+    jobs = [job async for job in cursor]
+    return sorted(jobs, key=lambda job: job["payload"].get("offset", 0))
+
+
+async def reap_abandoned_jobs() -> List[dict]:
+    """
+    Mark running jobs whose lease expired on their last attempt as failed.
+    Returns the jobs that were reaped.
+    """
+    db = get_database()
+    now = datetime.utcnow()
+    query = {
+        "status": "running",
+        "lease_expires_at": {"$lt": now},
+        "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+    }
+
+    reaped = []
+    async for job in db.jobs.find(query):
+        result = await db.jobs.update_one(
+            {"_id": job["_id"], "status": "running", "lease_owner": job["lease_owner"]},
+            {"$set": {
+                "status": "failed",
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "error": "Lease expired on final attempt",
+                "updated_at": now
+            }}
+        )
+        if result.modified_count:
+            reaped.append(job)
+    return reaped
@@ -1,37 +1,83 @@
+"""
+Revoked (logged-out) JWTs.
+
+Revocations are stored in `token_blacklist`, which a TTL index on `expires_at`
+empties once each token would have expired anyway. Lookups go through two
+in-process caches keyed by the token's SHA-256: revoked tokens are remembered
+until they expire, and tokens found not to be revoked are remembered for
+`token_revocation_cache_ttl` seconds. A valid token therefore needs at most one
+database lookup per window; a logout on another process is seen within it.
+"""
+
+from config import settings
 from database import get_database
+from utils.cache import TTLCache
 from datetime import datetime
-from typing import Optional
+import hashlib
+
+_revoked = TTLCache(max_entries=settings.token_cache_max_entries)
+_not_revoked = TTLCache(
+    max_entries=settings.token_cache_max_entries,
+    default_ttl=settings.token_revocation_cache_ttl
+)
+
+
+def _token_hash(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _remember_revoked(token_hash: str, expires_at: datetime) -> None:
+    remaining = (expires_at - datetime.utcnow()).total_seconds()
+    if remaining > 0:
+        _revoked.set(token_hash, True, ttl=remaining)
+    _not_revoked.pop(token_hash)
 
 
 async def blacklist_token(token: str, user_id: str, expires_at: datetime) -> bool:
     """Add a token to the blacklist"""
     db = get_database()
-    
+
     blacklist_entry = {
         "token": token,
         "user_id": user_id,
         "blacklisted_at": datetime.utcnow(),
         "expires_at": expires_at
     }
-    
+
     await db.token_blacklist.insert_one(blacklist_entry)
+    _remember_revoked(_token_hash(token), expires_at)
     return True
 
 
 async def is_token_blacklisted(token: str) -> bool:
     """Check if a token is blacklisted"""
+    token_hash = _token_hash(token)
+    if _revoked.get(token_hash):
+        return True
+    if _not_revoked.get(token_hash):
+        return False
+
     db = get_database()
-    
-    result = await db.token_blacklist.find_one({"token": token})
-    return result is not None
+
+    result = await db.token_blacklist.find_one({"token": token}, {"expires_at": 1})
+    if result is not None:
+        _remember_revoked(token_hash, result["expires_at"])
+        return True
+
+    _not_revoked.set(token_hash, True)
+    return False
+
+
+def blacklist_cache_stats() -> dict:
+    return {"revoked": _revoked.stats(), "notRevoked": _not_revoked.stats()}
 
 
 async def cleanup_expired_tokens() -> int:
-    """Remove expired tokens from blacklist"""
+    """Remove expired tokens from blacklist (the TTL index normally does this)"""
     db = get_database()
-    
+
     result = await db.token_blacklist.delete_many({
         "expires_at": {"$lt": datetime.utcnow()}
     })
-    
-    return result.deleted_count
\ No newline at end of file
+
+    return result.deleted_count
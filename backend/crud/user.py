@@ -1,4 +1,4 @@
-from passlib.hash import argon2
+from auth.hashing import hash_password, verify_password
 from database import get_database
 from datetime import datetime
 from bson import ObjectId
@@ -14,7 +14,7 @@ async def create_user(email: str, password: str) -> dict:
         raise ValueError("Email already registered")
     
     # Hash password
-    password_hash = argon2.hash(password)
+    password_hash = await hash_password(password)
     
     # Extract name from email (before @)
     name = email.split("@")[0]
@@ -50,8 +50,3 @@ async def get_user_by_email(email: str) -> dict:
             "password_hash": user["password_hash"]
         }
     return None
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash"""
-    return argon2.verify(plain_password, hashed_password)
\ No newline at end of file
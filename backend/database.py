@@ -1,6 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from config import settings
 import certifi
+import logging
+
+logger = logging.getLogger(__name__)
 
 client = None
 db = None
@@ -13,14 +16,14 @@ async def connect_to_mongo():
         tlsCAFile=certifi.where()
     )
     db = client.updateq
-    print("Connected to MongoDB Atlas")
+    logger.info("Connected to MongoDB")
 
 
 async def close_mongo_connection():
     global client
     if client:
         client.close()
-        print("Closed MongoDB connection")
+        logger.info("Closed MongoDB connection")
 
 
 def get_database():
@@ -0,0 +1,181 @@
+"""
+MongoDB index declarations and query-plan diagnostics.
+
+ensure_indexes() runs from the app lifespan and creates every index declared in
+INDEXES (creation is a no-op when an index already exists). explain_hot_queries()
+runs `explain` on the queries behind authentication and the list views and
+reports any that fall back to a collection scan.
+
+Usage:
+    python -m indexes            # create indexes
+    python -m indexes --explain  # create indexes, then report query plans
+"""
+
+from database import get_database
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from bson import ObjectId
+from datetime import datetime
+from typing import List
+import asyncio
+import logging
+import sys
+
+logger = logging.getLogger(__name__)
+
+INDEXES = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+    ],
+    "token_blacklist": [
+        IndexModel([("token", ASCENDING)]),
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "writers": [
+        IndexModel([("user_id", ASCENDING)]),
+    ],
+    "analysis_runs": [
+        # Runs list: newest first, _id as the keyset tie-breaker
+        IndexModel([("user_id", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "analysis_results": [
+        IndexModel([("run_id", ASCENDING), ("position", ASCENDING)], unique=True),
+        # Run progress stream: results completed since the last poll
+        IndexModel([("run_id", ASCENDING), ("completed_at", ASCENDING)]),
+    ],
+    "analysis_issues": [
+        IndexModel([("run_id", ASCENDING), ("result_position", ASCENDING), ("position", ASCENDING)]),
+        IndexModel([("run_id", ASCENDING), ("id", ASCENDING)]),
+        # Cross-run issue query: user plus one filter field, _id as the keyset tie-breaker
+        IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("assignedTo", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("dueDate", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("url", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("run_id", ASCENDING), ("_id", ASCENDING)]),
+        # Sort-only fields of the issue query (status, url and dueDate are covered above)
+        IndexModel([("user_id", ASCENDING), ("assignedAt", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("confidence", ASCENDING), ("_id", ASCENDING)]),
+        # Cross-run exports, filtered and ordered by detection time
+        IndexModel([("user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "jobs": [
+        IndexModel([("status", ASCENDING), ("priority", ASCENDING), ("created_at", ASCENDING)]),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+        IndexModel([("run_id", ASCENDING)]),
+    ],
+    # Cache entries are removed by MongoDB once expires_at has passed
+    "extraction_cache": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+    "detection_cache": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+    ],
+}
+
+
+def hot_queries() -> List[dict]:
+    """Representative shapes of the queries run on every request or list view"""
+    user_id = ObjectId()
+    run_id = ObjectId()
+    return [
+        {"name": "user by email", "collection": "users", "filter": {"email": "user@example.com"}},
+        {"name": "token blacklist lookup", "collection": "token_blacklist", "filter": {"token": "token"}},
+        {"name": "writers list", "collection": "writers", "filter": {"user_id": user_id}},
+        {"name": "runs list", "collection": "analysis_runs", "filter": {"user_id": user_id},
+         "sort": [("timestamp", DESCENDING), ("_id", DESCENDING)]},
+        {"name": "run results", "collection": "analysis_results", "filter": {"run_id": run_id},
+         "sort": [("position", ASCENDING)]},
+        {"name": "run results since", "collection": "analysis_results",
+         "filter": {"run_id": run_id, "completed_at": {"$gte": datetime.utcnow()}},
+         "sort": [("completed_at", ASCENDING)]},
+        {"name": "run issues", "collection": "analysis_issues", "filter": {"run_id": run_id},
+         "sort": [("result_position", ASCENDING), ("position", ASCENDING)]},
+        {"name": "issue by id", "collection": "analysis_issues",
+         "filter": {"run_id": run_id, "user_id": user_id, "id": "issue_00000000"}},
+        {"name": "issues by status", "collection": "analysis_issues",
+         "filter": {"user_id": user_id, "status": "open"}, "sort": [("_id", ASCENDING)]},
+        {"name": "issues by assignee", "collection": "analysis_issues",
+         "filter": {"user_id": user_id, "assignedTo": "writer"}, "sort": [("_id", ASCENDING)]},
+        {"name": "issues by due date", "collection": "analysis_issues",
+         "filter": {"user_id": user_id, "dueDate": {"$lt": datetime.utcnow()}},
+         "sort": [("dueDate", ASCENDING), ("_id", ASCENDING)]},
+        {"name": "issues sorted by assignment", "collection": "analysis_issues",
+         "filter": {"user_id": user_id}, "sort": [("assignedAt", DESCENDING), ("_id", DESCENDING)]},
+        {"name": "issues sorted by confidence", "collection": "analysis_issues",
+         "filter": {"user_id": user_id}, "sort": [("confidence", DESCENDING), ("_id", DESCENDING)]},
+        {"name": "issues sorted by status", "collection": "analysis_issues",
+         "filter": {"user_id": user_id}, "sort": [("status", ASCENDING), ("_id", ASCENDING)]},
+        {"name": "issues sorted by url", "collection": "analysis_issues",
+         "filter": {"user_id": user_id}, "sort": [("url", ASCENDING), ("_id", ASCENDING)]},
+        {"name": "issues export by creation time", "collection": "analysis_issues",
+         "filter": {"user_id": user_id, "created_at": {"$gte": datetime.utcnow()}},
+         "sort": [("created_at", ASCENDING), ("_id", ASCENDING)]},
+    ]
+
+
+async def ensure_indexes() -> int:
+    """Create all declared indexes; returns how many collections failed"""
+    db = get_database()
+    failures = 0
+    for collection, models in INDEXES.items():
+        try:
+            await db[collection].create_indexes(models)
+        except OperationFailure as e:
+            # e.g. duplicate emails blocking a unique index; keep serving
+            failures += 1
+            logger.error("Failed to create indexes on %s: %s", collection, str(e))
+    return failures
+
+
+def _plan_stages(plan: dict) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages.extend(_plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+async def explain_hot_queries() -> List[dict]:
+    """Run explain on each hot query and return its winning plan stages"""
+    db = get_database()
+    report = []
+    for query in hot_queries():
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+        explanation = await cursor.limit(1).explain()
+        stages = _plan_stages(explanation.get("queryPlanner", {}).get("winningPlan", {}))
+        report.append({
+            "name": query["name"],
+            "collection": query["collection"],
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages
+        })
+    return report
+
+
+async def _main(explain: bool) -> int:
+    from database import connect_to_mongo, close_mongo_connection
+
+    await connect_to_mongo()
+    try:
+        failures = await ensure_indexes()
+        print(f"Indexes ensured ({failures} collection(s) failed)")
+        if not explain:
+            return 1 if failures else 0
+
+        scans = 0
+        for entry in await explain_hot_queries():
+            flag = "COLLSCAN" if entry["collscan"] else "ok"
+            scans += entry["collscan"]
+            print(f"{flag:8} {entry['collection']:18} {entry['name']:24} {' <- '.join(entry['stages'])}")
+        return 1 if failures or scans else 0
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main("--explain" in sys.argv[1:])))
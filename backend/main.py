@@ -1,17 +1,49 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
+import asyncio
+import logging
 from config import settings
 from database import connect_to_mongo, close_mongo_connection, get_database
+from services.clients import init_clients, close_clients
+from crud.analysis import migrate_embedded_results, backfill_issue_created_at
+from indexes import ensure_indexes
+from worker import run_worker
+from auth.dependencies import user_cache_stats
+from auth.hashing import close_hashing_executor
+from crud.token_blacklist import blacklist_cache_stats
+from services.extraction_cache import extraction_cache_stats
+from services.detection_cache import detection_cache_stats
+from services.rate_limit import rate_limit_stats
+from utils.telemetry import configure_logging, render_metrics
 from routers import auth, analysis, writers
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    await ensure_indexes()
+    migrated = await migrate_embedded_results()
+    if migrated:
+        logger.info("Migrated %d analysis runs to per-result storage", migrated)
+    backfilled = await backfill_issue_created_at()
+    if backfilled:
+        logger.info("Stamped created_at on %d existing issues", backfilled)
+    await init_clients()
+    stop_worker = asyncio.Event()
+    worker_task = asyncio.create_task(run_worker(stop_worker)) if settings.embedded_worker else None
     yield
     # Shutdown
+    if worker_task is not None:
+        stop_worker.set()
+        await worker_task
+    await close_clients()
+    close_hashing_executor()
     await close_mongo_connection()
 
 
@@ -32,14 +64,30 @@ app.include_router(analysis.router)
 app.include_router(writers.router)
 
 
+def cache_stats() -> dict:
+    """Hit/miss counters of the in-process caches"""
+    return {
+        "users": user_cache_stats(),
+        "tokenBlacklist": blacklist_cache_stats(),
+        "extraction": extraction_cache_stats(),
+        "detection": detection_cache_stats()
+    }
+
+
 @app.get("/healthz")
 async def health_check():
     try:
         db = get_database()
         await db.command("ping")
-        return {"status": "healthy", "database": "connected"}
+        return {"status": "healthy", "database": "connected", "caches": cache_stats(), "upstream": rate_limit_stats()}
     except Exception as e:
-        return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
+        return {"status": "unhealthy", "database": "disconnected", "error": str(e), "caches": cache_stats(), "upstream": rate_limit_stats()}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Stage timings, upstream latency and token counts in the Prometheus text format"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/")
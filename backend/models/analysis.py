@@ -53,7 +53,8 @@ class URLResult(BaseModel):
     h2s: List[str] = Field(default_factory=list, alias="h2s")
     h3s: List[str] = Field(default_factory=list, alias="h3s")
     h4s: List[str] = Field(default_factory=list, alias="h4s")
-    status: str
+    status: str  # success, partial (some chunks failed) or failed
+    failed_chunks: int = Field(0, alias="failedChunks")
     issue_count: int = Field(alias="issueCount")
     issues: List[Issue] = []
 
@@ -64,6 +65,17 @@ class URLResult(BaseModel):
 class AnalysisRunCreate(BaseModel):
     urls: List[str] = Field(..., min_length=1, max_length=20)
     domain_context: DomainContext = Field(alias="domainContext")
+    force_refresh: bool = Field(False, alias="forceRefresh")  # Bypass the extraction cache
+
+    class Config:
+        populate_by_name = True
+
+
+class BulkAnalysisCreate(BaseModel):
+    sitemap_url: Optional[str] = Field(None, alias="sitemapUrl")
+    urls: Optional[List[str]] = None
+    domain_context: DomainContext = Field(alias="domainContext")
+    force_refresh: bool = Field(False, alias="forceRefresh")
 
     class Config:
         populate_by_name = True
@@ -74,10 +86,12 @@ class AnalysisRunResponse(BaseModel):
     user_id: str = Field(alias="userId")
     timestamp: datetime
     url_count: int = Field(alias="urlCount")
+    completed_count: int = Field(0, alias="completedCount")  # URLs finished so far
     total_issues: int = Field(alias="totalIssues")
     status: str
     domain_context: DomainContext = Field(alias="domainContext")
     results: List[URLResult] = []
+    next_offset: Optional[int] = Field(None, alias="nextOffset")  # Offset of the next page of results
 
     class Config:
         populate_by_name = True
@@ -87,6 +101,7 @@ class AnalysisRunSummary(BaseModel):
     id: str
     timestamp: datetime
     url_count: int = Field(alias="urlCount")
+    completed_count: int = Field(0, alias="completedCount")
     total_issues: int = Field(alias="totalIssues")
     status: str
     domain_context: DomainContext = Field(alias="domainContext")
@@ -104,6 +119,56 @@ class AnalysisStartResponse(BaseModel):
         populate_by_name = True
 
 
+class ProfileTimings(BaseModel):
+    """Stage times (ms) and LLM sizes; summed for totals, per URL otherwise"""
+    total_ms: float = Field(0, alias="totalMs")
+    queue_ms: float = Field(0, alias="queueMs")  # Waiting for a Firecrawl / Claude slot
+    scrape_ms: float = Field(0, alias="scrapeMs")
+    llm_ms: float = Field(0, alias="llmMs")  # Summed over chunks; includes throttling
+    validate_ms: float = Field(0, alias="validateMs")
+    write_ms: float = Field(0, alias="writeMs")
+    throttle_ms: float = Field(0, alias="throttleMs")  # Rate limiter waits and retry backoff
+    chunks: float = 0
+    prompt_chars: float = Field(0, alias="promptChars")
+    response_chars: float = Field(0, alias="responseChars")
+    input_tokens: float = Field(0, alias="inputTokens")
+    output_tokens: float = Field(0, alias="outputTokens")
+
+    class Config:
+        populate_by_name = True
+
+
+class URLProfile(ProfileTimings):
+    position: int
+    url: str
+    status: str
+    cached: bool  # Extraction served from cache
+
+
+class ShardProfile(BaseModel):
+    offset: int
+    status: str
+    attempts: int
+    queue_ms: Optional[float] = Field(None, alias="queueMs")  # Job created -> last claimed
+
+    class Config:
+        populate_by_name = True
+
+
+class RunProfileResponse(BaseModel):
+    run_id: str = Field(alias="runId")
+    status: str
+    url_count: int = Field(alias="urlCount")
+    profiled_count: int = Field(alias="profiledCount")
+    totals: ProfileTimings
+    averages: ProfileTimings
+    slowest: List[URLProfile]
+    shards: List[ShardProfile]
+
+    class Config:
+        populate_by_name = True
+
+
 class IssueUpdate(BaseModel):
     status: Optional[str] = None
     assigned_to: Optional[str] = Field(None, alias="assignedTo")
@@ -1,103 +1,94 @@
-from fastapi import APIRouter, HTTPException, status, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Request, UploadFile, File, Form
 from fastapi.responses import StreamingResponse
 from models.analysis import (
-    AnalysisRunCreate, AnalysisRunResponse, AnalysisStartResponse,
+    AnalysisRunCreate, BulkAnalysisCreate, DomainContext, AnalysisRunResponse, AnalysisStartResponse,
     AnalysisRunSummary, IssueUpdate, ManualTask, IssueWithContext,
-    SuggestedSource
+    SuggestedSource, ProfileTimings, RunProfileResponse
 )
 from auth.dependencies import get_current_user
+from config import settings
 from database import get_database
-from services.extractor import extract_content
-from services.detector import detect_stale_content
 from services.research import research_service
+from services.run_events import run_events
+from services.sitemap import urls_from_sitemap, urls_from_upload, urls_from_list
+from services.export import (
+    EXPORT_MEDIA_TYPES, arrow_available, stream_csv, stream_ndjson, stream_arrow
+)
+from crud.jobs import (
+    enqueue_jobs, get_run_jobs, cancel_run_jobs, PRIORITY_INTERACTIVE, PRIORITY_BULK
+)
+from crud.analysis import (
+    insert_results, get_run_results, find_issue, update_issue_fields,
+    set_issue_sources, delete_run_results, issue_from_doc, query_issues, query_runs,
+    summarize_issues, summarize_runs
+)
+from utils.pagination import parse_sort
 from bson import ObjectId
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
-import csv
-import io
 
 router = APIRouter(prefix="/api/v1/analysis", tags=["analysis"])
 
 
-async def process_analysis(run_id: str, urls: list, domain_context: dict):
-    """Background task to process URL analysis"""
+async def queue_analysis_run(
+    user_id: str,
+    urls: List[str],
+    domain_context: DomainContext,
+    force_refresh: bool = False,
+    priority: int = PRIORITY_INTERACTIVE
+) -> str:
+    """
+    Create a run and queue it for the workers (see worker.py), split into
+    shards of at most bulk_shard_size URLs. Returns the run id.
+    """
     db = get_database()
-    results = []
-    total_issues = 0
-    
-    for url in urls:
-        # Extract content
-        extraction = await extract_content(url)
-        
-        if extraction["status"] == "failed":
-            # Mark as failed and continue
-            results.append({
-                "url": url,
-                "title": "Failed to Access",
-                "metaTitle": "",
-                "metaDescription": "",
-                "h1s": [],
-                "h2s": [],
-                "h3s": [],
-                "h4s": [],
-                "status": "failed",
-                "issueCount": 0,
-                "issues": []
-            })
-            continue
-        
-        # Detect stale content
-        print(f"[DEBUG] Starting detection for {url}")
-        detection = await detect_stale_content(
-            url,
-            extraction["content"],
-            domain_context
-        )
-        print(f"[DEBUG] Detection complete for {url}: {detection.get('issue_count', 0)} issues found")
-        
-        issue_count = detection.get("issue_count", 0)
-        total_issues += issue_count
-        
-        # Extract headers from the extraction result
-        headers = extraction.get("headers", {})
-        
-        results.append({
-            "url": url,
-            "title": extraction["title"],
-            "metaTitle": extraction.get("meta_title", ""),
-            "metaDescription": extraction.get("meta_description", ""),
-            "h1s": headers.get("h1", []),
-            "h2s": headers.get("h2", []),
-            "h3s": headers.get("h3", []),
-            "h4s": headers.get("h4", []),
-            "status": "success",
-            "issueCount": issue_count,
-            "issues": detection.get("issues", [])
-        })
+    shard_size = max(settings.bulk_shard_size, 1)
+    offsets = list(range(0, len(urls), shard_size))
     
-    # Update run with results
-    await db.analysis_runs.update_one(
-        {"_id": ObjectId(run_id)},
-        {
-            "$set": {
-                "status": "completed",
-                "total_issues": total_issues,
-                "results": results
-            }
+    run_doc = {
+        "user_id": ObjectId(user_id),
+        "timestamp": datetime.utcnow(),
+        "url_count": len(urls),
+        "completed_count": 0,
+        "total_issues": 0,
+        "max_issue_count": 0,
+        "pending_jobs": len(offsets),
+        "status": "processing",
+        "domain_context": {
+            "description": domain_context.description,
+            "entityTypes": domain_context.entity_types,
+            "stalenessRules": domain_context.staleness_rules
         }
+    }
+    
+    result = await db.analysis_runs.insert_one(run_doc)
+    run_id = str(result.inserted_id)
+    
+    await enqueue_jobs(
+        "analysis",
+        run_id,
+        user_id,
+        [
+            {
+                "urls": urls[offset:offset + shard_size],
+                "offset": offset,
+                "domain_context": run_doc["domain_context"],
+                "force_refresh": force_refresh
+            }
+            for offset in offsets
+        ],
+        priority
     )
+    return run_id
 
 
 @router.post("/start", response_model=AnalysisStartResponse, status_code=status.HTTP_201_CREATED)
 async def start_analysis(
     data: AnalysisRunCreate,
-    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
     """Submit URL batch for analysis"""
-    db = get_database()
-    
     # Validate URLs
     if len(data.urls) > 20:
         raise HTTPException(
@@ -108,30 +99,8 @@ async def start_analysis(
     # Remove duplicates
     unique_urls = list(dict.fromkeys(data.urls))
     
-    # Create analysis run
-    run_doc = {
-        "user_id": ObjectId(current_user["id"]),
-        "timestamp": datetime.utcnow(),
-        "url_count": len(unique_urls),
-        "total_issues": 0,
-        "status": "processing",
-        "domain_context": {
-            "description": data.domain_context.description,
-            "entityTypes": data.domain_context.entity_types,
-            "stalenessRules": data.domain_context.staleness_rules
-        },
-        "results": []
-    }
-    
-    result = await db.analysis_runs.insert_one(run_doc)
-    run_id = str(result.inserted_id)
-    
-    # Start background processing
-    background_tasks.add_task(
-        process_analysis,
-        run_id,
-        unique_urls,
-        run_doc["domain_context"]
+    run_id = await queue_analysis_run(
+        current_user["id"], unique_urls, data.domain_context, data.force_refresh
     )
     
     return AnalysisStartResponse(
@@ -141,19 +110,108 @@ async def start_analysis(
     )
 
 
+async def _start_bulk_run(user_id: str, urls: List[str], domain_context: DomainContext,
+                          force_refresh: bool) -> AnalysisStartResponse:
+    if not urls:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No http(s) URLs found"
+        )
+    
+    run_id = await queue_analysis_run(user_id, urls, domain_context, force_refresh, PRIORITY_BULK)
+    return AnalysisStartResponse(
+        runId=run_id,
+        status="processing",
+        urlCount=len(urls)
+    )
+
+
+@router.post("/bulk", response_model=AnalysisStartResponse, status_code=status.HTTP_201_CREATED)
+async def start_bulk_analysis(
+    data: BulkAnalysisCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Analyze every page of a sitemap, or a large URL list, as one run"""
+    if data.sitemap_url:
+        try:
+            urls = await urls_from_sitemap(data.sitemap_url)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    elif data.urls:
+        if len(data.urls) > settings.bulk_max_urls:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Maximum {settings.bulk_max_urls} URLs allowed per bulk run"
+            )
+        urls = urls_from_list(data.urls)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide sitemapUrl or urls"
+        )
+    
+    return await _start_bulk_run(current_user["id"], urls, data.domain_context, data.force_refresh)
+
+
+@router.post("/bulk/upload", response_model=AnalysisStartResponse, status_code=status.HTTP_201_CREATED)
+async def upload_bulk_analysis(
+    file: UploadFile = File(...),
+    domain_context: str = Form(..., alias="domainContext"),
+    force_refresh: bool = Form(False, alias="forceRefresh"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Analyze an uploaded URL list (one URL per line, or a CSV whose first column is the URL)"""
+    try:
+        context = DomainContext.model_validate_json(domain_context)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="domainContext must be a JSON object with description, entityTypes and stalenessRules"
+        )
+    
+    content = await file.read(settings.bulk_max_upload_bytes + 1)
+    if len(content) > settings.bulk_max_upload_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="URL list is too large"
+        )
+    
+    return await _start_bulk_run(current_user["id"], urls_from_upload(content), context, force_refresh)
+
+
+@router.get("/runs/summary")
+async def get_run_summary(current_user: dict = Depends(get_current_user)):
+    """Totals across all of the user's runs, for the dashboard"""
+    totals = await summarize_runs(current_user["id"])
+    return {
+        "runCount": totals["runs"],
+        "urlCount": totals["urls"],
+        "totalIssues": totals["issues"]
+    }
+
+
 @router.get("/runs/{run_id}", response_model=AnalysisRunResponse)
 async def get_analysis_run(
     run_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(settings.run_results_page_size, ge=0, le=settings.run_results_page_max),
     current_user: dict = Depends(get_current_user)
 ):
-    """Get analysis run details and results"""
+    """
+    Get analysis run details and one page of its results: the URLs at
+    positions offset..offset+limit. nextOffset fetches the following page;
+    limit=0 returns the run without results (e.g. to poll progress).
+    """
     db = get_database()
     
     try:
         run = await db.analysis_runs.find_one({
             "_id": ObjectId(run_id),
             "user_id": ObjectId(current_user["id"])
-        })
+        }, {"profile": 0})
     except:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -171,28 +229,118 @@ async def get_analysis_run(
         userId=str(run["user_id"]),
         timestamp=run["timestamp"],
         urlCount=run["url_count"],
+        completedCount=run.get("completed_count", run["url_count"]),
         totalIssues=run["total_issues"],
         status=run["status"],
         domainContext=run["domain_context"],
-        results=run.get("results", [])
+        results=await get_run_results(run_id, start=offset, end=offset + limit) if limit else [],
+        nextOffset=offset + limit if limit and offset + limit < run["url_count"] else None
     )
 
 
-@router.get("/runs")
-async def list_analysis_runs(current_user: dict = Depends(get_current_user)):
-    """List all analysis runs for user"""
+@router.get("/runs/{run_id}/events")
+async def stream_analysis_events(
+    run_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream per-URL completions and progress for a run as server-sent events"""
+    db = get_database()
+    
+    try:
+        run = await db.analysis_runs.find_one(
+            {"_id": ObjectId(run_id), "user_id": ObjectId(current_user["id"])},
+            {"_id": 1}
+        )
+    except:
+        run = None
+    
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis run not found"
+        )
+    
+    return StreamingResponse(
+        run_events(run_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/runs/{run_id}/profile", response_model=RunProfileResponse)
+async def get_run_profile(
+    run_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Timing breakdown of a run: totals and per-URL averages over every
+    analyzed URL, the slowest URLs in full and the queue wait of each shard.
+    """
     db = get_database()
     
-    cursor = db.analysis_runs.find(
-        {"user_id": ObjectId(current_user["id"])}
-    ).sort("timestamp", -1)
+    try:
+        run = await db.analysis_runs.find_one(
+            {"_id": ObjectId(run_id), "user_id": ObjectId(current_user["id"])},
+            {"status": 1, "url_count": 1, "profile": 1, "profile_totals": 1}
+        )
+    except:
+        run = None
+    
+    if not run:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Analysis run not found"
+        )
+    
+    totals = dict(run.get("profile_totals", {}))
+    profiled = int(totals.pop("urls", 0))
+    averages = {field: value / profiled for field, value in totals.items()} if profiled else {}
+    
+    shards = []
+    for job in await get_run_jobs(run_id):
+        claimed_at = job.get("claimed_at")
+        shards.append({
+            "offset": job["payload"].get("offset", 0),
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "queue_ms": round((claimed_at - job["created_at"]).total_seconds() * 1000, 1) if claimed_at else None
+        })
+    
+    return RunProfileResponse(
+        runId=run_id,
+        status=run["status"],
+        urlCount=run["url_count"],
+        profiledCount=profiled,
+        totals=ProfileTimings(**totals),
+        averages=ProfileTimings(**averages),
+        slowest=run.get("profile", []),
+        shards=shards
+    )
+
+
+@router.get("/runs")
+async def list_analysis_runs(
+    limit: int = Query(settings.run_page_size, ge=1, le=settings.run_page_max),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """List analysis runs for user, newest first; nextCursor fetches the following page"""
+    try:
+        docs, next_cursor = await query_runs(current_user["id"], limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     runs = []
-    async for run in cursor:
+    for run in docs:
         runs.append({
             "id": str(run["_id"]),
             "timestamp": run["timestamp"],
             "urlCount": run["url_count"],
+            "completedCount": run.get("completed_count", run["url_count"]),
             "totalIssues": run["total_issues"],
             "status": run["status"],
             "domainContext": {
@@ -200,7 +348,7 @@ async def list_analysis_runs(current_user: dict = Depends(get_current_user)):
             }
         })
     
-    return {"runs": runs}
+    return {"runs": runs, "nextCursor": next_cursor}
 
 
 @router.delete("/runs/{run_id}")
@@ -222,30 +370,71 @@ async def delete_analysis_run(
             detail="Analysis run not found"
         )
     
+    # Stop workers from analyzing (and storing results for) the deleted run
+    await cancel_run_jobs(run_id)
+    await delete_run_results(run_id)
+    
     return {"message": "Analysis run deleted"}
 
 
+def _export_response(body, export_format: str, filename: str) -> StreamingResponse:
+    """Stream an export; rows are generated from a cursor as the response is sent"""
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{export_format}"
+        }
+    )
+
+
+def _check_export_format(export_format: str) -> None:
+    if export_format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported export format: {export_format}"
+        )
+    if export_format in ("parquet", "arrow") and not arrow_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Parquet and Arrow exports require the pyarrow package"
+        )
+
+
+def _issue_export_body(query: dict, export_format: str):
+    if export_format == "ndjson":
+        return stream_ndjson(query)
+    return stream_arrow(query, export_format)
+
+
 @router.get("/runs/{run_id}/export")
 async def export_analysis_csv(
     run_id: str,
     urls: str = None,
+    export_format: str = Query("csv", alias="format"),
     current_user: dict = Depends(get_current_user)
 ):
-    """Export analysis results as CSV with one column per issue (issue + reason combined)
+    """Export analysis results
+    
+    csv has one row per URL with one column per issue (issue + reason combined);
+    ndjson, parquet and arrow have one row per issue.
     
     Args:
         run_id: The analysis run ID
         urls: Optional comma-separated list of URLs to filter by
+        export_format: csv (default), ndjson, parquet or arrow
         current_user: Authenticated user
     """
-    from utils.text_processing import format_issue_with_reason_for_csv
-    
+    _check_export_format(export_format)
     db = get_database()
     
-    run = await db.analysis_runs.find_one({
-        "_id": ObjectId(run_id),
-        "user_id": ObjectId(current_user["id"])
-    })
+    run = await db.analysis_runs.find_one(
+        {
+            "_id": ObjectId(run_id),
+            "user_id": ObjectId(current_user["id"])
+        },
+        {"status": 1, "max_issue_count": 1}
+    )
     
     if not run:
         raise HTTPException(
@@ -254,70 +443,45 @@ async def export_analysis_csv(
         )
     
     # Filter results by selected URLs if provided
-    results = run.get("results", [])
-    if urls:
-        selected_urls = [url.strip() for url in urls.split(",")]
-        results = [result for result in results if result["url"] in selected_urls]
-    
-    # Determine max number of issues across filtered results
-    max_issues = 0
-    for result in results:
-        issue_count = len(result.get("issues", []))
-        if issue_count > max_issues:
-            max_issues = issue_count
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write headers with one column per issue
-    headers = ["URL", "Page Title", "Meta Title", "Meta Description", "H1", "H2", "H3", "H4", "Status", "Issue Count"]
-    for i in range(1, max_issues + 1):
-        headers.append(f"Issue {i}")
-    writer.writerow(headers)
-    
-    # Write data - one row per URL (filtered results only)
-    for result in results:
-        issues = result.get("issues", [])
-        
-        # Join multiple headers with " | " separator
-        h1_text = " | ".join(result.get("h1s", []))
-        h2_text = " | ".join(result.get("h2s", []))
-        h3_text = " | ".join(result.get("h3s", []))
-        h4_text = " | ".join(result.get("h4s", []))
-        
-        row = [
-            result["url"],
-            result["title"],
-            result.get("metaTitle", ""),
-            result.get("metaDescription", ""),
-            h1_text,
-            h2_text,
-            h3_text,
-            h4_text,
-            result["status"],
-            result["issueCount"]
-        ]
-        
-        # Add each issue (with its reason) in a separate column
-        for i in range(max_issues):
-            if i < len(issues):
-                row.append(format_issue_with_reason_for_csv(issues[i]))
-            else:
-                # Empty column for URLs with fewer issues
-                row.append("")
-        
-        writer.writerow(row)
-    
-    # Return CSV
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename=analysis_{run_id}.csv"
-        }
-    )
+    selected_urls = [url.strip() for url in urls.split(",")] if urls else None
+    
+    if export_format == "csv":
+        return _export_response(stream_csv(run, selected_urls), "csv", f"analysis_{run_id}")
+    
+    query = {"run_id": run["_id"]}
+    if selected_urls is not None:
+        query["url"] = {"$in": selected_urls}
+    return _export_response(_issue_export_body(query, export_format), export_format, f"analysis_{run_id}")
+
+
+@router.get("/issues/export")
+async def export_issues(
+    export_format: str = Query("ndjson", alias="format"),
+    created_after: Optional[datetime] = Query(None, alias="createdAfter"),
+    created_before: Optional[datetime] = Query(None, alias="createdBefore"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Export issues across all runs, one row per issue, as ndjson (default),
+    parquet or arrow. createdAfter/createdBefore bound when the issue was found.
+    """
+    if export_format == "csv":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cross-run exports are available as ndjson, parquet or arrow"
+        )
+    _check_export_format(export_format)
+    
+    query = {"user_id": ObjectId(current_user["id"])}
+    if created_after is not None or created_before is not None:
+        created = {}
+        if created_after is not None:
+            created["$gte"] = created_after
+        if created_before is not None:
+            created["$lt"] = created_before
+        query["created_at"] = created
+    
+    return _export_response(_issue_export_body(query, export_format), export_format, "issues")
 
 
 @router.patch("/runs/{run_id}/issues/{issue_id}")
@@ -330,10 +494,32 @@ async def update_issue(
     """Update issue status and assignment"""
     db = get_database()
     
+    fields = {}
+    if update_data.status:
+        fields["status"] = update_data.status
+    if update_data.assigned_to:
+        fields["assignedTo"] = update_data.assigned_to
+    if update_data.google_doc_url:
+        fields["googleDocUrl"] = update_data.google_doc_url
+    if update_data.due_date:
+        fields["dueDate"] = update_data.due_date
+    
+    # Only set assignedAt on the first assignment
+    issue = await update_issue_fields(
+        run_id,
+        current_user["id"],
+        issue_id,
+        fields,
+        stamp_assigned_at=bool(update_data.assigned_to)
+    )
+    
+    if issue:
+        return issue_from_doc(issue)
+    
     run = await db.analysis_runs.find_one({
         "_id": ObjectId(run_id),
         "user_id": ObjectId(current_user["id"])
-    })
+    }, {"_id": 1})
     
     if not run:
         raise HTTPException(
@@ -341,76 +527,88 @@ async def update_issue(
             detail="Analysis run not found"
         )
     
-    # Find and update the issue
-    updated = False
-    for result in run.get("results", []):
-        for issue in result.get("issues", []):
-            if issue["id"] == issue_id:
-                if update_data.status:
-                    issue["status"] = update_data.status
-                if update_data.assigned_to:
-                    issue["assignedTo"] = update_data.assigned_to
-                    # Only set assignedAt if it's not already set (first assignment)
-                    if "assignedAt" not in issue or issue["assignedAt"] is None:
-                        issue["assignedAt"] = datetime.utcnow()
-                if update_data.google_doc_url:
-                    issue["googleDocUrl"] = update_data.google_doc_url
-                if update_data.due_date:
-                    issue["dueDate"] = update_data.due_date
-                updated = True
-                break
-        if updated:
-            break
-    
-    if not updated:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Issue not found"
-        )
-    
-    # Save updated run
-    await db.analysis_runs.update_one(
-        {"_id": ObjectId(run_id)},
-        {"$set": {"results": run["results"]}}
-    )
-    
-    # Return updated issue
-    for result in run["results"]:
-        for issue in result.get("issues", []):
-            if issue["id"] == issue_id:
-                return issue
-    
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail="Issue not found"
     )
 
 
+# API sort names for the issue query, mapped to analysis_issues fields
+ISSUE_SORT_FIELDS = {
+    "created": "_id",
+    "dueDate": "dueDate",
+    "assignedAt": "assignedAt",
+    "confidence": "confidence",
+    "status": "status",
+    "url": "url"
+}
+
+
 @router.get("/issues")
 async def get_all_issues(
-    status: str = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    exclude_status: Optional[str] = Query(None, alias="excludeStatus"),
+    assigned_to: Optional[str] = Query(None, alias="assignedTo"),
+    due_after: Optional[datetime] = Query(None, alias="dueAfter"),
+    due_before: Optional[datetime] = Query(None, alias="dueBefore"),
+    url: Optional[str] = None,
+    run_id: Optional[str] = Query(None, alias="runId"),
+    sort: Optional[str] = None,
+    limit: int = Query(settings.issue_page_size, ge=1, le=settings.issue_page_max),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Get all issues across all runs"""
-    db = get_database()
+    """
+    Query issues across all runs. status and excludeStatus accept
+    comma-separated lists, sort is a field name optionally prefixed with "-"
+    for descending order, and nextCursor in the response fetches the
+    following page.
+    """
+    if run_id is not None and not ObjectId.is_valid(run_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid run id"
+        )
     
-    cursor = db.analysis_runs.find(
-        {"user_id": ObjectId(current_user["id"])}
-    )
+    try:
+        sort_field, direction = parse_sort(sort, ISSUE_SORT_FIELDS, "created")
+        docs, next_cursor = await query_issues(
+            current_user["id"],
+            status=[s.strip() for s in status_filter.split(",") if s.strip()] if status_filter else None,
+            exclude_status=[s.strip() for s in exclude_status.split(",") if s.strip()] if exclude_status else None,
+            assigned_to=assigned_to,
+            due_after=due_after,
+            due_before=due_before,
+            url=url,
+            run_id=run_id,
+            sort_field=sort_field,
+            direction=direction,
+            limit=limit,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
-    all_issues = []
-    async for run in cursor:
-        for result in run.get("results", []):
-            for issue in result.get("issues", []):
-                if status is None or issue.get("status") == status:
-                    all_issues.append({
-                        "runId": str(run["_id"]),
-                        "url": result["url"],
-                        "pageTitle": result["title"],
-                        "issue": issue
-                    })
+    all_issues = [
+        {
+            "runId": str(issue["run_id"]),
+            "url": issue["url"],
+            "pageTitle": issue["page_title"],
+            "issue": issue_from_doc(issue)
+        }
+        for issue in docs
+    ]
     
-    return {"issues": all_issues}
+    return {"issues": all_issues, "nextCursor": next_cursor}
+
+
+@router.get("/issues/summary")
+async def get_issue_summary(current_user: dict = Depends(get_current_user)):
+    """Issue counts by triage state and per writer, without loading the issues"""
+    return await summarize_issues(current_user["id"])
 
 
 @router.post("/manual-task", status_code=status.HTTP_201_CREATED)
@@ -427,35 +625,37 @@ async def create_manual_task(
         "timestamp": datetime.utcnow(),
         "url_count": 0,
         "total_issues": 1,
+        "max_issue_count": 1,
         "status": "completed",
         "domain_context": {
             "description": "Manual Task",
             "entityTypes": "",
             "stalenessRules": ""
-        },
-        "results": [{
-            "url": "",
-            "title": task_data.title,
-            "status": "success",
-            "issueCount": 1,
-            "issues": [{
-                "id": f"task_manual_{ObjectId()}",
-                "description": task_data.title,
-                "flaggedText": "",
-                "reasoning": "Manual task assignment",
-                "status": "in_progress",
-                "assignedTo": task_data.writer_name,
-                "assignedAt": datetime.utcnow(),
-                "googleDocUrl": task_data.google_doc_url,
-                "dueDate": task_data.due_date
-            }]
-        }]
+        }
     }
+    task_results = [{
+        "url": "",
+        "title": task_data.title,
+        "status": "success",
+        "issueCount": 1,
+        "issues": [{
+            "id": f"task_manual_{ObjectId()}",
+            "description": task_data.title,
+            "flaggedText": "",
+            "reasoning": "Manual task assignment",
+            "status": "in_progress",
+            "assignedTo": task_data.writer_name,
+            "assignedAt": datetime.utcnow(),
+            "googleDocUrl": task_data.google_doc_url,
+            "dueDate": task_data.due_date
+        }]
+    }]
     
     result = await db.analysis_runs.insert_one(task_doc)
+    await insert_results(str(result.inserted_id), current_user["id"], task_results)
     
     return {
-        "id": task_doc["results"][0]["issues"][0]["id"],
+        "id": task_results[0]["issues"][0]["id"],
         "title": task_data.title,
         "status": "in_progress",
         "assignedTo": task_data.writer_name,
@@ -481,7 +681,7 @@ async def research_issue(
     run = await db.analysis_runs.find_one({
         "_id": ObjectId(run_id),
         "user_id": ObjectId(current_user["id"])
-    })
+    }, {"domain_context": 1})
     
     if not run:
         raise HTTPException(
@@ -490,14 +690,7 @@ async def research_issue(
         )
     
     # Find the issue
-    issue_data = None
-    for result in run.get("results", []):
-        for issue in result.get("issues", []):
-            if issue["id"] == issue_id:
-                issue_data = issue
-                break
-        if issue_data:
-            break
+    issue_data = await find_issue(run_id, current_user["id"], issue_id)
     
     if not issue_data:
         raise HTTPException(
@@ -542,7 +735,7 @@ async def save_issue_sources(
     run = await db.analysis_runs.find_one({
         "_id": ObjectId(run_id),
         "user_id": ObjectId(current_user["id"])
-    })
+    }, {"_id": 1})
     
     if not run:
         raise HTTPException(
@@ -550,19 +743,13 @@ async def save_issue_sources(
             detail="Analysis run not found"
         )
     
-    # Find and update the issue
-    updated = False
-    for result in run.get("results", []):
-        for issue in result.get("issues", []):
-            if issue["id"] == issue_id:
-                # Convert sources to dict format for storage
-                issue["suggestedSources"] = [
-                    source.dict(by_alias=True) for source in request.sources
-                ]
-                updated = True
-                break
-        if updated:
-            break
+    # Convert sources to dict format for storage
+    updated = await set_issue_sources(
+        run_id,
+        current_user["id"],
+        issue_id,
+        [source.dict(by_alias=True) for source in request.sources]
+    )
     
     if not updated:
         raise HTTPException(
@@ -570,10 +757,4 @@ async def save_issue_sources(
             detail="Issue not found"
         )
     
-    # Save updated run
-    await db.analysis_runs.update_one(
-        {"_id": ObjectId(run_id)},
-        {"$set": {"results": run["results"]}}
-    )
-    
     return {"message": "Sources saved successfully", "count": len(request.sources)}
\ No newline at end of file
@@ -3,14 +3,24 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from models.user import UserCreate, UserResponse, Token, LoginRequest
 from crud.user import create_user, get_user_by_email, verify_password
 from auth.jwt import create_access_token, decode_token
-from auth.dependencies import get_current_user
+from auth.dependencies import get_current_user, invalidate_cached_user
 from crud.token_blacklist import blacklist_token
+from auth.hashing import PasswordHashingBusy
+from config import settings
 from datetime import datetime
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 security = HTTPBearer()
 
 
+def _busy(e: PasswordHashingBusy) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": str(settings.password_hash_retry_after)}
+    )
+
+
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def signup(user_data: UserCreate):
     """Register a new user"""
@@ -26,6 +36,8 @@ async def signup(user_data: UserCreate):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except PasswordHashingBusy as e:
+        raise _busy(e)
 
 
 @router.post("/login", response_model=Token)
@@ -33,7 +45,12 @@ async def login(login_data: LoginRequest):
     """Authenticate user and return JWT token"""
     user = await get_user_by_email(login_data.email)
     
-    if not user or not verify_password(login_data.password, user["password_hash"]):
+    try:
+        password_ok = user is not None and await verify_password(login_data.password, user["password_hash"])
+    except PasswordHashingBusy as e:
+        raise _busy(e)
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -66,9 +83,11 @@ async def logout(
         exp_timestamp = payload.get("exp")
         
         if exp_timestamp:
-            expires_at = datetime.fromtimestamp(exp_timestamp)
+            expires_at = datetime.utcfromtimestamp(exp_timestamp)
             await blacklist_token(token, current_user["id"], expires_at)
         
+        invalidate_cached_user(current_user["id"])
+        
         return {"message": "Logged out successfully"}
     except Exception as e:
         # Even if blacklisting fails, return success for client-side cleanup
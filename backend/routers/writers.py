@@ -13,7 +13,7 @@ async def get_writers(current_user: dict = Depends(get_current_user)):
     """Get list of writers for authenticated user"""
     db = get_database()
     
-    cursor = db.writers.find({"user_id": ObjectId(current_user["id"])})
+    cursor = db.writers.find({"user_id": ObjectId(current_user["id"])}, {"name": 1, "email": 1})
     
     writers = []
     async for writer in cursor:
@@ -0,0 +1,117 @@
+"""
+Split extracted markdown into detection-sized chunks.
+
+Chunks break on heading boundaries (using the headers the extractor found),
+are packed up to a character budget, and carry a small overlap from the
+previous chunk so statements that straddle a boundary keep their context.
+"""
+
+from typing import Dict, List, Optional
+import re
+
+HEADING_LINE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*\s*$')
+PARAGRAPH_BREAK = re.compile(r'\n{2,}')
+
+
+def _heading_texts(headers: Optional[Dict[str, List[str]]]) -> Optional[set]:
+    if not headers:
+        return None
+    return {text.strip() for level in headers.values() for text in level}
+
+
+def split_sections(content: str, headers: Optional[Dict[str, List[str]]] = None) -> List[str]:
+    """
+    Split markdown into sections, each starting at a heading line.
+    When the extractor's headers are given only those headings start a new
+    section; otherwise any markdown heading does.
+    """
+    known = _heading_texts(headers)
+    sections = []
+    current = []
+
+    for line in content.split("\n"):
+        match = HEADING_LINE.match(line)
+        is_boundary = match is not None and (known is None or match.group(2).strip() in known)
+        if is_boundary and any(l.strip() for l in current):
+            sections.append("\n".join(current).strip())
+            current = []
+        current.append(line)
+
+    if any(l.strip() for l in current):
+        sections.append("\n".join(current).strip())
+
+    return sections
+
+
+def _split_oversized(section: str, max_chars: int) -> List[str]:
+    """Break a section larger than the budget on paragraphs, then hard-wrap"""
+    pieces = []
+    current = ""
+    for paragraph in PARAGRAPH_BREAK.split(section):
+        while len(paragraph) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            pieces.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _overlap_tail(text: str, overlap: int) -> str:
+    """Last ~overlap characters of text, starting on a paragraph or line"""
+    if overlap <= 0 or len(text) <= overlap:
+        return ""
+    tail = text[-overlap:]
+    for separator in ("\n\n", "\n", ". "):
+        idx = tail.find(separator)
+        if idx != -1:
+            return tail[idx + len(separator):].strip()
+    return tail.strip()
+
+
+def chunk_content(
+    content: str,
+    headers: Optional[Dict[str, List[str]]] = None,
+    max_chars: int = 8000,
+    overlap: int = 400
+) -> List[str]:
+    """
+    Pack heading-delimited sections into chunks of at most ~max_chars.
+    Every chunk after the first is prefixed with the tail of its predecessor.
+    """
+    if not content:
+        return []
+    if len(content) <= max_chars:
+        return [content]
+
+    body_budget = max(max_chars - overlap, max_chars // 2)
+    sections = []
+    for section in split_sections(content, headers):
+        if len(section) > body_budget:
+            sections.extend(_split_oversized(section, body_budget))
+        else:
+            sections.append(section)
+
+    bodies = []
+    current = ""
+    for section in sections:
+        if current and len(current) + len(section) + 2 > body_budget:
+            bodies.append(current)
+            current = section
+        else:
+            current = f"{current}\n\n{section}" if current else section
+    if current:
+        bodies.append(current)
+
+    chunks = [bodies[0]]
+    for previous, body in zip(bodies, bodies[1:]):
+        tail = _overlap_tail(previous, overlap)
+        chunks.append(f"{tail}\n\n{body}" if tail else body)
+    return chunks
@@ -0,0 +1,102 @@
+"""
+Process-wide client registry for upstream APIs.
+
+Clients are created once in the app lifespan (see main.lifespan) and shared
+by every service, so connection pools and TLS sessions are reused across
+URLs and requests. Getters fall back to creating the client on first use
+for scripts that run outside the FastAPI app.
+"""
+
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient, DEFAULT_CONNECTION_LIMITS
+from concurrent.futures import ThreadPoolExecutor
+from firecrawl import FirecrawlApp
+from config import settings
+import httpx
+import logging
+
+logger = logging.getLogger(__name__)
+
+llm_client = None
+firecrawl_app = None
+firecrawl_executor = None
+http_client = None
+
+
+def get_llm_client() -> AsyncAnthropic:
+    """Shared async Anthropic client with a bounded keep-alive pool"""
+    global llm_client
+    if llm_client is None:
+        # Use the SDK's own Limits type; newer SDKs ship their own httpx build
+        limits_cls = type(DEFAULT_CONNECTION_LIMITS)
+        llm_client = AsyncAnthropic(
+            api_key=settings.claude_api_key,
+            timeout=settings.llm_timeout,
+            # Retries and backoff are handled by services/rate_limit.py
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(
+                limits=limits_cls(
+                    max_connections=settings.llm_max_connections,
+                    max_keepalive_connections=settings.llm_max_connections
+                )
+            )
+        )
+    return llm_client
+
+
+def get_firecrawl_app() -> FirecrawlApp:
+    """Shared Firecrawl SDK client"""
+    global firecrawl_app
+    if firecrawl_app is None:
+        firecrawl_app = FirecrawlApp(api_key=settings.firecrawl_api_key)
+    return firecrawl_app
+
+
+def get_firecrawl_executor() -> ThreadPoolExecutor:
+    """
+    Dedicated thread pool for the synchronous Firecrawl SDK.
+    Keeps scrapes off the default executor and caps how many run at once.
+    """
+    global firecrawl_executor
+    if firecrawl_executor is None:
+        firecrawl_executor = ThreadPoolExecutor(
+            max_workers=settings.firecrawl_pool_size,
+            thread_name_prefix="firecrawl"
+        )
+    return firecrawl_executor
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared general-purpose HTTP client (Perplexity, sitemaps, ...)"""
+    global http_client
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.http_timeout, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections,
+                max_keepalive_connections=settings.http_max_connections
+            )
+        )
+    return http_client
+
+
+async def init_clients():
+    get_llm_client()
+    get_firecrawl_app()
+    get_firecrawl_executor()
+    get_http_client()
+    logger.info("Initialized upstream API clients")
+
+
+async def close_clients():
+    global llm_client, firecrawl_app, firecrawl_executor, http_client
+    if llm_client:
+        await llm_client.close()
+        llm_client = None
+    if http_client:
+        await http_client.aclose()
+        http_client = None
+    if firecrawl_executor:
+        firecrawl_executor.shutdown(wait=False, cancel_futures=True)
+        firecrawl_executor = None
+    firecrawl_app = None
+    logger.info("Closed upstream API clients")
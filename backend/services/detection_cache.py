@@ -0,0 +1,119 @@
+"""
+Memoization of validated detection results.
+
+A detection is keyed by a hash of everything that shapes the Claude prompt:
+the analyzed content, the domain context and the current date bucket. Re-running
+an audit on an unchanged page then reuses the validated issues instead of paying
+for another LLM round trip. Entries live in a bounded in-process LRU backed by the
+`detection_cache` MongoDB collection.
+"""
+
+from config import settings
+from database import get_database
+from utils.cache import TTLCache
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+import hashlib
+import json
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Per-run fields that must not be carried over between runs
+RUN_SPECIFIC_FIELDS = ("id", "status", "assignedTo", "assignedAt", "googleDocUrl", "dueDate", "suggestedSources")
+
+_memory_cache = TTLCache(
+    max_entries=settings.detection_cache_max_entries,
+    default_ttl=settings.detection_cache_ttl
+)
+
+
+def detection_cache_stats() -> dict:
+    return _memory_cache.stats()
+
+
+def date_bucket(today: Optional[date] = None) -> str:
+    """Coarse date used in the memo key; the prompt embeds the current date"""
+    today = today or datetime.now().date()
+    days = max(settings.detection_cache_bucket_days, 1)
+    return str(today.toordinal() // days)
+
+
+def detection_memo_key(content: str, domain_context: dict, model: str, today: Optional[date] = None) -> str:
+    payload = json.dumps(
+        {
+            "model": model,
+            "content": hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            "description": domain_context.get("description", ""),
+            "entityTypes": domain_context.get("entityTypes", ""),
+            "stalenessRules": domain_context.get("stalenessRules", ""),
+            "dateBucket": date_bucket(today)
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _strip_run_fields(issues: List[dict]) -> List[dict]:
+    return [
+        {k: v for k, v in issue.items() if k not in RUN_SPECIFIC_FIELDS}
+        for issue in issues
+    ]
+
+
+def _hydrate(issues: List[dict]) -> List[dict]:
+    """Give memoized issues fresh ids so they can be tracked per run"""
+    return [
+        {"id": f"issue_{uuid.uuid4().hex[:8]}", **issue, "status": "open"}
+        for issue in issues
+    ]
+
+
+async def get_memoized_issues(key: str) -> Optional[List[dict]]:
+    """Return validated issues for a previous identical detection, or None"""
+    issues = _memory_cache.get(key)
+    if issues is not None:
+        return _hydrate(issues)
+
+    try:
+        db = get_database()
+        now = datetime.utcnow()
+        doc = await db.detection_cache.find_one({
+            "_id": key,
+            "expires_at": {"$gt": now}
+        })
+    except Exception as e:
+        logger.warning("Detection memo lookup failed: %s", str(e))
+        return None
+
+    if not doc:
+        return None
+
+    issues = doc["issues"]
+    _memory_cache.set(key, issues, ttl=(doc["expires_at"] - now).total_seconds())
+    return _hydrate(issues)
+
+
+async def memoize_issues(key: str, issues: List[dict]) -> None:
+    """Store validated issues for reuse by later identical detections"""
+    if settings.detection_cache_ttl <= 0:
+        return
+
+    stored = _strip_run_fields(issues)
+    _memory_cache.set(key, stored)
+
+    try:
+        db = get_database()
+        now = datetime.utcnow()
+        await db.detection_cache.replace_one(
+            {"_id": key},
+            {
+                "issues": stored,
+                "cached_at": now,
+                "expires_at": now + timedelta(seconds=settings.detection_cache_ttl)
+            },
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning("Failed to persist detection memo: %s", str(e))
@@ -1,10 +1,89 @@
-from anthropic import Anthropic
 from config import settings
+from services.clients import get_llm_client
+from services.rate_limit import limited_call
+from services.chunking import chunk_content, HEADING_LINE, PARAGRAPH_BREAK
+from services.detection_cache import detection_memo_key, get_memoized_issues, memoize_issues
+from utils.telemetry import span, record_tokens, add_to_profile
 from datetime import datetime
+from typing import List, Optional
+import asyncio
+import bisect
 import json
+import logging
 import uuid
 import re
 
+DETECTION_MODEL = "claude-3-haiku-20240307"
+
+logger = logging.getLogger(__name__)
+
+
+# Validator patterns are compiled once at import. Each validator is a single
+# alternation with one named group per rule, so a text is checked in one pass.
+# Case-insensitive rules are written in lowercase and run against text.lower(),
+# and start with a first-character lookahead: CPython's re can then skip
+# positions where no rule could begin instead of trying every branch there.
+
+HEADING_PATTERN = re.compile(
+    r'(?P<title_case>[A-Z][a-zA-Z\s\-]+$)'  # Title Case Without Punctuation
+    r'|(?P<markdown>#+\s+)'  # Markdown heading
+    r'|(?P<all_caps>[A-Z\s]+$)'  # ALL CAPS
+    r'|(?P<proper_title>[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$)'  # Proper Title Case
+)
+
+HEADING_PUNCTUATION = re.compile(r'[.!?,;:]')
+
+TEMPORAL_MARKER_PATTERN = re.compile(
+    r'(?=[0-9a-z])(?:'
+    r'(?P<year>\b\d{4}\b)'  # Year (2023, 2024)
+    r'|(?P<full_date>\b(?:january|february|march|april|may|june|july|august|september|october|november|december)\s+\d{1,2},?\s+\d{4}\b)'  # Full date
+    r'|(?P<abbreviated_date>\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\.?\s+\d{1,2},?\s+\d{4}\b)'  # Abbreviated date
+    r'|(?P<numeric_date>\b\d{1,2}/\d{1,2}/\d{2,4}\b)'  # Numeric date (MM/DD/YYYY)
+    r'|(?P<percentage>\b\d+\.?\d*%\b)'  # Percentage (statistic)
+    r'|(?P<relative_time>\b\d+\s+(?:months?|years?|days?|weeks?)\s+ago\b)'  # Relative time
+    r'|(?P<quarter>\b(?:q[1-4]|quarter)\s+\d{4}\b)'  # Quarter reference
+    r'|(?P<temporal_preposition>\b(?:as of|since|from|until|through)\s+\d{4}\b)'  # Temporal prepositions with years
+    r'|(?P<temporal_qualifier>\b(?:early|mid|late)\s+\d{4}\b)'  # Temporal qualifiers with years
+    r')'
+)
+
+EVIDENCE_PATTERN = re.compile(
+    r'(?=[acft])(?:'
+    r'(?P<found_date>found date:)'
+    r'|(?P<current_date>current date:)'
+    r'|(?P<age>age:)'
+    r'|(?P<threshold>threshold:)'
+    r')'
+)
+
+# The numeric rules capture their value inside a lookahead, so the only text a
+# match consumes is "confidence:" or "N% " and it cannot hide a higher-priority
+# rule starting inside it. One scan then finds the first match of every rule.
+CONFIDENCE_PATTERN = re.compile(
+    r'(?=[0-9acefilmpsu])(?:'
+    r'(?P<percent>confidence[:\s]+(?=(?P<percent_value>\d+)%))'
+    r'|(?P<confident>(?P<confident_value>\d+)%\s+(?=confident))'
+    r'|(?P<decimal>confidence[:\s]+(?=(?P<decimal_value>\d+\.\d+)))'
+    r'|(?P<high>explicit date|clearly states|specifically mentions|found date:)'
+    r'|(?P<low>possibly|may be|might be|unclear|ambiguous)'
+    r'|(?P<medium>inferred|appears to|suggests|likely)'
+    r')'
+)
+
+# Explicit values in priority order, then the language-based fallbacks
+CONFIDENCE_VALUE_GROUPS = (
+    ("percent", "percent_value"),
+    ("confident", "confident_value"),
+    ("decimal", "decimal_value"),
+)
+CONFIDENCE_PHRASE_SCORES = (("high", 0.9), ("low", 0.4), ("medium", 0.6))
+
+CONTRADICTION_PATTERN = re.compile(
+    r"should not be flagged|should not flag|is valid for|is current|not stale|do not flag|don't flag",
+    re.IGNORECASE
+)
+
+
 def is_heading_only(text: str) -> bool:
     """
     Detect if text is just a heading/title without specific content.
@@ -15,23 +94,13 @@ def is_heading_only(text: str) -> bool:
     
     text = text.strip()
     
-    # Check for heading patterns
-    heading_patterns = [
-        r'^[A-Z][a-zA-Z\s\-]+$',  # Title Case Without Punctuation
-        r'^#+\s+',  # Markdown heading
-        r'^[A-Z\s]+$',  # ALL CAPS
-        r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',  # Proper Title Case
-    ]
-    
     # Headings are typically short (6 words or less)
     word_count = len(text.split())
-    if word_count <= 6:
-        for pattern in heading_patterns:
-            if re.match(pattern, text):
-                return True
+    if word_count <= 6 and HEADING_PATTERN.match(text):
+        return True
     
     # Check if it's just a section title without punctuation
-    if word_count <= 8 and not any(char in text for char in '.!?,;:'):
+    if word_count <= 8 and not HEADING_PUNCTUATION.search(text):
         # Likely a heading if it's short and has no punctuation
         return True
     
@@ -46,23 +115,7 @@ def contains_temporal_marker(text: str) -> bool:
     if not text:
         return False
     
-    temporal_patterns = [
-        r'\b\d{4}\b',  # Year (2023, 2024)
-        r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}\b',  # Full date
-        r'\b(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\.?\s+\d{1,2},?\s+\d{4}\b',  # Abbreviated date
-        r'\b\d{1,2}/\d{1,2}/\d{2,4}\b',  # Numeric date (MM/DD/YYYY)
-        r'\b\d+\.?\d*%\b',  # Percentage (statistic)
-        r'\b\d+\s+(months?|years?|days?|weeks?)\s+ago\b',  # Relative time
-        r'\b(Q[1-4]|quarter)\s+\d{4}\b',  # Quarter reference
-        r'\b(as of|since|from|until|through)\s+\d{4}\b',  # Temporal prepositions with years
-        r'\b(early|mid|late)\s+\d{4}\b',  # Temporal qualifiers with years
-    ]
-    
-    for pattern in temporal_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return True
-    
-    return False
+    return TEMPORAL_MARKER_PATTERN.search(text.lower()) is not None
 
 
 def has_structured_evidence(reasoning: str) -> bool:
@@ -73,18 +126,15 @@ def has_structured_evidence(reasoning: str) -> bool:
     if not reasoning:
         return False
     
-    required_elements = [
-        r'Found Date:',
-        r'Current Date:',
-        r'Age:',
-        r'Threshold:'
-    ]
-    
-    # Count how many required elements are present
-    matches = sum(1 for elem in required_elements if re.search(elem, reasoning, re.IGNORECASE))
+    # Count how many distinct required elements are present
+    found = set()
+    for match in EVIDENCE_PATTERN.finditer(reasoning.lower()):
+        found.add(match.lastgroup)
+        # Require at least 3 of 4 elements for structured evidence
+        if len(found) >= 3:
+            return True
     
-    # Require at least 3 of 4 elements for structured evidence
-    return matches >= 3
+    return False
 
 
 def extract_confidence_from_reasoning(reasoning: str) -> float:
@@ -95,65 +145,79 @@ def extract_confidence_from_reasoning(reasoning: str) -> float:
     if not reasoning:
         return 0.5
     
-    # Look for explicit confidence mentions
-    confidence_patterns = [
-        r'confidence[:\s]+(\d+)%',
-        r'(\d+)%\s+confident',
-        r'confidence[:\s]+(\d+\.\d+)',
-    ]
+    # First match of each rule, in document order
+    first_matches = {}
+    for match in CONFIDENCE_PATTERN.finditer(reasoning.lower()):
+        rule = match.lastgroup
+        if rule not in first_matches:
+            first_matches[rule] = match
+        # Nothing can outrank an explicit "confidence: N%"
+        if rule == "percent":
+            break
     
-    for pattern in confidence_patterns:
-        match = re.search(pattern, reasoning, re.IGNORECASE)
-        if match:
-            value = float(match.group(1))
+    # Explicit confidence mentions win over language cues
+    for group, value_group in CONFIDENCE_VALUE_GROUPS:
+        if group in first_matches:
+            value = float(first_matches[group].group(value_group))
             # Convert percentage to decimal if needed
             if value > 1.0:
                 value = value / 100.0
             return min(max(value, 0.0), 1.0)  # Clamp between 0 and 1
     
     # Assess confidence based on language used
-    high_confidence_phrases = ['explicit date', 'clearly states', 'specifically mentions', 'found date:']
-    medium_confidence_phrases = ['inferred', 'appears to', 'suggests', 'likely']
-    low_confidence_phrases = ['possibly', 'may be', 'might be', 'unclear', 'ambiguous']
-    
-    reasoning_lower = reasoning.lower()
-    
-    if any(phrase in reasoning_lower for phrase in high_confidence_phrases):
-        return 0.9
-    elif any(phrase in reasoning_lower for phrase in low_confidence_phrases):
-        return 0.4
-    elif any(phrase in reasoning_lower for phrase in medium_confidence_phrases):
-        return 0.6
+    for group, score in CONFIDENCE_PHRASE_SCORES:
+        if group in first_matches:
+            return score
     
     # Default medium confidence if no indicators found
     return 0.5
 
 
-
-async def detect_stale_content(url: str, content: str, domain_context: dict) -> dict:
+def select_temporal_windows(content: str, context_paragraphs: int = 1) -> str:
     """
-    Analyze content for factual decay using Claude API
-    Returns dict with issues array
+    Keep only the parts of the page that can contain stale facts.
+    Paragraphs with a temporal marker are kept together with
+    `context_paragraphs` neighbours on each side, the nearest heading above
+    each window and the page title, so dates can still be resolved.
+    Returns an empty string when the page has no dated content at all.
     """
-    print(f"[DEBUG] detect_stale_content called for {url}")
-    print(f"[DEBUG] Content length: {len(content)}")
-    print(f"[DEBUG] Domain context: {domain_context}")
+    paragraphs = [p for p in PARAGRAPH_BREAK.split(content) if p.strip()]
+    marked = [i for i, paragraph in enumerate(paragraphs) if contains_temporal_marker(paragraph)]
+    if not marked:
+        return ""
     
-    try:
-        print(f"[DEBUG] Initializing Claude client...")
-        client = Anthropic(api_key=settings.claude_api_key)
-        
-        # Get staleness rules from user configuration
-        staleness_rules = domain_context.get('stalenessRules', '')
-        
-        current_date = datetime.now().strftime("%B %d, %Y")
-        current_year = datetime.now().year
-        
-        # Construct prompt
-        content_preview = content[:8000] if len(content) > 8000 else content
-        print(f"[DEBUG] Sending {len(content_preview)} chars to Claude (out of {len(content)} total)")
-        
-        prompt = f"""You are a content auditor specializing in temporal accuracy and stale information detection.
+    selected = set()
+    for i in marked:
+        selected.update(range(max(i - context_paragraphs, 0), min(i + context_paragraphs + 1, len(paragraphs))))
+    
+    headings = [i for i, paragraph in enumerate(paragraphs) if HEADING_LINE.match(paragraph)]
+    if headings and paragraphs[headings[0]].startswith("# "):
+        selected.add(headings[0])
+    for i in list(selected):
+        idx = bisect.bisect_right(headings, i)
+        if idx:
+            selected.add(headings[idx - 1])
+    
+    windows = []
+    previous = None
+    for i in sorted(selected):
+        if previous is not None and i != previous + 1:
+            windows.append("...")
+        windows.append(paragraphs[i])
+        previous = i
+    
+    return "\n\n".join(windows)
+
+
+def build_detection_prompt(content: str, domain_context: dict) -> str:
+    """Build the Claude staleness-audit prompt for one piece of page content"""
+    # Get staleness rules from user configuration
+    staleness_rules = domain_context.get('stalenessRules', '')
+    
+    current_date = datetime.now().strftime("%B %d, %Y")
+    current_year = datetime.now().year
+    
+    return f"""You are a content auditor specializing in temporal accuracy and stale information detection.
 
 CRITICAL VALIDATION REQUIREMENTS:
 
@@ -233,7 +297,7 @@ Domain Context:
 - Staleness Rules: {staleness_rules}
 
 Content to Analyze:
-{content_preview}
+{content}
 
 CRITICAL RULES:
 - If you see "November" and the year is {current_year} or later, that is NEW content. DO NOT FLAG IT.
@@ -257,128 +321,232 @@ If no stale information is found, return an empty array: []
 IMPORTANT: Return ONLY valid JSON. Do not include any explanatory text before or after the JSON array.
 """
 
-        # Call Claude API
-        print(f"[DEBUG] Calling Claude API...")
-        print(f"[DEBUG] Prompt length: {len(prompt)}")
-        message = client.messages.create(
-            model="claude-3-haiku-20240307",
+
+def validate_issues(issues_data: list) -> list:
+    """
+    Apply the false-positive validators to raw issues returned by Claude.
+    Returns accepted issues with ids and confidence metadata.
+    """
+    issues = []
+    for issue in issues_data:
+        flagged_text = issue.get("flaggedText", "")
+        reasoning = issue.get("reasoning", "")
+        description = issue.get("description", "")
+        
+        # Validate: Check if reasoning contradicts the flag
+        if CONTRADICTION_PATTERN.search(reasoning):
+            logger.debug("Rejected issue (contradictory reasoning): %s", description)
+            continue
+        
+        # NEW VALIDATION 1: Reject if flaggedText is just a heading
+        if is_heading_only(flagged_text):
+            logger.debug("Rejected issue (heading only): %s", description)
+            continue
+        
+        # NEW VALIDATION 2: Require specific temporal markers in flaggedText
+        if not contains_temporal_marker(flagged_text):
+            logger.debug("Rejected issue (no temporal marker): %s", description)
+            continue
+        
+        # NEW VALIDATION 3: Require structured evidence in reasoning
+        if not has_structured_evidence(reasoning):
+            logger.debug("Rejected issue (no structured evidence): %s", description)
+            continue
+        
+        # NEW VALIDATION 4: Check confidence level
+        confidence_score = extract_confidence_from_reasoning(reasoning)
+        if confidence_score < 0.7:
+            logger.debug("Rejected issue (confidence %.2f): %s", confidence_score, description)
+            continue
+        
+        # All validations passed - add issue with confidence metadata
+        issues.append({
+            "id": f"issue_{uuid.uuid4().hex[:8]}",
+            "description": description,
+            "flaggedText": flagged_text,
+            "contextExcerpt": issue.get("contextExcerpt", ""),
+            "reasoning": reasoning,
+            "confidence": confidence_score,
+            "status": "open"
+        })
+    
+    return issues
+
+
+def _normalize_text(text: str) -> str:
+    """Lowercase, markdown-emphasis-free, whitespace-collapsed text for comparisons"""
+    return re.sub(r'[\s*_`]+', ' ', text).strip().lower()
+
+
+def _shared_overlap(previous: str, chunk: str) -> int:
+    """
+    Length of the prefix of chunk copied from the end of previous (the
+    overlap chunk_content adds), in normalized text; 0 if there is none
+    """
+    shared = 0
+    boundary = chunk.find(" ")
+    while boundary != -1 and boundary <= len(previous):
+        if previous.endswith(chunk[:boundary]):
+            shared = boundary
+        boundary = chunk.find(" ", boundary + 1)
+    return shared
+
+
+def merge_issues(issue_lists: List[list], chunks: List[str]) -> list:
+    """
+    Merge per-chunk issues (issue_lists[i] found in chunks[i]) into one list
+    in document order. An issue flagged twice because its text sits in the
+    overlap between adjacent chunks keeps the higher-confidence copy; the
+    same phrase flagged in different places stays separate issues.
+    """
+    normalized = [_normalize_text(chunk) for chunk in chunks]
+    merged = {}
+    unplaced = {}
+    start = 0
+    for i, (issues, chunk) in enumerate(zip(issue_lists, normalized)):
+        if i:
+            start += len(normalized[i - 1]) - _shared_overlap(normalized[i - 1], chunk)
+        search_from = {}
+        for issue in issues:
+            text = _normalize_text(issue.get("flaggedText", ""))
+            idx = chunk.find(text, search_from.get(text, 0)) if text else -1
+            if idx == -1:
+                # Not quoted verbatim, so occurrences cannot be told apart
+                key, target = text, unplaced
+            else:
+                # Repeats of a phrase within one chunk are successive occurrences
+                search_from[text] = idx + 1
+                key, target = (start + idx, text), merged
+            existing = target.get(key)
+            if existing is None or issue.get("confidence", 0) > existing.get("confidence", 0):
+                target[key] = issue
+    
+    return [merged[key] for key in sorted(merged)] + list(unplaced.values())
+
+
+async def analyze_chunk(url: str, chunk: str, domain_context: dict, force_refresh: bool = False) -> list:
+    """
+    Run one chunk through Claude (or the memo) and return validated issues.
+    force_refresh skips the memo lookup; the fresh result still replaces it.
+    """
+    # Reuse validated issues if this exact content was analyzed under the same context
+    memo_key = detection_memo_key(chunk, domain_context, DETECTION_MODEL)
+    if not force_refresh:
+        memoized = await get_memoized_issues(memo_key)
+        if memoized is not None:
+            logger.debug("Detection memo hit for %s: %d issues", url, len(memoized))
+            return memoized
+    
+    prompt = build_detection_prompt(chunk, domain_context)
+    
+    # Call Claude API
+    with span("llm"):
+        message = await limited_call("claude", lambda: get_llm_client().messages.create(
+            model=DETECTION_MODEL,
             max_tokens=2000,
             messages=[
                 {"role": "user", "content": prompt}
             ]
+        ))
+    record_tokens("claude", DETECTION_MODEL, message.usage.input_tokens, message.usage.output_tokens)
+    
+    # Parse response
+    response_text = message.content[0].text.strip()
+    add_to_profile(chunks=1, prompt_chars=len(prompt), response_chars=len(response_text))
+    
+    # Extract JSON from response
+    try:
+        # Try to find JSON array in response
+        start_idx = response_text.find('[')
+        end_idx = response_text.rfind(']') + 1
+        
+        if start_idx != -1 and end_idx > start_idx:
+            json_str = response_text[start_idx:end_idx]
+            issues_data = json.loads(json_str)
+        else:
+            logger.debug("No JSON array in Claude response for %s", url)
+            issues_data = []
+    except json.JSONDecodeError as e:
+        # Not memoized: the chunk counts as failed rather than clean
+        raise ValueError(f"Could not parse Claude response: {str(e)}")
+    
+    with span("validate"):
+        issues = validate_issues(issues_data)
+    await memoize_issues(memo_key, issues)
+    return issues
+
+
+async def detect_stale_content(
+    url: str,
+    content: str,
+    domain_context: dict,
+    headers: Optional[dict] = None,
+    force_refresh: bool = False
+) -> dict:
+    """
+    Analyze content for factual decay using Claude API.
+    Long pages are split on heading boundaries and the chunks analyzed in
+    parallel, so the whole document is covered.
+    Returns dict with issues array; status is "partial" when some chunks
+    failed (counted in failed_chunks) and "failed" when all of them did.
+    """
+    try:
+        analyzed = content
+        if settings.detection_prefilter:
+            analyzed = select_temporal_windows(content, settings.detection_prefilter_context)
+            if not analyzed:
+                logger.debug("No temporal markers in %s; skipping Claude", url)
+                return {
+                    "status": "success",
+                    "issues": [],
+                    "issue_count": 0
+                }
+            logger.debug("Temporal pre-filter kept %d of %d chars for %s", len(analyzed), len(content), url)
+        
+        chunks = chunk_content(
+            analyzed,
+            headers,
+            max_chars=settings.detection_chunk_chars,
+            overlap=settings.detection_chunk_overlap
         )
-        print(f"[DEBUG] Claude API call successful")
+        if len(chunks) > settings.detection_max_chunks:
+            logger.warning("%s produced %d chunks; analyzing the first %d", url, len(chunks), settings.detection_max_chunks)
+            chunks = chunks[:settings.detection_max_chunks]
+        logger.debug("Analyzing %d chunk(s) for %s", len(chunks), url)
         
-        # Parse response
-        response_text = message.content[0].text.strip()
+        chunk_limit = asyncio.Semaphore(settings.detection_chunk_concurrency)
         
-        # Debug logging
-        print(f"[DEBUG] Claude API Response for {url}:")
-        print(f"[DEBUG] Response length: {len(response_text)}")
-        print(f"[DEBUG] First 500 chars: {response_text[:500]}")
+        async def run_chunk(chunk: str) -> list:
+            async with chunk_limit:
+                return await analyze_chunk(url, chunk, domain_context, force_refresh)
         
-        # Extract JSON from response
-        try:
-            # Try to find JSON array in response
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']') + 1
-            
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                print(f"[DEBUG] Extracted JSON: {json_str[:500]}")
-                issues_data = json.loads(json_str)
-                print(f"[DEBUG] Parsed {len(issues_data)} issues")
-            else:
-                print(f"[DEBUG] No JSON array found in response")
-                issues_data = []
-            
-            # Add unique IDs to issues with enhanced validation
-            issues = []
-            for issue in issues_data:
-                flagged_text = issue.get("flaggedText", "")
-                reasoning = issue.get("reasoning", "")
-                description = issue.get("description", "")
-                
-                # Validate: Check if reasoning contradicts the flag
-                reasoning_lower = reasoning.lower()
-                contradictory_phrases = [
-                    "should not be flagged",
-                    "should not flag",
-                    "is valid for",
-                    "is current",
-                    "not stale",
-                    "do not flag",
-                    "don't flag"
-                ]
-                
-                if any(phrase in reasoning_lower for phrase in contradictory_phrases):
-                    print(f"[VALIDATION] Rejected - Contradictory reasoning: {description}")
-                    print(f"[VALIDATION] Reasoning: {reasoning}")
-                    continue
-                
-                # NEW VALIDATION 1: Reject if flaggedText is just a heading
-                if is_heading_only(flagged_text):
-                    print(f"[VALIDATION] Rejected - flaggedText is heading only: '{flagged_text}'")
-                    print(f"[VALIDATION] Issue description: {description}")
-                    continue
-                
-                # NEW VALIDATION 2: Require specific temporal markers in flaggedText
-                if not contains_temporal_marker(flagged_text):
-                    print(f"[VALIDATION] Rejected - No temporal marker in flaggedText: '{flagged_text}'")
-                    print(f"[VALIDATION] Issue description: {description}")
-                    continue
-                
-                # NEW VALIDATION 3: Require structured evidence in reasoning
-                if not has_structured_evidence(reasoning):
-                    print(f"[VALIDATION] Rejected - Reasoning lacks structured evidence")
-                    print(f"[VALIDATION] Reasoning: {reasoning[:200]}...")
-                    continue
-                
-                # NEW VALIDATION 4: Check confidence level
-                confidence_score = extract_confidence_from_reasoning(reasoning)
-                if confidence_score < 0.7:
-                    print(f"[VALIDATION] Rejected - Low confidence: {confidence_score:.2f}")
-                    print(f"[VALIDATION] Issue description: {description}")
-                    continue
-                
-                # All validations passed - add issue with confidence metadata
-                print(f"[VALIDATION] ✓ Accepted issue: {description}")
-                print(f"[VALIDATION] Confidence: {confidence_score:.2f}")
-                print(f"[VALIDATION] Flagged text: {flagged_text[:100]}...")
-                
-                issues.append({
-                    "id": f"issue_{uuid.uuid4().hex[:8]}",
-                    "description": description,
-                    "flaggedText": flagged_text,
-                    "contextExcerpt": issue.get("contextExcerpt", ""),
-                    "reasoning": reasoning,
-                    "confidence": confidence_score,
-                    "status": "open"
-                })
-            
-            return {
-                "status": "success",
-                "issues": issues,
-                "issue_count": len(issues)
-            }
-            
-        except json.JSONDecodeError as e:
-            # If JSON parsing fails, return empty issues
-            print(f"[DEBUG] JSON decode error: {str(e)}")
-            print(f"[DEBUG] Full response: {response_text}")
-            return {
-                "status": "success",
-                "issues": [],
-                "issue_count": 0
-            }
+        outcomes = await asyncio.gather(*[run_chunk(chunk) for chunk in chunks], return_exceptions=True)
+        
+        failures = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if failures and len(failures) == len(outcomes):
+            raise failures[0]
+        for failure in failures:
+            logger.error("Chunk analysis failed for %s: %s: %s", url, type(failure).__name__, str(failure))
+        
+        issues = merge_issues(
+            [[] if isinstance(outcome, BaseException) else outcome for outcome in outcomes],
+            chunks
+        )
+        
+        # Failed chunks were never memoized, so a re-run analyzes just those
+        return {
+            "status": "partial" if failures else "success",
+            "issues": issues,
+            "issue_count": len(issues),
+            "failed_chunks": len(failures),
+            "chunk_count": len(chunks)
+        }
             
     except Exception as e:
-        print(f"[ERROR] Exception in detect_stale_content: {type(e).__name__}: {str(e)}")
-        import traceback
-        print(f"[ERROR] Traceback: {traceback.format_exc()}")
+        logger.exception("Detection failed for %s", url)
         return {
             "status": "failed",
             "error": f"Analysis failed: {str(e)}",
             "issues": [],
             "issue_count": 0
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,242 @@
+"""
+Streaming exports of analysis runs.
+
+Exporters are async generators that read from a cursor and yield the file
+piece by piece, so memory use stays flat however large the export is and the
+first bytes go out as soon as the first document is read.
+
+CSV has one row per URL with issues packed into text columns. NDJSON, Parquet
+and Arrow (IPC stream) have one row per issue with typed columns, for loading
+into analytics tools. Parquet and Arrow need the optional pyarrow package.
+"""
+
+from database import get_database
+from crud.analysis import iter_run_results, max_issue_count
+from utils.text_processing import format_issue_with_reason_for_csv
+from typing import AsyncIterator, List, Optional
+import csv
+import io
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow exports are optional
+    pa = None
+    pq = None
+
+CSV_BASE_HEADERS = ["URL", "Page Title", "Meta Title", "Meta Description", "H1", "H2", "H3", "H4", "Status", "Issue Count"]
+
+# Flush the CSV buffer once it holds roughly this many characters
+CSV_CHUNK_CHARS = 64 * 1024
+
+# Issue rows per NDJSON chunk / Parquet row group / Arrow record batch
+ROWS_PER_BATCH = 5000
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+
+# Storage field of analysis_issues -> exported column, for one-row-per-issue formats
+ISSUE_COLUMNS = [
+    ("run_id", "runId"),
+    ("url", "url"),
+    ("page_title", "pageTitle"),
+    ("result_position", "resultPosition"),
+    ("position", "issuePosition"),
+    ("id", "issueId"),
+    ("description", "description"),
+    ("flaggedText", "flaggedText"),
+    ("contextExcerpt", "contextExcerpt"),
+    ("reasoning", "reasoning"),
+    ("confidence", "confidence"),
+    ("status", "status"),
+    ("assignedTo", "assignedTo"),
+    ("assignedAt", "assignedAt"),
+    ("completedAt", "completedAt"),
+    ("dueDate", "dueDate"),
+    ("googleDocUrl", "googleDocUrl"),
+]
+
+
+async def issue_column_count(run: dict, urls: Optional[List[str]] = None) -> int:
+    """
+    Number of "Issue N" columns for a CSV export. Whole-run exports use the
+    max_issue_count kept on the run; URL subsets and older runs without it
+    are computed with an aggregation (and older runs then store the value).
+    """
+    if urls is None and "max_issue_count" in run:
+        return run["max_issue_count"]
+
+    count = await max_issue_count(str(run["_id"]), urls)
+    if urls is None and run.get("status") != "processing":
+        db = get_database()
+        await db.analysis_runs.update_one({"_id": run["_id"]}, {"$max": {"max_issue_count": count}})
+    return count
+
+
+def _csv_row(result: dict, issue_columns: int) -> list:
+    issues = result.get("issues", [])
+
+    row = [
+        result["url"],
+        result["title"],
+        result.get("metaTitle", ""),
+        result.get("metaDescription", ""),
+        # Join multiple headers with " | " separator
+        " | ".join(result.get("h1s", [])),
+        " | ".join(result.get("h2s", [])),
+        " | ".join(result.get("h3s", [])),
+        " | ".join(result.get("h4s", [])),
+        result["status"],
+        result["issueCount"]
+    ]
+
+    # Each issue (with its reason) in its own column; empty for URLs with fewer issues
+    for i in range(issue_columns):
+        row.append(format_issue_with_reason_for_csv(issues[i]) if i < len(issues) else "")
+    return row
+
+
+async def stream_csv(run: dict, urls: Optional[List[str]] = None) -> AsyncIterator[str]:
+    """CSV with one row per URL and one column per issue (issue + reason combined)"""
+    issue_columns = await issue_column_count(run, urls)
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(CSV_BASE_HEADERS + [f"Issue {i}" for i in range(1, issue_columns + 1)])
+    yield output.getvalue()
+    output.seek(0)
+    output.truncate()
+
+    async for result in iter_run_results(str(run["_id"]), urls):
+        writer.writerow(_csv_row(result, issue_columns))
+        if output.tell() >= CSV_CHUNK_CHARS:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+    if output.tell():
+        yield output.getvalue()
+
+
+def arrow_available() -> bool:
+    return pa is not None
+
+
+def issue_row(doc: dict) -> dict:
+    """Flat export row for one analysis_issues document"""
+    row = {column: doc.get(field) for field, column in ISSUE_COLUMNS}
+    row["runId"] = str(row["runId"])
+    row["createdAt"] = doc.get("created_at") or doc["_id"].generation_time.replace(tzinfo=None)
+    row["acceptedSourceCount"] = sum(1 for source in doc.get("suggestedSources") or [] if source.get("isAccepted"))
+    return row
+
+
+def _issue_cursor(query: dict):
+    db = get_database()
+    # One run follows page order; cross-run exports follow the (user_id, created_at, _id) index
+    if "run_id" in query:
+        sort = [("result_position", 1), ("position", 1)]
+    else:
+        sort = [("created_at", 1), ("_id", 1)]
+    return db.analysis_issues.find(query).sort(sort)
+
+
+def _json_default(value):
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+async def stream_ndjson(query: dict) -> AsyncIterator[str]:
+    """One JSON object per issue per line"""
+    lines = []
+    async for doc in _issue_cursor(query):
+        lines.append(json.dumps(issue_row(doc), default=_json_default))
+        if len(lines) >= ROWS_PER_BATCH:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def _arrow_schema():
+    text = pa.string()
+    timestamp = pa.timestamp("ms")
+    return pa.schema([
+        ("runId", text),
+        ("url", text),
+        ("pageTitle", text),
+        ("resultPosition", pa.int32()),
+        ("issuePosition", pa.int32()),
+        ("issueId", text),
+        ("description", text),
+        ("flaggedText", text),
+        ("contextExcerpt", text),
+        ("reasoning", text),
+        ("confidence", pa.float64()),
+        ("status", text),
+        ("assignedTo", text),
+        ("assignedAt", timestamp),
+        ("completedAt", timestamp),
+        ("dueDate", timestamp),
+        ("googleDocUrl", text),
+        ("createdAt", timestamp),
+        ("acceptedSourceCount", pa.int32()),
+    ])
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands written bytes back in chunks"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_arrow(query: dict, export_format: str) -> AsyncIterator[bytes]:
+    """
+    Parquet file or Arrow IPC stream, one row per issue. Rows are written in
+    batches of ROWS_PER_BATCH (one Parquet row group each) and the encoded
+    bytes are yielded after every batch.
+    """
+    schema = _arrow_schema()
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        rows = []
+        async for doc in _issue_cursor(query):
+            rows.append(issue_row(doc))
+            if len(rows) >= ROWS_PER_BATCH:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                rows = []
+                yield sink.drain()
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,137 @@
+"""
+Two-tier cache for Firecrawl extractions.
+
+Entries are keyed by a hash of the normalized URL. A bounded in-process LRU
+sits in front of the `extraction_cache` MongoDB collection, so repeated
+audits of the same pages skip the scrape entirely. TTLs are configurable
+per domain (EXTRACTION_CACHE_DOMAIN_TTLS).
+"""
+
+from config import settings
+from database import get_database
+from utils.cache import TTLCache
+from datetime import datetime, timedelta
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+TRACKING_PARAM_PREFIXES = ("utm_",)
+TRACKING_PARAMS = {"gclid", "fbclid", "msclkid", "mc_cid", "mc_eid"}
+
+_memory_cache = TTLCache(
+    max_entries=settings.extraction_cache_max_entries,
+    max_bytes=settings.extraction_cache_max_bytes
+)
+
+
+def extraction_cache_stats() -> dict:
+    return _memory_cache.stats()
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for cache lookups.
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    parameters and trailing slashes, and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+
+    port = parts.port
+    if port and not ((scheme == "http" and port == 80) or (scheme == "https" and port == 443)):
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def cache_key(url: str) -> str:
+    return hashlib.sha256(normalize_url(url).encode("utf-8")).hexdigest()
+
+
+def ttl_for_url(url: str) -> int:
+    """TTL in seconds, using the most specific matching domain override"""
+    host = (urlsplit(url.strip()).hostname or "").lower()
+    overrides = settings.extraction_cache_domain_ttl_map
+
+    # Walk from the full host up to the registrable parts: a.b.com, b.com, com
+    labels = host.split(".")
+    for i in range(len(labels)):
+        domain = ".".join(labels[i:])
+        if domain in overrides:
+            return overrides[domain]
+
+    return settings.extraction_cache_ttl
+
+
+def _extraction_size(extraction: dict) -> int:
+    return len(extraction.get("content", "")) + 1024
+
+
+async def get_cached_extraction(url: str) -> Optional[dict]:
+    """Return a cached successful extraction for the URL, or None"""
+    key = cache_key(url)
+
+    extraction = _memory_cache.get(key)
+    if extraction is not None:
+        return extraction
+
+    try:
+        db = get_database()
+        now = datetime.utcnow()
+        doc = await db.extraction_cache.find_one({
+            "_id": key,
+            "expires_at": {"$gt": now}
+        })
+    except Exception as e:
+        logger.warning("Extraction cache lookup failed for %s: %s", url, str(e))
+        return None
+
+    if not doc:
+        return None
+
+    extraction = doc["extraction"]
+    remaining = (doc["expires_at"] - now).total_seconds()
+    _memory_cache.set(key, extraction, ttl=remaining, size=_extraction_size(extraction))
+    return extraction
+
+
+async def cache_extraction(url: str, extraction: dict) -> None:
+    """Store a successful extraction in both tiers. Failures are never cached."""
+    if extraction.get("status") != "success":
+        return
+
+    ttl = ttl_for_url(url)
+    if ttl <= 0:
+        return
+
+    key = cache_key(url)
+    _memory_cache.set(key, extraction, ttl=ttl, size=_extraction_size(extraction))
+
+    try:
+        db = get_database()
+        now = datetime.utcnow()
+        await db.extraction_cache.replace_one(
+            {"_id": key},
+            {
+                "url": normalize_url(url),
+                "extraction": extraction,
+                "cached_at": now,
+                "expires_at": now + timedelta(seconds=ttl)
+            },
+            upsert=True
+        )
+    except Exception as e:
+        logger.warning("Failed to persist extraction for %s: %s", url, str(e))
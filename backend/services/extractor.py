@@ -1,7 +1,10 @@
-from firecrawl import FirecrawlApp
-from config import settings
+from services.clients import get_firecrawl_app, get_firecrawl_executor
+from services.rate_limit import limited_call
 import re
 import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 async def extract_content(url: str) -> dict:
@@ -10,33 +13,26 @@ async def extract_content(url: str) -> dict:
     Returns dict with status, title, content, or error
     """
     try:
-        print(f"\n[EXTRACTOR] Starting extraction for URL: {url}")
-        
-        # Initialize Firecrawl client
-        app = FirecrawlApp(api_key=settings.firecrawl_api_key)
-        print(f"[EXTRACTOR] Firecrawl client initialized")
+        # Shared Firecrawl client
+        app = get_firecrawl_app()
         
         # Scrape the page with Firecrawl (run in executor since SDK may be sync)
         # Firecrawl handles JS-rendered content automatically
-        loop = asyncio.get_event_loop()
-        print(f"[EXTRACTOR] Calling Firecrawl API for {url}...")
-        result = await loop.run_in_executor(
-            None,
+        loop = asyncio.get_running_loop()
+        logger.debug("Calling Firecrawl for %s", url)
+        # Rate-limited and transient Firecrawl errors are retried by the limiter
+        result = await limited_call("firecrawl", lambda: loop.run_in_executor(
+            get_firecrawl_executor(),
             lambda: app.scrape(
                 url,
                 formats=["markdown", "html"],
                 include_tags=["title", "h1", "h2", "h3", "h4", "h5", "h6", "p", "table", "td", "th", "li", "ul", "ol"],
                 exclude_tags=["script", "style", "nav", "footer", "header"]
             )
-        )
-        print(f"[EXTRACTOR] Firecrawl API call completed for {url}")
-        print(f"[EXTRACTOR] Result type: {type(result)}")
-        print(f"[EXTRACTOR] Result attributes: {dir(result) if hasattr(result, '__dict__') else 'N/A'}")
-        
+        ))
         # Handle new Document object format (Firecrawl v2)
         if hasattr(result, 'markdown') or hasattr(result, 'html'):
             # New Document object format
-            print(f"[EXTRACTOR] Using Document object format")
             markdown_content = getattr(result, 'markdown', '')
             html_content = getattr(result, 'html', '')
             metadata = getattr(result, 'metadata', {})
@@ -44,18 +40,17 @@ async def extract_content(url: str) -> dict:
             # Check if there's an error attribute
             if hasattr(result, 'error') and result.error:
                 error_detail = str(result.error)
-                print(f"[EXTRACTOR ERROR] Firecrawl returned error: {error_detail}")
+                logger.warning("Firecrawl returned an error for %s: %s", url, error_detail)
                 return {
                     "status": "failed",
                     "error": f"Failed - Unable to Access: {error_detail}"
                 }
         elif isinstance(result, dict):
             # Old dict format (fallback)
-            print(f"[EXTRACTOR] Using dict format")
             # Check for error in response
             if result.get('error'):
                 error_detail = result.get('error', 'Unknown error')
-                print(f"[EXTRACTOR ERROR] Firecrawl returned error: {error_detail}")
+                logger.warning("Firecrawl returned an error for %s: %s", url, error_detail)
                 return {
                     "status": "failed",
                     "error": f"Failed - Unable to Access: {error_detail}"
@@ -79,7 +74,7 @@ async def extract_content(url: str) -> dict:
                 html_content = result.get('html', '')
                 metadata = result.get('metadata', {})
         else:
-            print(f"[EXTRACTOR ERROR] Unknown response format: {type(result)}")
+            logger.error("Unknown Firecrawl response format for %s: %s", url, type(result).__name__)
             return {
                 "status": "failed",
                 "error": "Failed - Unable to Access: Invalid response format"
@@ -116,11 +111,7 @@ async def extract_content(url: str) -> dict:
         # Use markdown content for LLM analysis (preserves structure better than plain text)
         content = markdown_content if markdown_content else html_content
         
-        # Debug logging
-        print(f"[DEBUG] Extracted content for {url}:")
-        print(f"[DEBUG] Title: {title}")
-        print(f"[DEBUG] Content length: {len(content)}")
-        print(f"[DEBUG] Content preview (first 500 chars): {content[:500]}")
+        logger.debug("Extracted %d chars from %s", len(content), url)
         
         # Extract tables from markdown if present
         tables = []
@@ -160,11 +151,7 @@ async def extract_content(url: str) -> dict:
             
     except Exception as e:
         error_msg = str(e)
-        print(f"\n[EXTRACTOR EXCEPTION] Error extracting {url}")
-        print(f"[EXTRACTOR EXCEPTION] Exception type: {type(e).__name__}")
-        print(f"[EXTRACTOR EXCEPTION] Exception message: {error_msg}")
-        import traceback
-        print(f"[EXTRACTOR EXCEPTION] Traceback:\n{traceback.format_exc()}")
+        logger.warning("Extraction failed for %s: %s: %s", url, type(e).__name__, error_msg)
         
         # Handle specific Firecrawl errors
         if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
@@ -0,0 +1,260 @@
+from config import settings
+from database import get_database
+from crud.analysis import (
+    insert_result, stored_positions, discard_partial_results, count_run_results, count_run_issues,
+    delete_run_results
+)
+from services.extractor import extract_content
+from services.extraction_cache import get_cached_extraction, cache_extraction
+from services.detector import detect_stale_content
+from utils.telemetry import Span, span, add_to_profile
+from bson import ObjectId
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Per-URL profile fields and the spans / profile values they are summed from
+PROFILE_TIMINGS = {
+    "queue_ms": "queue",
+    "scrape_ms": "extract",
+    "llm_ms": "llm",
+    "validate_ms": "validate",
+    "write_ms": "persist",
+    "throttle_ms": "throttle"
+}
+PROFILE_COUNTERS = ("chunks", "prompt_chars", "response_chars", "input_tokens", "output_tokens")
+
+
+class RunDeleted(Exception):
+    """The run was deleted while one of its shards was being analyzed"""
+
+
+def build_failed_result(url: str) -> dict:
+    """Result row for a URL that could not be extracted or analyzed"""
+    return {
+        "url": url,
+        "title": "Failed to Access",
+        "metaTitle": "",
+        "metaDescription": "",
+        "h1s": [],
+        "h2s": [],
+        "h3s": [],
+        "h4s": [],
+        "status": "failed",
+        "issueCount": 0,
+        "issues": []
+    }
+
+
+def build_success_result(url: str, extraction: dict, detection: dict) -> dict:
+    """Result row for a URL that was extracted and analyzed"""
+    headers = extraction.get("headers", {})
+
+    return {
+        "url": url,
+        "title": extraction["title"],
+        "metaTitle": extraction.get("meta_title", ""),
+        "metaDescription": extraction.get("meta_description", ""),
+        "h1s": headers.get("h1", []),
+        "h2s": headers.get("h2", []),
+        "h3s": headers.get("h3", []),
+        "h4s": headers.get("h4", []),
+        # "partial" when some chunks could not be analyzed
+        "status": detection.get("status", "success"),
+        "failedChunks": detection.get("failed_chunks", 0),
+        "issueCount": detection.get("issue_count", 0),
+        "issues": detection.get("issues", [])
+    }
+
+
+async def fetch_extraction(url: str, fetch_limit: asyncio.Semaphore, force_refresh: bool = False) -> dict:
+    """Serve the extraction from cache when possible, otherwise scrape it"""
+    if not force_refresh:
+        cached = await get_cached_extraction(url)
+        if cached is not None:
+            logger.debug("Extraction cache hit for %s", url)
+            return cached
+
+    queued = time.perf_counter()
+    async with fetch_limit:
+        add_to_profile(queue=time.perf_counter() - queued)
+        with span("extract"):
+            extraction = await extract_content(url)
+
+    await cache_extraction(url, extraction)
+    return extraction
+
+
+async def analyze_url(
+    url: str,
+    domain_context: dict,
+    fetch_limit: asyncio.Semaphore,
+    detect_limit: asyncio.Semaphore,
+    force_refresh: bool = False
+) -> dict:
+    """
+    Run one URL through the extract -> detect stages.
+    Each stage holds its own semaphore so Firecrawl and Claude concurrency
+    are bounded independently. Never raises: any failure, in extraction or
+    detection, becomes a failed row.
+    """
+    try:
+        extraction = await fetch_extraction(url, fetch_limit, force_refresh)
+
+        if extraction["status"] == "failed":
+            return build_failed_result(url)
+
+        queued = time.perf_counter()
+        async with detect_limit:
+            add_to_profile(queue=time.perf_counter() - queued)
+            with span("detect"):
+                detection = await detect_stale_content(
+                    url,
+                    extraction["content"],
+                    domain_context,
+                    extraction.get("headers"),
+                    force_refresh
+                )
+        if detection.get("status") == "failed":
+            # Not a clean page: the LLM call failed (or its circuit is open)
+            return build_failed_result(url)
+        logger.debug("Detection complete for %s: %d issues", url, detection.get("issue_count", 0))
+
+        return build_success_result(url, extraction, detection)
+    except Exception:
+        logger.exception("Pipeline failed for %s", url)
+        return build_failed_result(url)
+
+
+def build_url_profile(position: int, url: str, result: dict, analyzed: Span) -> dict:
+    """Timing breakdown and LLM sizes for one URL, from its analyze span"""
+    profile = analyzed.profile
+    entry = {
+        "position": position,
+        "url": url,
+        "status": result["status"],
+        "cached": "extract" not in profile,
+        "total_ms": round(analyzed.duration * 1000, 1)
+    }
+    for field, stage in PROFILE_TIMINGS.items():
+        entry[field] = round(profile.get(stage, 0.0) * 1000, 1)
+    for field in PROFILE_COUNTERS:
+        entry[field] = int(profile.get(field, 0))
+    return entry
+
+
+def profile_increments(entry: dict) -> dict:
+    """$inc of the run's profile_totals for one URL profile"""
+    increments = {"profile_totals.urls": 1, "profile_totals.total_ms": entry["total_ms"]}
+    for field in (*PROFILE_TIMINGS, *PROFILE_COUNTERS):
+        increments[f"profile_totals.{field}"] = entry[field]
+    return increments
+
+
+async def process_analysis(
+    run_id: str,
+    user_id: str,
+    urls: list,
+    domain_context: dict,
+    force_refresh: bool = False,
+    offset: int = 0
+):
+    """
+    Analyze one shard of a run's URLs (positions offset..offset+len(urls)),
+    storing each result as soon as it completes and advancing the run's
+    progress counters. A retried job skips URLs that an earlier attempt already
+    stored. The run is completed by whichever shard finishes last. If the run
+    is deleted meanwhile, the shard stops and removes what it stored.
+    """
+    db = get_database()
+    run_oid = ObjectId(run_id)
+    end = offset + len(urls)
+
+    if await db.analysis_runs.find_one({"_id": run_oid}, {"_id": 1}) is None:
+        logger.info("Run %s no longer exists; skipping shard at %d", run_id, offset)
+        return
+
+    done = await stored_positions(run_id, offset, end)
+    await discard_partial_results(run_id, done, offset, end)
+
+    fetch_limit = asyncio.Semaphore(settings.firecrawl_concurrency)
+    detect_limit = asyncio.Semaphore(settings.detection_concurrency)
+
+    async def analyze_and_store(position: int, url: str):
+        with span("analyze", run=run_id, url=url) as analyzed:
+            result = await analyze_url(url, domain_context, fetch_limit, detect_limit, force_refresh)
+            with span("persist"):
+                await insert_result(run_id, user_id, position, result)
+
+        # Totals cover every URL; only the slowest run_profile_max_urls are kept in full
+        entry = build_url_profile(position, url, result, analyzed)
+        updated = await db.analysis_runs.update_one(
+            {"_id": run_oid},
+            {
+                "$inc": {"completed_count": 1, "total_issues": result["issueCount"], **profile_increments(entry)},
+                "$max": {"max_issue_count": len(result["issues"])},
+                "$push": {"profile": {
+                    "$each": [entry],
+                    "$sort": {"total_ms": -1},
+                    "$slice": settings.run_profile_max_urls
+                }}
+            }
+        )
+        if updated.matched_count == 0:
+            raise RunDeleted(run_id)
+
+    deleted = False
+    try:
+        async with asyncio.TaskGroup() as group:
+            for position, url in enumerate(urls, start=offset):
+                if position not in done:
+                    group.create_task(analyze_and_store(position, url))
+    except* RunDeleted:
+        deleted = True
+
+    if deleted:
+        logger.info("Run %s was deleted; stopping shard at %d", run_id, offset)
+        await delete_run_results(run_id)
+        return
+
+    await finish_shard(run_id, offset)
+
+
+async def finish_shard(run_id: str, offset: int) -> None:
+    """
+    Record a finished shard; the last one marks the run complete. Shards are
+    recorded by offset, so a retried shard is never counted twice.
+    """
+    db = get_database()
+    run_oid = ObjectId(run_id)
+
+    await db.analysis_runs.update_one(
+        {"_id": run_oid, "finished_shards": {"$ne": offset}},
+        {"$inc": {"pending_jobs": -1}, "$push": {"finished_shards": offset}}
+    )
+    run = await db.analysis_runs.find_one({"_id": run_oid}, {"pending_jobs": 1})
+    # Runs queued before sharding have no pending_jobs and finish on their only shard
+    if run is None or run.get("pending_jobs", 0) > 0:
+        return
+
+    # Recount rather than trust the increments, which an interrupted attempt may have skipped
+    await db.analysis_runs.update_one(
+        {"_id": run_oid},
+        {
+            "$set": {
+                "status": "completed",
+                "completed_count": await count_run_results(run_id),
+                "total_issues": await count_run_issues(run_id)
+            }
+        }
+    )
+
+
+async def mark_run_failed(run_id: str) -> None:
+    db = get_database()
+    await db.analysis_runs.update_one(
+        {"_id": ObjectId(run_id), "status": "processing"},
+        {"$set": {"status": "failed"}}
+    )
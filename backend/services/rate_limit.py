@@ -0,0 +1,265 @@
+"""
+Adaptive rate limiting and retries for upstream APIs.
+
+Every call to Claude, Firecrawl or Perplexity goes through the limiter of its
+provider (see `limited_call`). Each limiter is a token bucket that starts at
+the configured ceiling (`<provider>_requests_per_second`):
+
+- a 429 or 529 halves the rate and pauses the bucket for Retry-After;
+- each success adds back a fraction of the ceiling, so throughput settles
+  just under the provider's real limit instead of failing pages;
+- other retryable failures (5xx, timeouts, connection errors) are retried
+  with jittered exponential backoff and feed a circuit breaker that fails
+  fast for `circuit_reset_seconds` once `circuit_failure_threshold`
+  consecutive calls have failed.
+
+Limiters are per process; several workers each adapt to the shared limit.
+"""
+
+from config import settings
+from utils.telemetry import UPSTREAM_SECONDS, UPSTREAM_RATE, UPSTREAM_RETRIES, add_to_profile
+from anthropic import APIConnectionError
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional, TypeVar
+import asyncio
+import httpx
+import logging
+import random
+import time
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED_STATUSES = {429, 529}
+RETRYABLE_STATUSES = {408, 500, 502, 503, 504}
+
+# The rate never drops below this fraction of the ceiling
+MIN_RATE_FRACTION = 0.05
+# Each success recovers this fraction of the ceiling
+RECOVERY_FRACTION = 0.02
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} is unavailable; retrying in {retry_in:.0f}s")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by the provider via retry-after-ms or Retry-After"""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: Exception) -> str:
+    """'rate_limited', 'retryable' or 'fatal'"""
+    status = _status_code(error)
+    if status in RATE_LIMITED_STATUSES:
+        return "rate_limited"
+    if status in RETRYABLE_STATUSES:
+        return "retryable"
+    if status is None and isinstance(error, (APIConnectionError, httpx.TransportError, ConnectionError, TimeoutError)):
+        return "retryable"
+    return "fatal"
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket for one provider with AIMD rate adaptation and a circuit
+    breaker. Meant for use from a single event loop.
+    """
+
+    def __init__(self, provider: str, max_rate: float, failure_threshold: int, reset_seconds: float):
+        self.provider = provider
+        self.max_rate = max_rate
+        self.min_rate = max_rate * MIN_RATE_FRACTION
+        self.rate = max_rate
+        self.burst = max(1.0, max_rate)
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+        self.calls = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.rejected = 0
+
+    def _refill(self, now: float) -> None:
+        start = max(self._updated, self._paused_until)
+        if now > start:
+            self._tokens = min(self.burst, self._tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def _check_circuit(self, now: float) -> None:
+        if self._opened_at is None:
+            return
+        retry_in = self._opened_at + self.reset_seconds - now
+        if retry_in > 0 or self._probing:
+            self.rejected += 1
+            raise CircuitOpenError(self.provider, max(retry_in, 0.0))
+        # Half-open: let one probe call through
+        self._probing = True
+
+    async def acquire(self) -> None:
+        """Wait for a token; raises CircuitOpenError while the circuit is open"""
+        while True:
+            now = time.monotonic()
+            self._check_circuit(now)
+            self._refill(now)
+            if now >= self._paused_until and self._tokens >= 1:
+                self._tokens -= 1
+                self.calls += 1
+                return
+            wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            await asyncio.sleep(wait)
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+        UPSTREAM_RATE.set(self.rate, provider=self.provider)
+
+    def record_rate_limited(self, retry_after: Optional[float]) -> None:
+        self.rate_limited += 1
+        self._probing = False
+        self.rate = max(self.min_rate, self.rate / 2)
+        UPSTREAM_RATE.set(self.rate, provider=self.provider)
+        self._tokens = min(self._tokens, 0.0)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def record_abandoned(self) -> None:
+        """A call was cancelled before it finished; allow a new probe"""
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probing = False
+        if self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning("Opening %s circuit after %d failures", self.provider, self._failures)
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "rate": round(self.rate, 3),
+            "maxRate": self.max_rate,
+            "circuitOpen": self._opened_at is not None,
+            "calls": self.calls,
+            "rateLimited": self.rate_limited,
+            "retries": self.retries,
+            "rejected": self.rejected
+        }
+
+
+limiters = {}
+
+
+def get_limiter(provider: str) -> AdaptiveLimiter:
+    """Process-wide limiter for 'claude', 'firecrawl' or 'perplexity'"""
+    limiter = limiters.get(provider)
+    if limiter is None:
+        limiter = AdaptiveLimiter(
+            provider,
+            getattr(settings, f"{provider}_requests_per_second"),
+            settings.circuit_failure_threshold,
+            settings.circuit_reset_seconds
+        )
+        limiters[provider] = limiter
+    return limiter
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt"""
+    ceiling = min(settings.upstream_backoff_max, settings.upstream_backoff_base * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+async def limited_call(provider: str, call: Callable[[], Awaitable[T]], max_attempts: Optional[int] = None) -> T:
+    """
+    Run call() under the provider's limiter, retrying rate-limited and
+    transient failures. The last error is re-raised once attempts run out;
+    errors that are not worth retrying (4xx, parse errors) are raised at once.
+    """
+    limiter = get_limiter(provider)
+    max_attempts = max_attempts or settings.upstream_max_attempts
+
+    for attempt in range(1, max_attempts + 1):
+        waited = time.perf_counter()
+        await limiter.acquire()
+        started = time.perf_counter()
+        add_to_profile(throttle=started - waited)
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            limiter.record_abandoned()
+            raise
+        except Exception as e:
+            kind = classify_error(e)
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, provider=provider, outcome=kind)
+            if kind == "fatal":
+                # The provider answered (400, 404, ...): it is healthy, the request is not
+                limiter.record_success()
+                raise
+
+            retry_after = retry_after_seconds(e)
+            if kind == "rate_limited":
+                limiter.record_rate_limited(retry_after)
+            else:
+                limiter.record_failure()
+            if attempt == max_attempts:
+                raise
+
+            limiter.retries += 1
+            UPSTREAM_RETRIES.inc(provider=provider, reason=kind)
+            # A Retry-After pause is enforced by acquire(); otherwise back off
+            delay = 0.0 if retry_after else backoff_delay(attempt)
+            logger.info(
+                "%s %s (%s); attempt %d/%d, retrying in %.1fs",
+                provider, kind, type(e).__name__, attempt, max_attempts, delay or retry_after
+            )
+            if delay:
+                await asyncio.sleep(delay)
+                add_to_profile(throttle=delay)
+        else:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - started, provider=provider, outcome="ok")
+            limiter.record_success()
+            return result
+
+
+def rate_limit_stats() -> dict:
+    return {provider: limiter.stats() for provider, limiter in limiters.items()}
@@ -1,18 +1,24 @@
-import httpx
-from anthropic import Anthropic
 from config import settings
+from services.clients import get_llm_client, get_http_client
+from services.rate_limit import limited_call, RATE_LIMITED_STATUSES, RETRYABLE_STATUSES
+from utils.telemetry import span, record_tokens
 from models.analysis import SuggestedSource, Issue, DomainContext
 from typing import List
 from datetime import datetime
+import httpx
 import json
+import logging
 from urllib.parse import urlparse
 
+QUERY_MODEL = "claude-3-haiku-20240307"
+
+logger = logging.getLogger(__name__)
+
 
 class ResearchService:
     """Service for performing AI-powered research to find authoritative sources"""
     
     def __init__(self):
-        self.claude_client = Anthropic(api_key=settings.claude_api_key)
         self.perplexity_api_key = settings.perplexity_api_key
         self.perplexity_base_url = "https://api.perplexity.ai"
     
@@ -52,20 +58,22 @@ Guidelines:
 Return ONLY the search query text, nothing else."""
 
         try:
-            message = self.claude_client.messages.create(
-                model="claude-3-haiku-20240307",
+            message = await limited_call("claude", lambda: get_llm_client().messages.create(
+                model=QUERY_MODEL,
                 max_tokens=100,
                 messages=[{"role": "user", "content": prompt}]
-            )
+            ))
+            record_tokens("claude", QUERY_MODEL, message.usage.input_tokens, message.usage.output_tokens)
             
             query = message.content[0].text.strip()
-            print(f"[DEBUG] Generated research query: {query}")
+            logger.debug("Generated research query: %s", query)
             return query
             
         except Exception as e:
-            print(f"[ERROR] Failed to generate query: {str(e)}")
+            logger.error("Failed to generate research query: %s", str(e))
             # Fallback to a simple query
-            return f"current {issue.flagged_text.replace('\"', '')}"
+            fallback_text = issue.flagged_text.replace('"', '')
+            return f"current {fallback_text}"
     
     async def perform_research(self, query: str) -> List[SuggestedSource]:
         """
@@ -115,39 +123,39 @@ Limit to 3-5 highest quality sources. Return ONLY valid JSON."""
                 "return_images": False
             }
             
-            print(f"[DEBUG] Calling Perplexity API with query: {query}")
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
+            async def post() -> httpx.Response:
+                response = await get_http_client().post(
                     f"{self.perplexity_base_url}/chat/completions",
                     headers=headers,
                     json=payload
                 )
-                
-                if response.status_code != 200:
-                    print(f"[ERROR] Perplexity API error: {response.status_code} - {response.text}")
-                    return []
-                
-                data = response.json()
-                print(f"[DEBUG] Perplexity API response received")
-                
-                # Extract the response content
-                content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-                citations = data.get("citations", [])
-                
-                print(f"[DEBUG] Response content length: {len(content)}")
-                print(f"[DEBUG] Citations count: {len(citations)}")
-                
-                # Try to parse JSON from the response
-                sources = self._parse_sources_from_response(content, citations)
-                
-                print(f"[DEBUG] Parsed {len(sources)} sources")
-                return sources
-                
-        except Exception as e:
-            print(f"[ERROR] Research failed: {str(e)}")
-            import traceback
-            print(f"[ERROR] Traceback: {traceback.format_exc()}")
+                # Hand 429s and 5xx to the limiter so they are retried
+                if response.status_code in RATE_LIMITED_STATUSES or response.status_code in RETRYABLE_STATUSES:
+                    response.raise_for_status()
+                return response
+            
+            response = await limited_call("perplexity", post)
+            
+            if response.status_code != 200:
+                logger.error("Perplexity API error: %s - %s", response.status_code, response.text)
+                return []
+            
+            data = response.json()
+            usage = data.get("usage") or {}
+            record_tokens("perplexity", payload["model"], usage.get("prompt_tokens"), usage.get("completion_tokens"))
+            
+            # Extract the response content
+            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            citations = data.get("citations", [])
+            
+            # Try to parse JSON from the response
+            sources = self._parse_sources_from_response(content, citations)
+            
+            logger.debug("Parsed %d sources from %d citations", len(sources), len(citations))
+            return sources
+            
+        except Exception:
+            logger.exception("Research failed for query: %s", query)
             return []
     
     def _parse_sources_from_response(self, content: str, citations: List[str]) -> List[SuggestedSource]:
@@ -181,12 +189,12 @@ Limit to 3-5 highest quality sources. Return ONLY valid JSON."""
                         )
                         sources.append(source)
                     except Exception as e:
-                        print(f"[WARNING] Failed to parse source: {str(e)}")
+                        logger.warning("Failed to parse source: %s", str(e))
                         continue
             
             # If JSON parsing failed or no sources, try to use citations
             if not sources and citations:
-                print(f"[DEBUG] Using citations as fallback")
+                logger.debug("Using citations as fallback")
                 for citation in citations[:5]:
                     try:
                         domain = urlparse(citation).netloc if citation else ""
@@ -199,11 +207,11 @@ Limit to 3-5 highest quality sources. Return ONLY valid JSON."""
                             isAccepted=False
                         ))
                     except Exception as e:
-                        print(f"[WARNING] Failed to parse citation: {str(e)}")
+                        logger.warning("Failed to parse citation: %s", str(e))
                         continue
                         
         except json.JSONDecodeError as e:
-            print(f"[WARNING] JSON decode error: {str(e)}")
+            logger.warning("Could not parse Perplexity sources: %s", str(e))
             # Use citations as fallback
             if citations:
                 for citation in citations[:5]:
@@ -226,15 +234,13 @@ Limit to 3-5 highest quality sources. Return ONLY valid JSON."""
         """
         Complete research workflow: generate query and perform search
         """
-        print(f"[DEBUG] Starting research for issue: {issue.id}")
-        
-        # Generate optimized search query
-        query = await self.generate_research_query(issue, context)
-        
-        # Perform research
-        sources = await self.perform_research(query)
+        with span("research", issue=issue.id):
+            # Generate optimized search query
+            query = await self.generate_research_query(issue, context)
+            
+            # Perform research
+            sources = await self.perform_research(query)
         
-        print(f"[DEBUG] Research complete. Found {len(sources)} sources")
         return sources
 
 
@@ -0,0 +1,142 @@
+"""
+Server-sent events for analysis progress.
+
+The stream first replays the results already stored, in bounded batches, then
+polls `analysis_results` for documents completed since the last poll (minus a
+small lag, since results are stamped by different workers). When the run stops
+processing, a final sweep by position sends anything the polls missed. It keeps
+the set of positions already sent, so each URL is reported exactly once.
+
+Events:
+    result    one completed URL result, with its issues and position
+    progress  {completedCount, urlCount, totalIssues}
+    done      {status, completedCount, urlCount, totalIssues}; the stream ends
+"""
+
+from config import settings
+from database import get_database
+from crud.analysis import result_from_doc, issue_from_doc
+from bson import ObjectId
+from datetime import timedelta
+from typing import AsyncIterator, Awaitable, Callable
+import asyncio
+import json
+import time
+
+RUN_PROGRESS_FIELDS = {"status": 1, "url_count": 1, "completed_count": 1, "total_issues": 1}
+
+
+def format_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _progress(run: dict) -> dict:
+    return {
+        "completedCount": run.get("completed_count", run["url_count"]),
+        "urlCount": run["url_count"],
+        "totalIssues": run["total_issues"]
+    }
+
+
+async def _with_issues(run_oid: ObjectId, docs: list) -> list:
+    """Nest each result's issues, read with one query for the batch"""
+    if not docs:
+        return []
+
+    db = get_database()
+    issues = {doc["position"]: [] for doc in docs}
+    cursor = db.analysis_issues.find(
+        {"run_id": run_oid, "result_position": {"$in": list(issues)}}
+    ).sort([("result_position", 1), ("position", 1)])
+    async for issue in cursor:
+        issues[issue["result_position"]].append(issue_from_doc(issue))
+
+    for doc in docs:
+        doc["issues"] = issues[doc["position"]]
+    return docs
+
+
+async def _stored_results(run_oid: ObjectId, seen: set) -> AsyncIterator[list]:
+    """All results stored so far not yet sent, in input order, a bounded batch at a time"""
+    db = get_database()
+    start = 0
+    while True:
+        batch = await db.analysis_results.find(
+            {"run_id": run_oid, "position": {"$gte": start}}, {"position": 1}
+        ).sort("position", 1).limit(settings.run_events_replay_batch).to_list(length=None)
+        if not batch:
+            return
+        start = batch[-1]["position"] + 1
+
+        # Only the unsent results are read in full
+        unsent = [doc["position"] for doc in batch if doc["position"] not in seen]
+        if unsent:
+            docs = await db.analysis_results.find(
+                {"run_id": run_oid, "position": {"$in": unsent}}
+            ).sort("position", 1).to_list(length=None)
+            yield await _with_issues(run_oid, docs)
+
+
+async def _new_results(run_oid: ObjectId, since, seen: set) -> AsyncIterator[list]:
+    """Results completed since `since` (less the lag) not yet sent, with issues"""
+    db = get_database()
+    query = {
+        "run_id": run_oid,
+        "completed_at": {"$gte": since - timedelta(seconds=settings.run_events_lag_seconds)}
+    }
+
+    # Served by the (run_id, completed_at) index, so a poll only reads recent results
+    docs = [
+        doc async for doc in db.analysis_results.find(query).sort("completed_at", 1)
+        if doc["position"] not in seen
+    ]
+    yield await _with_issues(run_oid, docs)
+
+
+async def run_events(run_id: str, is_disconnected: Callable[[], Awaitable[bool]]) -> AsyncIterator[str]:
+    db = get_database()
+    run_oid = ObjectId(run_id)
+    seen = set()
+    since = None
+    last_progress = None
+    last_sent = time.monotonic()
+
+    while not await is_disconnected():
+        # Read the run before its results: once it is no longer processing,
+        # every result was written before this read and the sweep below sees it
+        run = await db.analysis_runs.find_one({"_id": run_oid}, RUN_PROGRESS_FIELDS)
+        if run is None:
+            yield format_event("done", {"status": "deleted"})
+            return
+
+        if since is None or run["status"] != "processing":
+            # On connect, replay everything stored so far. Once the run has
+            # stopped, sweep by position: a result that became visible later
+            # than the lag after its timestamp is still sent.
+            batches = _stored_results(run_oid, seen)
+        else:
+            batches = _new_results(run_oid, since, seen)
+
+        async for docs in batches:
+            for doc in docs:
+                seen.add(doc["position"])
+                if doc.get("completed_at") is not None and (since is None or doc["completed_at"] > since):
+                    since = doc["completed_at"]
+                yield format_event("result", {"position": doc["position"], **result_from_doc(doc)})
+                last_sent = time.monotonic()
+
+        progress = _progress(run)
+        if progress != last_progress:
+            last_progress = progress
+            yield format_event("progress", progress)
+            last_sent = time.monotonic()
+
+        if run["status"] != "processing":
+            yield format_event("done", {"status": run["status"], **progress})
+            return
+
+        if time.monotonic() - last_sent >= settings.run_events_keepalive_seconds:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+
+        await asyncio.sleep(settings.run_events_poll_interval)
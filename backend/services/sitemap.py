@@ -0,0 +1,201 @@
+"""
+URL discovery for bulk analysis runs.
+
+Reads page URLs from an XML sitemap (following sitemap indexes and gzipped
+sitemaps), from an uploaded list with one URL per line or in the first CSV
+column, or from a submitted list. Results are http(s) URLs only,
+de-duplicated, keep their order and are capped at `bulk_max_urls`.
+
+Sitemaps are fetched from the API server on behalf of the user, so every
+URL (and every redirect target) must resolve to public addresses only, and
+downloads are capped in size and in total time. Requests connect to the
+address that was checked, not to a second DNS answer.
+"""
+
+from config import settings
+from services.clients import get_http_client
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+import asyncio
+import httpx
+import csv
+import io
+import ipaddress
+import logging
+import socket
+import zlib
+
+logger = logging.getLogger(__name__)
+
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+MAX_SITEMAP_DEPTH = 3
+MAX_REDIRECTS = 5
+
+
+def _is_page_url(value: str) -> bool:
+    if not (value.startswith("http://") or value.startswith("https://")):
+        return False
+    try:
+        return bool(urlsplit(value).hostname)
+    except ValueError:
+        # e.g. an unbalanced IPv6 bracket
+        return False
+
+
+def _dedupe(urls: Iterable[str], limit: int) -> List[str]:
+    unique = {}
+    for url in urls:
+        url = url.strip()
+        if _is_page_url(url) and url not in unique:
+            unique[url] = None
+            if len(unique) >= limit:
+                break
+    return list(unique)
+
+
+def _locs(root: ElementTree.Element, tag: str) -> List[str]:
+    """<loc> values under <tag> entries, with or without the sitemap namespace"""
+    locs = []
+    for entry in root.iter():
+        if entry.tag in (f"{SITEMAP_NS}{tag}", tag):
+            loc = entry.find(f"{SITEMAP_NS}loc")
+            if loc is None:
+                loc = entry.find("loc")
+            if loc is not None and loc.text:
+                locs.append(loc.text.strip())
+    return locs
+
+
+async def _check_public(url: str) -> str:
+    """
+    Raise ValueError unless url is http(s) and its host resolves only to
+    public addresses; returns the address to connect to
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Unsupported sitemap URL: {url}")
+
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    infos = await asyncio.get_running_loop().getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM)
+    addresses = [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+    if not addresses:
+        raise ValueError(f"Sitemap host {parts.hostname} does not resolve")
+    for address in addresses:
+        if not address.is_global:
+            raise ValueError(f"Sitemap host {parts.hostname} resolves to non-public address {address}")
+    return str(addresses[0])
+
+
+def _pinned_request(url: httpx.URL, address: str) -> dict:
+    """
+    Arguments for a request to url that connects to address, keeping the
+    original Host header and TLS server name (and so certificate checks)
+    """
+    host = f"[{address}]" if ":" in address else address
+    return {
+        "url": url.copy_with(host=host),
+        "headers": {
+            "Accept-Encoding": "identity",
+            "Host": url.netloc.decode("ascii")
+        },
+        "extensions": {"sni_hostname": url.host}
+    }
+
+
+def _gunzip(body: bytes, limit: int) -> bytes:
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    data = decompressor.decompress(body, limit + 1)
+    if len(data) > limit or decompressor.unconsumed_tail:
+        raise ValueError(f"Sitemap exceeds {limit} bytes uncompressed")
+    return data
+
+
+async def _download(url: str) -> bytes:
+    """GET url, following redirects by hand so each target is checked, with a size cap"""
+    client = get_http_client()
+    for _ in range(MAX_REDIRECTS + 1):
+        address = await _check_public(url)
+        target = httpx.URL(url)
+        async with client.stream("GET", **_pinned_request(target, address)) as response:
+            if response.is_redirect:
+                url = str(target.join(response.headers["location"]))
+                continue
+            response.raise_for_status()
+
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > settings.sitemap_max_bytes:
+                    raise ValueError(f"Sitemap exceeds {settings.sitemap_max_bytes} bytes")
+            return bytes(body)
+    raise ValueError(f"Too many redirects for {url}")
+
+
+async def _fetch_sitemap(url: str) -> ElementTree.Element:
+    body = await _download(url)
+    if body[:2] == b"\x1f\x8b":
+        body = _gunzip(body, settings.sitemap_max_uncompressed_bytes)
+    elif len(body) > settings.sitemap_max_uncompressed_bytes:
+        raise ValueError(f"Sitemap exceeds {settings.sitemap_max_uncompressed_bytes} bytes")
+    return ElementTree.fromstring(body)
+
+
+async def _crawl(sitemap_url: str, limit: int, pages: List[str]) -> None:
+    """Collect page URLs into pages; nested sitemaps that fail are skipped"""
+    pending = [(sitemap_url, 0)]
+    visited = set()
+
+    while pending and len(pages) < limit:
+        url, depth = pending.pop(0)
+        if url in visited or depth > MAX_SITEMAP_DEPTH:
+            continue
+        visited.add(url)
+
+        try:
+            root = await _fetch_sitemap(url)
+        except Exception as e:
+            if depth == 0:
+                raise
+            logger.warning("Skipping nested sitemap %s: %s", url, str(e))
+            continue
+
+        pages.extend(_locs(root, "url"))
+        pending.extend((child, depth + 1) for child in _locs(root, "sitemap"))
+
+
+async def urls_from_sitemap(sitemap_url: str, limit: Optional[int] = None) -> List[str]:
+    """
+    Collect page URLs from a sitemap or sitemap index within
+    `sitemap_timeout`; a crawl that runs out of time keeps the pages found so
+    far. Raises ValueError if the sitemap cannot be fetched or parsed. The
+    message is deliberately generic; the cause is only logged.
+    """
+    limit = limit or settings.bulk_max_urls
+    pages = []
+
+    try:
+        async with asyncio.timeout(settings.sitemap_timeout):
+            await _crawl(sitemap_url, limit, pages)
+    except TimeoutError:
+        logger.warning("Sitemap crawl of %s timed out with %d URLs", sitemap_url, len(pages))
+        if not pages:
+            raise ValueError(f"Could not read sitemap {sitemap_url}")
+    except Exception as e:
+        logger.warning("Could not read sitemap %s: %s: %s", sitemap_url, type(e).__name__, str(e))
+        raise ValueError(f"Could not read sitemap {sitemap_url}")
+
+    return _dedupe(pages, limit)
+
+
+def urls_from_list(urls: Iterable[str], limit: Optional[int] = None) -> List[str]:
+    """Page URLs from a submitted list, dropping non-http(s) and malformed entries"""
+    return _dedupe(urls, limit or settings.bulk_max_urls)
+
+
+def urls_from_upload(content: bytes, limit: Optional[int] = None) -> List[str]:
+    """Page URLs from an uploaded text or CSV file (first column)"""
+    limit = limit or settings.bulk_max_urls
+    text = content.decode("utf-8-sig", errors="replace")
+    rows = csv.reader(io.StringIO(text))
+    return _dedupe((row[0] for row in rows if row), limit)
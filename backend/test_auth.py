@@ -0,0 +1,111 @@
+"""
+Test suite for token revocation caching and the password hashing pool.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+from fastapi.testclient import TestClient
+
+import database
+from auth import hashing
+from auth.jwt import create_access_token
+from config import settings
+from crud import token_blacklist
+from crud.token_blacklist import blacklist_token, is_token_blacklisted
+from utils.cache import TTLCache
+
+
+@pytest.fixture
+def db(monkeypatch):
+    mock_db = mongomock_motor.AsyncMongoMockClient().updateq
+    monkeypatch.setattr(database, "db", mock_db)
+    monkeypatch.setattr(token_blacklist, "_revoked", TTLCache(max_entries=16))
+    monkeypatch.setattr(token_blacklist, "_not_revoked", TTLCache(max_entries=16, default_ttl=60))
+    return mock_db
+
+
+def test_logout_revokes_a_cached_token_at_once(db):
+    """A token cached as not revoked is rejected by the next request after logout"""
+    user_id = ObjectId()
+    asyncio.run(db.users.insert_one({"_id": user_id, "email": "a@example.com", "name": "A"}))
+
+    import main
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert token_blacklist.blacklist_cache_stats()["notRevoked"]["entries"] == 1
+
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 401
+    assert asyncio.run(is_token_blacklisted(headers["Authorization"][len("Bearer "):])) is True
+
+
+def test_revocation_caches_expire(db, monkeypatch):
+    """Both caches forget a token once their TTL has passed"""
+    monkeypatch.setattr(token_blacklist, "_not_revoked", TTLCache(max_entries=16, default_ttl=0.05))
+
+    async def run():
+        # Revoked on another process: seen once the negative entry expires
+        assert await is_token_blacklisted("elsewhere") is False
+        await db.token_blacklist.insert_one({"token": "elsewhere", "expires_at": datetime.utcnow() + timedelta(hours=1)})
+        assert await is_token_blacklisted("elsewhere") is False
+        time.sleep(0.06)
+        assert await is_token_blacklisted("elsewhere") is True
+
+        # Revoked tokens are remembered only until the token itself expires
+        await blacklist_token("short-lived", str(ObjectId()), datetime.utcnow() + timedelta(seconds=0.05))
+        assert token_blacklist._token_hash("short-lived") in token_blacklist._revoked
+        time.sleep(0.06)
+        assert token_blacklist._token_hash("short-lived") not in token_blacklist._revoked
+        # The TTL index has removed the expired entry by then
+        await db.token_blacklist.delete_many({"token": "short-lived"})
+        assert await is_token_blacklisted("short-lived") is False
+
+    asyncio.run(run())
+
+
+def test_login_is_shed_once_the_hashing_pool_is_full(db, monkeypatch):
+    """Past password_hash_max_pending, login answers 503 with Retry-After"""
+    release = threading.Event()
+
+    def slow_verify(plain, hashed):
+        release.wait(5)
+        return plain == hashed
+
+    monkeypatch.setattr(hashing, "argon2", type("Argon2", (), {"verify": staticmethod(slow_verify)}))
+    monkeypatch.setattr(settings, "password_hash_max_pending", 2)
+    asyncio.run(db.users.insert_one({"email": "a@example.com", "name": "A", "password_hash": "secret"}))
+
+    import main
+    credentials = {"email": "a@example.com", "password": "secret"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            queued = [asyncio.create_task(hashing.verify_password("x", "y")) for _ in range(2)]
+            await asyncio.sleep(0)
+            assert hashing._pending == 2
+
+            response = await client.post("/api/v1/auth/login", json=credentials)
+            assert response.status_code == 503
+            assert response.headers["Retry-After"] == str(settings.password_hash_retry_after)
+
+            release.set()
+            assert await asyncio.gather(*queued) == [False, False]
+            assert hashing._pending == 0
+
+            response = await client.post("/api/v1/auth/login", json=credentials)
+            assert response.status_code == 200
+
+    asyncio.run(run())
@@ -0,0 +1,210 @@
+"""
+Test suite for the in-process TTL cache, extraction cache key normalization
+and the detection memo.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import database
+from utils.cache import TTLCache
+from services import detector, detection_cache
+from services.extraction_cache import normalize_url, cache_key, ttl_for_url
+from config import settings
+
+
+def test_ttl_cache_lru_eviction():
+    """Least recently used entry is evicted once max_entries is exceeded"""
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_byte_budget():
+    """Entries are evicted to keep the summed size under max_bytes"""
+    cache = TTLCache(max_entries=100, max_bytes=10)
+    cache.set("a", "x", size=6)
+    cache.set("b", "y", size=6)
+
+    assert "a" not in cache
+    assert "b" in cache
+
+    # Oversized entries are skipped instead of flushing the whole cache
+    cache.set("huge", "z", size=11)
+    assert "huge" not in cache
+    assert "b" in cache
+
+
+def test_ttl_cache_expiry_and_stats():
+    """Expired entries count as misses"""
+    cache = TTLCache(max_entries=10)
+    cache.set("a", 1, ttl=0.01)
+    assert cache.get("a") == 1
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 0
+
+
+def test_normalize_url():
+    """Equivalent URLs share one cache key"""
+    variants = [
+        "https://Example.com/guide/?b=2&a=1",
+        "https://example.com:443/guide?a=1&b=2#section",
+        "https://example.com/guide?utm_source=news&a=1&b=2&gclid=abc",
+    ]
+    normalized = {normalize_url(url) for url in variants}
+    assert normalized == {"https://example.com/guide?a=1&b=2"}
+    assert len({cache_key(url) for url in variants}) == 1
+
+    assert normalize_url("https://example.com") == "https://example.com/"
+    assert cache_key("https://example.com/a") != cache_key("https://example.com/b")
+
+
+def test_ttl_for_url_domain_overrides():
+    """The most specific domain override wins, falling back to the default TTL"""
+    original = settings.extraction_cache_domain_ttls
+    try:
+        settings.extraction_cache_domain_ttls = "example.com=600, news.example.com=60"
+        assert ttl_for_url("https://news.example.com/today") == 60
+        assert ttl_for_url("https://www.example.com/") == 600
+        assert ttl_for_url("https://other.org/") == settings.extraction_cache_ttl
+    finally:
+        settings.extraction_cache_domain_ttls = original
+
+
+CHUNK = "In 2023 the average mortgage rate was 6.5% for most borrowers."
+CLAUDE_ISSUE = {
+    "description": "Outdated mortgage rate",
+    "flaggedText": "In 2023 the average mortgage rate was 6.5%",
+    "reasoning": "Found Date: 2023, Current Date: 2025, Age: 2 years, Threshold: 1 year, Verdict: STALE. Confidence: 90%"
+}
+
+
+@pytest.fixture
+def claude(monkeypatch):
+    """Count Claude calls and answer them from `responses` (text or exception)"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    monkeypatch.setattr(database, "db", mongomock_motor.AsyncMongoMockClient().updateq)
+    monkeypatch.setattr(detection_cache, "_memory_cache", TTLCache(max_entries=16))
+    monkeypatch.setattr(settings, "detection_cache_ttl", 3600)
+
+    fake = SimpleNamespace(calls=0, responses=[])
+
+    async def limited_call(provider, call):
+        fake.calls += 1
+        response = fake.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return SimpleNamespace(
+            usage=SimpleNamespace(input_tokens=1, output_tokens=1),
+            content=[SimpleNamespace(text=response)]
+        )
+
+    monkeypatch.setattr(detector, "limited_call", limited_call)
+    return fake
+
+
+def test_detection_memo_hit_and_miss(claude):
+    """An identical chunk is served from the memo; other content is a miss"""
+    claude.responses = [json.dumps([CLAUDE_ISSUE]), "[]"]
+
+    async def run():
+        first = await detector.analyze_chunk("https://example.com", CHUNK, {})
+        second = await detector.analyze_chunk("https://example.com", CHUNK, {})
+        assert claude.calls == 1
+        assert [i["flaggedText"] for i in second] == [i["flaggedText"] for i in first]
+        # Memoized issues get fresh ids so each run tracks its own
+        assert second[0]["id"] != first[0]["id"]
+
+        assert await detector.analyze_chunk("https://example.com", CHUNK + " Updated.", {}) == []
+        assert claude.calls == 2
+
+    asyncio.run(run())
+    stats = detection_cache.detection_cache_stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_force_refresh_bypasses_detection_memo(claude):
+    """force_refresh calls Claude again and replaces the memoized issues"""
+    claude.responses = [json.dumps([CLAUDE_ISSUE]), "[]"]
+
+    async def run():
+        assert len(await detector.analyze_chunk("https://example.com", CHUNK, {})) == 1
+        assert await detector.analyze_chunk("https://example.com", CHUNK, {}, force_refresh=True) == []
+        assert claude.calls == 2
+
+        # The refreshed result is what later runs reuse
+        assert await detector.analyze_chunk("https://example.com", CHUNK, {}) == []
+        assert claude.calls == 2
+
+    asyncio.run(run())
+
+
+def test_failed_detection_is_not_memoized(claude):
+    """A failed or unparseable Claude call is retried by the next run"""
+    claude.responses = [RuntimeError("overloaded"), "[{not json]", json.dumps([CLAUDE_ISSUE])]
+
+    async def run():
+        failed = await detector.detect_stale_content("https://example.com", CHUNK, {})
+        assert failed["status"] == "failed"
+        with pytest.raises(ValueError):
+            await detector.analyze_chunk("https://example.com", CHUNK, {})
+        assert await database.db.detection_cache.count_documents({}) == 0
+
+        assert len(await detector.analyze_chunk("https://example.com", CHUNK, {})) == 1
+        assert claude.calls == 3
+        assert await database.db.detection_cache.count_documents({}) == 1
+
+    asyncio.run(run())
+
+
+def test_user_cache_counters_and_expiry(monkeypatch):
+    """/healthz reports user cache hits and misses; expired users are re-read"""
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from bson import ObjectId
+    from fastapi.testclient import TestClient
+    import main
+    from auth import dependencies
+    from auth.jwt import create_access_token
+    from crud import token_blacklist
+
+    mock_db = mongomock_motor.AsyncMongoMockClient().updateq
+    monkeypatch.setattr(database, "db", mock_db)
+    monkeypatch.setattr(dependencies, "_user_cache", TTLCache(max_entries=16, default_ttl=0.05))
+    monkeypatch.setattr(token_blacklist, "_not_revoked", TTLCache(max_entries=16, default_ttl=60))
+
+    user_id = ObjectId()
+    asyncio.run(mock_db.users.insert_one({"_id": user_id, "email": "a@example.com", "name": "Before"}))
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {create_access_token(str(user_id))}"}
+
+    assert client.get("/api/v1/auth/me", headers=headers).json()["name"] == "Before"
+    asyncio.run(mock_db.users.update_one({"_id": user_id}, {"$set": {"name": "After"}}))
+    # Served from the cache until the entry expires
+    assert client.get("/api/v1/auth/me", headers=headers).json()["name"] == "Before"
+
+    users = client.get("/healthz").json()["caches"]["users"]
+    assert (users["hits"], users["misses"], users["entries"]) == (1, 1, 1)
+
+    time.sleep(0.06)
+    assert client.get("/api/v1/auth/me", headers=headers).json()["name"] == "After"
+    users = client.get("/healthz").json()["caches"]["users"]
+    assert (users["hits"], users["misses"]) == (1, 2)
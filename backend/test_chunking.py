@@ -0,0 +1,165 @@
+"""
+Test suite for heading-aware chunking, the temporal pre-filter and
+cross-chunk issue merging.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+
+from config import settings
+from services import detector
+from services.chunking import split_sections, chunk_content
+from services.detector import merge_issues, select_temporal_windows
+
+
+def _build_page(sections: int, paragraph: str, paragraphs_per_section: int = 3) -> str:
+    parts = ["# Mortgage Guide"]
+    for i in range(1, sections + 1):
+        parts.append(f"## Section {i}")
+        parts.extend(f"{paragraph} (section {i}, paragraph {j})" for j in range(paragraphs_per_section))
+    return "\n\n".join(parts)
+
+
+def test_split_sections_on_known_headers():
+    """Only headings reported by the extractor start a new section"""
+    content = "# Title\n\nIntro.\n\n## Rates\n\nRates were 6.5% in 2023.\n\n## Not A Real Heading\n\nMore text."
+    headers = {"h1": ["Title"], "h2": ["Rates"], "h3": [], "h4": []}
+
+    sections = split_sections(content, headers)
+    assert len(sections) == 2
+    assert sections[1].startswith("## Rates")
+    assert "## Not A Real Heading" in sections[1]
+
+    # Without headers every markdown heading is a boundary
+    assert len(split_sections(content)) == 3
+
+
+def test_short_content_is_single_chunk():
+    content = "# Title\n\nAs of 2023, rates were 6.5%."
+    assert chunk_content(content, max_chars=8000) == [content]
+    assert chunk_content("", max_chars=8000) == []
+
+
+def test_chunks_cover_whole_document_within_budget():
+    """Every paragraph lands in some chunk and no chunk exceeds the budget"""
+    paragraph = "According to 2023 data, the average rate was 6.5% for a 30-year fixed loan."
+    content = _build_page(sections=30, paragraph=paragraph)
+
+    chunks = chunk_content(content, max_chars=1500, overlap=200)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1500 for chunk in chunks)
+
+    for i in range(1, 31):
+        marker = f"(section {i}, paragraph 2)"
+        assert any(marker in chunk for chunk in chunks), marker
+
+
+def test_chunks_start_on_headings_with_overlap():
+    """Chunks after the first begin with overlap from the previous chunk, then a heading"""
+    paragraph = "In Q4 2024, mortgage applications increased by 15% compared to 2023 levels."
+    content = _build_page(sections=12, paragraph=paragraph)
+
+    chunks = chunk_content(content, max_chars=1200, overlap=150)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        overlap, _, body = chunk.partition("\n\n## ")
+        assert body, "chunk body should start at a heading"
+        assert overlap and overlap in previous
+
+
+def test_oversized_section_is_split():
+    """A single section larger than the budget is broken on paragraphs"""
+    content = "## Rates\n\n" + "\n\n".join(f"Rates in {2000 + i} were {i}.5%." for i in range(400))
+    chunks = chunk_content(content, max_chars=1000, overlap=100)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1000 for chunk in chunks)
+    assert any("Rates in 2399 were 399.5%." in chunk for chunk in chunks)
+
+
+def test_merge_issues_dedupes_overlap():
+    """Issues found in two overlapping chunks are merged, keeping document order"""
+    chunks = [
+        "Intro.\n\nRates were 6.5% in 2023.",
+        "Rates were 6.5% in 2023.\n\nFees were $500 in 2022.",
+    ]
+    first = [
+        {"id": "a", "flaggedText": "Rates were 6.5% in 2023.", "confidence": 0.8},
+    ]
+    second = [
+        {"id": "b", "flaggedText": "Fees were $500 in 2022.", "confidence": 0.9},
+        {"id": "c", "flaggedText": "rates were  **6.5%** in 2023.", "confidence": 0.95},
+    ]
+
+    merged = merge_issues([first, second], chunks)
+    assert [issue["id"] for issue in merged] == ["c", "b"]
+
+
+def test_merge_issues_keeps_repeats_outside_the_overlap():
+    """The same stale phrase in two different sections stays two issues"""
+    page = "\n\n".join([
+        "## Buying", "Rates were 6.5% in 2023.", "Filler about buying.",
+        "## Refinancing", "Rates were 6.5% in 2023.", "Filler about refinancing.",
+    ])
+    chunks = chunk_content(page, max_chars=80, overlap=30)
+    assert len(chunks) > 2
+    issue_lists = [
+        [{"id": f"chunk{i}", "flaggedText": "Rates were 6.5% in 2023.", "confidence": 0.9}]
+        if "Rates were" in chunk else []
+        for i, chunk in enumerate(chunks)
+    ]
+
+    merged = merge_issues(issue_lists, chunks)
+    assert len(merged) == 2
+
+
+def test_detection_with_failed_chunks_is_partial(monkeypatch):
+    """A page where some chunks failed is reported as partial, not clean"""
+    page = _build_page(6, "In 2023 rates were 6.5% for most borrowers", paragraphs_per_section=4)
+
+    async def flaky(url, chunk, domain_context, force_refresh=False):
+        if "Section 3" in chunk:
+            raise RuntimeError("upstream down")
+        return []
+
+    monkeypatch.setattr(detector, "analyze_chunk", flaky)
+    monkeypatch.setattr(settings, "detection_chunk_chars", 600)
+    monkeypatch.setattr(settings, "detection_prefilter", False)
+
+    detection = asyncio.run(detector.detect_stale_content("https://example.com", page, {}))
+    assert detection["status"] == "partial"
+    assert detection["failed_chunks"] >= 1
+    assert detection["failed_chunks"] < detection["chunk_count"]
+
+
+def test_temporal_windows_keep_dated_paragraphs_with_context():
+    """Dated paragraphs are kept with their neighbours, headings and page title"""
+    content = "\n\n".join([
+        "# Mortgage Guide",
+        "Welcome to our guide.",
+        "## Loan Types",
+        "There are many kinds of loans.",
+        "Fixed loans are popular.",
+        "Adjustable loans vary.",
+        "Jumbo loans are large.",
+        "## Rates",
+        "Some background on rates.",
+        "As of 2023, rates were 6.5%.",
+        "Talk to a lender.",
+        "Unrelated closing remarks.",
+    ])
+
+    windows = select_temporal_windows(content, context_paragraphs=1)
+    assert "As of 2023, rates were 6.5%." in windows
+    assert "Some background on rates." in windows
+    assert "Talk to a lender." in windows
+    assert "## Rates" in windows
+    assert "# Mortgage Guide" in windows
+    assert "Fixed loans are popular." not in windows
+    assert "Unrelated closing remarks." not in windows
+
+
+def test_temporal_windows_empty_without_markers():
+    """Pages with no dated content produce no windows, so Claude is skipped"""
+    content = "# Loan Types\n\nThere are many kinds of loans.\n\n## Fixed\n\nFixed loans are popular."
+    assert select_temporal_windows(content) == ""
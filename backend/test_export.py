@@ -0,0 +1,171 @@
+"""
+Test suite for the streamed CSV export.
+
+The expected output comes from the CSV writer of the original
+export_analysis_csv route, which built the whole file from the results
+embedded in the run document.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import csv
+import io
+import pytest
+from bson import ObjectId
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import database
+from crud.analysis import insert_results
+from services.export import stream_csv
+from utils.text_processing import format_issue_with_reason_for_csv
+
+
+def legacy_csv(results: list, selected_urls: list = None) -> str:
+    """The original export_analysis_csv body, minus the route plumbing"""
+    if selected_urls:
+        results = [result for result in results if result["url"] in selected_urls]
+
+    max_issues = 0
+    for result in results:
+        issue_count = len(result.get("issues", []))
+        if issue_count > max_issues:
+            max_issues = issue_count
+
+    output = io.StringIO()
+    writer = csv.writer(output)
+
+    headers = ["URL", "Page Title", "Meta Title", "Meta Description", "H1", "H2", "H3", "H4", "Status", "Issue Count"]
+    for i in range(1, max_issues + 1):
+        headers.append(f"Issue {i}")
+    writer.writerow(headers)
+
+    for result in results:
+        issues = result.get("issues", [])
+        row = [
+            result["url"],
+            result["title"],
+            result.get("metaTitle", ""),
+            result.get("metaDescription", ""),
+            " | ".join(result.get("h1s", [])),
+            " | ".join(result.get("h2s", [])),
+            " | ".join(result.get("h3s", [])),
+            " | ".join(result.get("h4s", [])),
+            result["status"],
+            result["issueCount"]
+        ]
+        for i in range(max_issues):
+            row.append(format_issue_with_reason_for_csv(issues[i]) if i < len(issues) else "")
+        writer.writerow(row)
+
+    return output.getvalue()
+
+
+def issue(n: int, **extra) -> dict:
+    return {
+        "id": f"issue_{n:08d}",
+        "description": f"Rate from **2023**, issue {n}",
+        "flaggedText": 'Rates were "6.5%", per the 2023 report',
+        "reasoning": "Found Date: 2023\nCurrent Date: 2025",
+        "status": "open",
+        **extra
+    }
+
+
+RESULTS = [
+    {
+        "url": "https://example.com/rates?a=1,b=2",
+        "title": 'Mortgage rates, "explained"',
+        "metaTitle": "Rates | Example",
+        "metaDescription": "Line one\nline two",
+        "h1s": ["Rates", "2023 rates"],
+        "h2s": ["Fixed, variable"],
+        "h3s": [],
+        "h4s": ["Ünïcode — heading"],
+        "status": "success",
+        "issueCount": 3,
+        "issues": [
+            issue(1),
+            issue(2, suggestedSources=[
+                {"title": "Fed data", "url": "https://fed.example/h15", "snippet": "Rates, weekly", "isAccepted": True},
+                {"title": "Ignored", "url": "https://other.example", "isAccepted": False}
+            ]),
+            issue(3)
+        ]
+    },
+    {
+        "url": "https://example.com/blocked",
+        "title": "Failed - Unable to Access",
+        "status": "failed",
+        "issueCount": 0,
+        "issues": []
+    },
+    {
+        "url": "https://example.com/clean",
+        "title": "Clean page",
+        "metaTitle": "",
+        "metaDescription": "",
+        "h1s": ["Clean"],
+        "h2s": [],
+        "h3s": [],
+        "h4s": [],
+        "status": "success",
+        "issueCount": 0,
+        "issues": []
+    },
+    {
+        "url": "https://example.com/one",
+        "title": "One issue",
+        "metaTitle": "",
+        "metaDescription": "",
+        "h1s": [],
+        "h2s": [],
+        "h3s": [],
+        "h4s": [],
+        "status": "success",
+        "issueCount": 1,
+        "issues": [issue(4)]
+    }
+]
+
+
+@pytest.fixture
+def run(monkeypatch):
+    mock_db = mongomock_motor.AsyncMongoMockClient().updateq
+    monkeypatch.setattr(database, "db", mock_db)
+
+    async def create():
+        user_id = ObjectId()
+        run_id = (await mock_db.analysis_runs.insert_one({
+            "user_id": user_id,
+            "status": "completed",
+            "max_issue_count": 3
+        })).inserted_id
+        await insert_results(str(run_id), str(user_id), RESULTS)
+        return await mock_db.analysis_runs.find_one({"_id": run_id})
+
+    return asyncio.run(create())
+
+
+async def collect(run: dict, urls: list = None) -> str:
+    return "".join([chunk async for chunk in stream_csv(run, urls)])
+
+
+def test_stream_csv_matches_legacy_export(run):
+    """Header, quoting and padding of empty issue columns are unchanged"""
+    assert asyncio.run(collect(run)) == legacy_csv(RESULTS)
+
+    # Older runs without max_issue_count compute the column count
+    del run["max_issue_count"]
+    assert asyncio.run(collect(run)) == legacy_csv(RESULTS)
+
+
+def test_stream_csv_url_subset_matches_legacy_export(run):
+    """A URL subset narrows the issue columns to that subset"""
+    urls = ["https://example.com/one", "https://example.com/blocked"]
+    assert asyncio.run(collect(run, urls)) == legacy_csv(RESULTS, urls)
+
+    urls = ["https://example.com/clean"]
+    assert asyncio.run(collect(run, urls)) == legacy_csv(RESULTS, urls)
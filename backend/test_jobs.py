@@ -0,0 +1,197 @@
+"""
+Test suite for the MongoDB job queue and worker lease handling.
+
+Runs against an in-memory MongoDB (mongomock-motor).
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import pytest
+from bson import ObjectId
+from datetime import datetime, timedelta
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import database
+import worker
+from config import settings
+from crud.jobs import (
+    enqueue_job, enqueue_jobs, claim_job, heartbeat_job, fail_job, release_job,
+    reap_abandoned_jobs, PRIORITY_BULK
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    mock_db = mongomock_motor.AsyncMongoMockClient().updateq
+    monkeypatch.setattr(database, "db", mock_db)
+    monkeypatch.setattr(settings, "job_max_attempts", 2)
+    return mock_db
+
+
+async def create_run() -> str:
+    result = await database.db.analysis_runs.insert_one({"user_id": ObjectId(), "status": "processing"})
+    return str(result.inserted_id)
+
+
+async def enqueue(run_id: str, offset: int = 0, created_at: datetime = None) -> ObjectId:
+    job_id = ObjectId(await enqueue_job("analysis", run_id, str(ObjectId()), {"urls": [], "offset": offset}))
+    if created_at is not None:
+        await database.db.jobs.update_one({"_id": job_id}, {"$set": {"created_at": created_at}})
+    return job_id
+
+
+async def expire_lease(job_id: ObjectId) -> None:
+    await database.db.jobs.update_one(
+        {"_id": job_id},
+        {"$set": {"lease_expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+    )
+
+
+def test_jobs_are_claimed_oldest_first(db):
+    async def run():
+        run_id = await create_run()
+        now = datetime.utcnow()
+        newer = await enqueue(run_id, 100, now)
+        older = await enqueue(run_id, 0, now - timedelta(minutes=1))
+
+        first = await claim_job("w1")
+        second = await claim_job("w2")
+        assert (first["_id"], second["_id"]) == (older, newer)
+        assert first["status"] == "running" and first["lease_owner"] == "w1"
+        assert first["attempts"] == 1
+        # Both leases are live, so nothing else is claimable
+        assert await claim_job("w3") is None
+
+    asyncio.run(run())
+
+
+def test_interactive_jobs_are_claimed_ahead_of_bulk_shards(db):
+    async def run():
+        bulk_run = await create_run()
+        await enqueue_jobs(
+            "analysis", bulk_run, str(ObjectId()),
+            [{"urls": [], "offset": offset} for offset in range(0, 300, 100)],
+            PRIORITY_BULK
+        )
+        interactive = await enqueue(await create_run())
+
+        assert (await claim_job("w1"))["_id"] == interactive
+        # Then the bulk shards
+        offsets = [(await claim_job("w1"))["payload"]["offset"] for _ in range(3)]
+        assert sorted(offsets) == [0, 100, 200]
+
+    asyncio.run(run())
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(db):
+    async def run():
+        job_id = await enqueue(await create_run())
+        await claim_job("w1")
+        await expire_lease(job_id)
+
+        reclaimed = await claim_job("w2")
+        assert reclaimed["_id"] == job_id
+        assert reclaimed["lease_owner"] == "w2" and reclaimed["attempts"] == 2
+        # The first worker finds out on its next heartbeat
+        assert await heartbeat_job(job_id, "w1") is False
+        assert await heartbeat_job(job_id, "w2") is True
+
+    asyncio.run(run())
+
+
+def test_release_does_not_consume_an_attempt(db):
+    async def run():
+        job_id = await enqueue(await create_run())
+        await claim_job("w1")
+        await release_job(job_id, "w1")
+
+        job = await database.db.jobs.find_one({"_id": job_id})
+        assert job["status"] == "queued" and job["attempts"] == 0 and job["lease_owner"] is None
+        assert (await claim_job("w2"))["attempts"] == 1
+
+    asyncio.run(run())
+
+
+def test_exhausted_job_fails_its_run(db, monkeypatch):
+    async def broken(job):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setitem(worker.JOB_HANDLERS, "analysis", broken)
+
+    async def run():
+        run_id = await create_run()
+        job_id = await enqueue(run_id)
+
+        # First attempt: queued again, the run keeps processing
+        await worker.execute_job(await claim_job("w1"), "w1")
+        job = await database.db.jobs.find_one({"_id": job_id})
+        assert job["status"] == "queued" and job["error"] == "RuntimeError: upstream down"
+        assert (await database.db.analysis_runs.find_one({"_id": ObjectId(run_id)}))["status"] == "processing"
+
+        # Last attempt: the job and its run fail
+        await worker.execute_job(await claim_job("w1"), "w1")
+        job = await database.db.jobs.find_one({"_id": job_id})
+        assert job["status"] == "failed" and job["attempts"] == 2
+        assert (await database.db.analysis_runs.find_one({"_id": ObjectId(run_id)}))["status"] == "failed"
+        assert await claim_job("w2") is None
+
+    asyncio.run(run())
+
+
+def test_fail_job_reports_exhaustion(db):
+    async def run():
+        job_id = await enqueue(await create_run())
+        job = await claim_job("w1")
+        assert await fail_job(job, "w1", "boom") is False
+        job = await claim_job("w1")
+        assert await fail_job(job, "w1", "boom") is True
+        assert (await database.db.jobs.find_one({"_id": job_id}))["status"] == "failed"
+
+    asyncio.run(run())
+
+
+def test_lease_expired_on_final_attempt_is_reaped(db):
+    async def run():
+        job_id = await enqueue(await create_run())
+        await claim_job("w1")
+        await expire_lease(job_id)
+        assert await reap_abandoned_jobs() == []  # An attempt remains: reclaimable instead
+
+        await claim_job("w2")
+        await expire_lease(job_id)
+        reaped = await reap_abandoned_jobs()
+        assert [job["_id"] for job in reaped] == [job_id]
+        job = await database.db.jobs.find_one({"_id": job_id})
+        assert job["status"] == "failed" and job["error"] == "Lease expired on final attempt"
+        assert await claim_job("w3") is None
+
+    asyncio.run(run())
+
+
+def test_lost_lease_waits_for_the_handler_to_stop(db, monkeypatch):
+    unwound = []
+
+    async def slow_to_cancel(job):
+        try:
+            await asyncio.sleep(60)
+        finally:
+            await asyncio.sleep(0.05)
+            unwound.append(job["_id"])
+
+    monkeypatch.setitem(worker.JOB_HANDLERS, "analysis", slow_to_cancel)
+    monkeypatch.setattr(settings, "job_heartbeat_seconds", 0.01)
+
+    async def run():
+        job_id = await enqueue(await create_run())
+        job = await claim_job("w1")
+        await expire_lease(job_id)
+        await claim_job("w2")
+
+        await asyncio.wait_for(worker.execute_job(job, "w1"), timeout=5)
+        assert unwound == [job_id]
+        assert (await database.db.jobs.find_one({"_id": job_id}))["lease_owner"] == "w2"
+
+    asyncio.run(run())
@@ -0,0 +1,149 @@
+"""
+Test suite for the startup migration of results embedded in run documents.
+
+Runs against an in-memory MongoDB (mongomock-motor).
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import json
+import pytest
+from bson import ObjectId
+from datetime import datetime
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from fastapi.testclient import TestClient
+
+import database
+from crud.analysis import (
+    migrate_embedded_results, backfill_issue_created_at, insert_result, EMBEDDED_RESULTS_MIGRATION
+)
+
+USER_ID = ObjectId()
+
+
+@pytest.fixture
+def db(monkeypatch):
+    # pymongo >= 4.9 passes a sort option that mongomock's bulk builder predates
+    from mongomock.collection import BulkOperationBuilder
+    add_update = BulkOperationBuilder.add_update
+    monkeypatch.setattr(
+        BulkOperationBuilder, "add_update",
+        lambda self, *args, sort=None, **kwargs: add_update(self, *args, **kwargs)
+    )
+
+    mock_db = mongomock_motor.AsyncMongoMockClient().updateq
+    monkeypatch.setattr(database, "db", mock_db)
+    return mock_db
+
+
+def legacy_run(issue_ids: list) -> dict:
+    """A run document from before per-result storage, with its results inline"""
+    return {
+        "user_id": USER_ID,
+        "timestamp": datetime(2025, 3, 1),
+        "url_count": 2,
+        "total_issues": len(issue_ids),
+        "status": "completed",
+        "domain_context": {"description": "d", "entityTypes": "e", "stalenessRules": "s"},
+        "results": [
+            {
+                "url": "https://example.com/a",
+                "title": "A",
+                "status": "success",
+                "issueCount": len(issue_ids),
+                "issues": [
+                    {"id": issue_id, "description": "Old rate", "flaggedText": "In 2023 rates were 6.5%",
+                     "reasoning": "Found Date: 2023", "status": "open"}
+                    for issue_id in issue_ids
+                ]
+            },
+            {"url": "https://example.com/b", "title": "Failed to Access", "status": "failed",
+             "issueCount": 0, "issues": []}
+        ]
+    }
+
+
+def client_as_user():
+    import main
+    from auth.dependencies import get_current_user
+
+    main.app.dependency_overrides[get_current_user] = lambda: {"id": str(USER_ID)}
+    return TestClient(main.app)
+
+
+@pytest.fixture(autouse=True)
+def clear_overrides():
+    yield
+    import main
+    main.app.dependency_overrides.clear()
+
+
+def test_migrated_issues_can_still_be_updated(db):
+    run_id = asyncio.run(db.analysis_runs.insert_one(legacy_run(["issue_aaaa1111", "issue_bbbb2222"]))).inserted_id
+    assert asyncio.run(migrate_embedded_results()) == 1
+
+    run = asyncio.run(db.analysis_runs.find_one({"_id": run_id}))
+    assert "results" not in run
+    assert asyncio.run(db.analysis_results.count_documents({"run_id": run_id})) == 2
+    assert asyncio.run(db.analysis_issues.count_documents({"run_id": run_id})) == 2
+
+    response = client_as_user().patch(
+        f"/api/v1/analysis/runs/{run_id}/issues/issue_bbbb2222",
+        json={"status": "in_progress", "assignedTo": "Sam"}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["id"] == "issue_bbbb2222"
+    issue = asyncio.run(db.analysis_issues.find_one({"run_id": run_id, "id": "issue_bbbb2222"}))
+    assert issue["status"] == "in_progress" and issue["assignedTo"] == "Sam"
+
+
+def test_completed_migration_is_skipped(db):
+    async def run():
+        await db.analysis_runs.insert_one(legacy_run(["issue_aaaa1111"]))
+        assert await migrate_embedded_results() == 1
+        assert await db.migrations.find_one({"_id": EMBEDDED_RESULTS_MIGRATION}) is not None
+
+        # Once recorded, startup no longer scans analysis_runs
+        await db.analysis_runs.insert_one(legacy_run(["issue_cccc3333"]))
+        assert await migrate_embedded_results() == 0
+        assert await db.analysis_issues.count_documents({}) == 1
+
+    asyncio.run(run())
+
+
+def test_migrated_issues_keep_their_detection_time(db):
+    asyncio.run(db.analysis_runs.insert_one(legacy_run(["issue_aaaa1111"])))
+    assert asyncio.run(migrate_embedded_results()) == 1
+
+    # Detected with the run in March 2025, not when the migration ran
+    issue = asyncio.run(db.analysis_issues.find_one({"id": "issue_aaaa1111"}))
+    assert issue["created_at"] == datetime(2025, 3, 1)
+
+    client = client_as_user()
+    rows = client.get("/api/v1/analysis/issues/export", params={"createdBefore": "2025-04-01T00:00:00"}).text
+    assert [json.loads(line)["issueId"] for line in rows.splitlines()] == ["issue_aaaa1111"]
+    assert json.loads(rows)["createdAt"].startswith("2025-03-01")
+    assert client.get("/api/v1/analysis/issues/export", params={"createdAfter": "2025-04-01T00:00:00"}).text == ""
+
+
+def test_backfill_stamps_issues_stored_without_created_at(db):
+    async def run():
+        run_id = (await db.analysis_runs.insert_one(
+            {"user_id": USER_ID, "timestamp": datetime(2025, 6, 1), "status": "completed"}
+        )).inserted_id
+        await insert_result(str(run_id), str(USER_ID), 0, {
+            "url": "https://example.com/a", "title": "A", "status": "success", "issueCount": 1,
+            "issues": [{"id": "issue_dddd4444", "description": "d", "flaggedText": "f", "reasoning": "r"}]
+        })
+        await db.analysis_issues.update_many({}, {"$unset": {"created_at": ""}})
+
+        assert await backfill_issue_created_at() == 1
+        assert (await db.analysis_issues.find_one({"id": "issue_dddd4444"}))["created_at"] == datetime(2025, 6, 1)
+        assert await backfill_issue_created_at() == 0
+
+    asyncio.run(run())
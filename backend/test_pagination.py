@@ -0,0 +1,48 @@
+"""
+Test suite for keyset pagination cursors.
+"""
+
+import sys
+sys.path.append('.')
+
+import pytest
+from bson import ObjectId
+from datetime import datetime
+
+from utils.pagination import encode_cursor, decode_cursor, keyset_filter, parse_sort
+
+
+def test_cursor_round_trip_keeps_types():
+    """ObjectIds and datetimes survive the opaque cursor unchanged"""
+    doc = {"_id": ObjectId(), "dueDate": datetime(2026, 3, 1, 12, 30)}
+    value, last_id = decode_cursor(encode_cursor(doc, "dueDate"))
+    assert value == doc["dueDate"]
+    assert last_id == doc["_id"]
+
+    value, last_id = decode_cursor(encode_cursor({"_id": doc["_id"]}, "dueDate"))
+    assert value is None
+
+
+def test_malformed_cursor_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_keyset_filter_handles_nulls():
+    """Null sort values come first ascending and last descending"""
+    last_id = ObjectId()
+    ascending = keyset_filter("dueDate", 1, None, last_id)
+    assert {"dueDate": {"$ne": None}} in ascending["$or"]
+
+    descending = keyset_filter("dueDate", -1, datetime(2026, 1, 1), last_id)
+    assert {"dueDate": None} in descending["$or"]
+
+    assert keyset_filter("_id", -1, last_id, last_id) == {"_id": {"$lt": last_id}}
+
+
+def test_parse_sort():
+    allowed = {"created": "_id", "dueDate": "dueDate"}
+    assert parse_sort(None, allowed, "created") == ("_id", 1)
+    assert parse_sort("-dueDate", allowed, "created") == ("dueDate", -1)
+    with pytest.raises(ValueError):
+        parse_sort("password", allowed, "created")
@@ -0,0 +1,114 @@
+"""
+Test suite for the analysis pipeline: failed rows, run counters and runs
+deleted while a shard is being analyzed.
+
+Runs against an in-memory MongoDB (mongomock-motor), with Firecrawl and
+Claude replaced at the extract and detect stages.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import pytest
+from bson import ObjectId
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+import database
+from services import pipeline
+from crud.analysis import get_run_results
+
+DOMAIN_CONTEXT = {"description": "d", "entityTypes": "e", "stalenessRules": "s"}
+
+
+@pytest.fixture
+def db(monkeypatch):
+    mock_db = mongomock_motor.AsyncMongoMockClient().updateq
+    monkeypatch.setattr(database, "db", mock_db)
+    return mock_db
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    """Firecrawl fails for /blocked, Claude for /flaky; other pages have two issues"""
+    async def extract_content(url):
+        if url.endswith("/blocked"):
+            return {"status": "failed", "error": "Failed - Unable to Access: 403"}
+        return {"status": "success", "title": url, "content": "In 2023 rates were 6.5%.", "headers": {}}
+
+    async def detect_stale_content(url, content, domain_context, headers=None, force_refresh=False):
+        if url.endswith("/flaky"):
+            return {"status": "failed", "error": "Analysis failed: overloaded", "issues": [], "issue_count": 0}
+        issues = [
+            {"id": f"issue_{i}{len(url)}", "description": "d", "flaggedText": "f", "reasoning": "r", "status": "open"}
+            for i in range(2)
+        ]
+        return {"status": "success", "issues": issues, "issue_count": 2}
+
+    monkeypatch.setattr(pipeline, "extract_content", extract_content)
+    monkeypatch.setattr(pipeline, "detect_stale_content", detect_stale_content)
+
+
+async def create_run(url_count: int) -> str:
+    result = await database.db.analysis_runs.insert_one({
+        "user_id": ObjectId(),
+        "url_count": url_count,
+        "completed_count": 0,
+        "total_issues": 0,
+        "max_issue_count": 0,
+        "pending_jobs": 1,
+        "status": "processing"
+    })
+    return str(result.inserted_id)
+
+
+def test_failed_pages_are_stored_as_failed_rows(db, providers):
+    urls = ["https://example.com/ok", "https://example.com/blocked", "https://example.com/flaky"]
+
+    async def run():
+        run_id = await create_run(len(urls))
+        await pipeline.process_analysis(run_id, str(ObjectId()), urls, DOMAIN_CONTEXT, force_refresh=True)
+
+        results = await get_run_results(run_id)
+        assert [(r["url"], r["status"], r["issueCount"]) for r in results] == [
+            ("https://example.com/ok", "success", 2),
+            ("https://example.com/blocked", "failed", 0),
+            ("https://example.com/flaky", "failed", 0),
+        ]
+
+        run_doc = await db.analysis_runs.find_one({"_id": ObjectId(run_id)})
+        assert run_doc["status"] == "completed"
+        assert run_doc["completed_count"] == 3
+        assert run_doc["total_issues"] == 2 == await db.analysis_issues.count_documents({})
+        assert run_doc["max_issue_count"] == 2
+        assert run_doc["profile_totals"]["urls"] == 3
+
+    asyncio.run(run())
+
+
+def test_shard_stops_when_its_run_is_deleted(db, providers, monkeypatch):
+    urls = [f"https://example.com/page{i}" for i in range(6)]
+    detect = pipeline.detect_stale_content
+    run_ids = []
+
+    async def delete_midway(url, content, domain_context, headers=None, force_refresh=False):
+        if url.endswith("page3"):
+            await db.analysis_runs.delete_one({"_id": ObjectId(run_ids[0])})
+        return await detect(url, content, domain_context, headers, force_refresh)
+
+    monkeypatch.setattr(pipeline, "detect_stale_content", delete_midway)
+
+    async def run():
+        run_ids.append(await create_run(len(urls)))
+        await pipeline.process_analysis(run_ids[0], str(ObjectId()), urls, DOMAIN_CONTEXT, force_refresh=True)
+
+        # Nothing the shard stored survives the delete
+        assert await db.analysis_results.count_documents({}) == 0
+        assert await db.analysis_issues.count_documents({}) == 0
+
+        # A retried job for the deleted run does nothing
+        await pipeline.process_analysis(run_ids[0], str(ObjectId()), urls, DOMAIN_CONTEXT, force_refresh=True)
+        assert await db.analysis_results.count_documents({}) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,92 @@
+"""
+Test suite for the adaptive upstream rate limiter.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import httpx
+import pytest
+
+from config import settings
+from services import rate_limit
+from services.rate_limit import (
+    AdaptiveLimiter, CircuitOpenError, classify_error, limited_call, retry_after_seconds
+)
+
+
+def status_error(status: int, headers: dict = None) -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://api.example.com/v1")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+@pytest.fixture
+def fresh_limiters(monkeypatch):
+    monkeypatch.setattr(rate_limit, "limiters", {})
+    monkeypatch.setattr(settings, "upstream_backoff_base", 0.001)
+    monkeypatch.setattr(settings, "upstream_max_attempts", 3)
+
+
+def test_classify_errors_and_retry_after():
+    assert classify_error(status_error(429)) == "rate_limited"
+    assert classify_error(status_error(503)) == "retryable"
+    assert classify_error(status_error(404)) == "fatal"
+    assert classify_error(httpx.ConnectError("refused")) == "retryable"
+    assert classify_error(ValueError("bad json")) == "fatal"
+
+    assert retry_after_seconds(status_error(429, {"Retry-After": "7"})) == 7.0
+    assert retry_after_seconds(status_error(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(status_error(429)) is None
+
+
+def test_rate_limited_call_is_retried_and_rate_adapts(fresh_limiters):
+    """A 429 halves the live rate; the retry succeeds and the rate recovers slowly"""
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise status_error(429, {"Retry-After": "0.01"})
+        return "ok"
+
+    assert asyncio.run(limited_call("claude", flaky)) == "ok"
+    limiter = rate_limit.get_limiter("claude")
+    assert len(calls) == 2
+    assert limiter.rate_limited == 1 and limiter.retries == 1
+    assert limiter.rate < limiter.max_rate
+
+
+def test_fatal_errors_are_not_retried(fresh_limiters):
+    calls = []
+
+    async def not_found():
+        calls.append(1)
+        raise status_error(404)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(limited_call("perplexity", not_found))
+    assert len(calls) == 1
+
+
+def test_circuit_opens_after_consecutive_failures():
+    limiter = AdaptiveLimiter("firecrawl", max_rate=100, failure_threshold=2, reset_seconds=60)
+
+    async def run():
+        for _ in range(2):
+            await limiter.acquire()
+            limiter.record_failure()
+        with pytest.raises(CircuitOpenError):
+            await limiter.acquire()
+
+        # After the reset window a single probe is let through
+        limiter._opened_at -= 60
+        await limiter.acquire()
+        with pytest.raises(CircuitOpenError):
+            await limiter.acquire()
+        limiter.record_success()
+        await limiter.acquire()
+
+    asyncio.run(run())
+    assert limiter.rejected == 2
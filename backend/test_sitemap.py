@@ -0,0 +1,79 @@
+"""
+Test suite for sitemap fetching safeguards.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import gzip
+import httpx
+import pytest
+import socket
+
+from services import sitemap
+from services.sitemap import _check_public, _gunzip, urls_from_sitemap, urls_from_list
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:27017/",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.0.0.5/sitemap.xml",
+    "http://[::1]/sitemap.xml",
+    "file:///etc/passwd",
+])
+def test_internal_addresses_rejected(url):
+    with pytest.raises(ValueError):
+        asyncio.run(_check_public(url))
+
+
+def test_gunzip_is_bounded():
+    bomb = gzip.compress(b"\0" * 1_000_000)
+    assert len(_gunzip(bomb, 1_000_000)) == 1_000_000
+    with pytest.raises(ValueError):
+        _gunzip(bomb, 10_000)
+
+
+def test_errors_do_not_leak_details():
+    with pytest.raises(ValueError) as error:
+        asyncio.run(urls_from_sitemap("http://127.0.0.1:27017/sitemap.xml"))
+    assert str(error.value) == "Could not read sitemap http://127.0.0.1:27017/sitemap.xml"
+
+
+def test_url_list_drops_junk_entries():
+    urls = [
+        " https://example.com/a ", "https://example.com/a", "ftp://example.com/b",
+        "javascript:alert(1)", "http://", "https://[::1", "example.com/c", "", "http://example.com/d"
+    ]
+    assert urls_from_list(urls) == ["https://example.com/a", "http://example.com/d"]
+    assert urls_from_list(urls, limit=1) == ["https://example.com/a"]
+
+
+def test_requests_connect_to_the_checked_address(monkeypatch):
+    """A second DNS answer (rebinding) is never used to connect"""
+    answers = {"example.com": ["93.184.216.34", "127.0.0.1"], "cdn.example.com": ["93.184.216.35"]}
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        address = answers[host].pop(0) if len(answers[host]) > 1 else answers[host][0]
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if request.url.path == "/sitemap.xml":
+            return httpx.Response(301, headers={"location": "https://cdn.example.com/pages.xml"})
+        return httpx.Response(200, text=(
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            "<url><loc>https://example.com/a</loc></url></urlset>"
+        ))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    monkeypatch.setattr(sitemap, "get_http_client", lambda: client)
+
+    assert asyncio.run(urls_from_sitemap("https://example.com/sitemap.xml")) == ["https://example.com/a"]
+    assert [(r.url.host, r.headers["host"], r.extensions["sni_hostname"]) for r in requests] == [
+        ("93.184.216.34", "example.com", "example.com"),
+        ("93.184.216.35", "cdn.example.com", "cdn.example.com"),
+    ]
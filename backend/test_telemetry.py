@@ -0,0 +1,42 @@
+"""
+Test suite for timing spans and Prometheus metric rendering.
+"""
+
+import sys
+sys.path.append('.')
+
+import pytest
+
+from utils.telemetry import Histogram, Counter, span, render_metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, provider="claude")
+
+    lines = histogram.render()
+    assert 'test_seconds_bucket{provider="claude",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{provider="claude",le="1"} 3' in lines
+    assert 'test_seconds_bucket{provider="claude",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{provider="claude"} 4' in lines
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("test_total", "Test counter")
+    counter.inc(2, model='say "hi"')
+    assert 'test_total{model="say \\"hi\\""} 2' in counter.render()
+
+
+def test_spans_nest_and_record_errors():
+    with span("outer", url="https://example.com") as outer:
+        with span("inner") as inner:
+            pass
+    assert inner.path == "outer/inner"
+    assert inner.attrs == {"url": "https://example.com"}
+    assert outer.duration >= inner.duration
+
+    with pytest.raises(ValueError):
+        with span("failing"):
+            raise ValueError("boom")
+    assert 'updateq_span_duration_seconds_count{outcome="error",span="failing"} 1' in render_metrics()
@@ -0,0 +1,72 @@
+"""
+Test suite for markdown stripping in CSV exports, against the previous
+pass-by-pass implementation kept in benchmark_markdown.py.
+"""
+
+import sys
+sys.path.append('.')
+
+import pytest
+
+from benchmark_markdown import legacy_strip_markdown
+from utils.text_processing import strip_markdown, format_issue_with_reason_for_csv
+
+
+@pytest.mark.parametrize("text", [
+    "**# Heading**",
+    "## **Bold heading**",
+    "**> quoted**",
+    "**line one\n# Heading**",
+    "text **# not a heading**",
+    "**a `b` c**",
+    "`**x**`",
+    "`a_b_c`",
+    "***bold italic***",
+    "___bold italic___",
+    "__*x*__",
+    "_**x**_",
+    "[**link**](https://example.com)",
+    "**[link](https://example.com)**",
+    "![](chart.png) caption",
+    "![alt](chart.png)",
+    "```code```after",
+    "***\ntext\n***",
+    "Intro\n\n---\n\nBody",
+    "a  b\n\n\n\nc",
+    "**Found Date:** 2023\n**Age:** 3 years\n> Confidence: 95%",
+])
+def test_matches_previous_implementation(text):
+    assert strip_markdown(text) == legacy_strip_markdown(text)
+
+
+@pytest.mark.parametrize("text, expected, previous", [
+    # A rule line no longer pairs with the emphasis below it
+    ("***\n**6.5%**", "6.5%", "6.5%*"),
+    ("___\n\n_fees_", "fees", "__\n\nfees_"),
+    # A delimiter nested inside itself keeps its inner pair
+    ("*_*2023*_*", "_2023_", "2023"),
+])
+def test_known_differences(text, expected, previous):
+    assert legacy_strip_markdown(text) == previous
+    assert strip_markdown(text) == expected
+
+
+def test_plain_text_is_unchanged():
+    assert strip_markdown("Rates were 6.5% in 2023.") == "Rates were 6.5% in 2023."
+    assert strip_markdown("") == ""
+
+
+def test_issue_cell_strips_every_field():
+    cell = format_issue_with_reason_for_csv({
+        "description": "**Outdated rate**",
+        "flaggedText": "Rates were *6.5%* in 2023",
+        "reasoning": "## Evidence\nFound Date: 2023",
+        "suggestedSources": [
+            {"title": "**PMMS**", "url": "https://example.com", "snippet": "`6.3%`", "isAccepted": True},
+            {"title": "Rejected", "url": "https://example.org", "isAccepted": False},
+        ]
+    })
+    assert cell == (
+        'Outdated rate\nFlagged: "Rates were 6.5% in 2023"\n\nReason: Evidence\nFound Date: 2023'
+        '\n\nSUGGESTED SOURCES:\n1. PMMS\n   "6.3%"\n   https://example.com'
+    )
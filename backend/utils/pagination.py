@@ -0,0 +1,61 @@
+"""
+Keyset (cursor) pagination helpers for MongoDB queries.
+
+A page is sorted on one field plus `_id` as a tie-breaker. The cursor is an
+opaque token holding the sort values of the last document returned, so the
+next page is an indexed range query instead of a skip over earlier pages.
+"""
+
+from bson import json_util
+from typing import Any, Optional, Tuple
+import base64
+
+
+def encode_cursor(doc: dict, field: str) -> str:
+    """Opaque cursor pointing just after doc in a (field, _id) ordering"""
+    payload = json_util.dumps({"v": doc.get(field), "id": doc["_id"]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, Any]:
+    """Return (value, _id) from a cursor; raises ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        return payload["v"], payload["id"]
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def keyset_filter(field: str, direction: int, value: Any, last_id: Any) -> dict:
+    """
+    Filter matching documents after (value, last_id) in a sort on
+    [(field, direction), ("_id", direction)]. MongoDB sorts null and missing
+    values before everything else, which the null branches account for.
+    """
+    id_op = "$gt" if direction == 1 else "$lt"
+    if field == "_id":
+        return {"_id": {id_op: last_id}}
+
+    same_value = {field: value, "_id": {id_op: last_id}}
+    if direction == 1:
+        if value is None:
+            return {"$or": [same_value, {field: {"$ne": None}}]}
+        return {"$or": [same_value, {field: {"$gt": value}}]}
+
+    if value is None:
+        return same_value
+    return {"$or": [same_value, {field: {"$lt": value}}, {field: None}]}
+
+
+def parse_sort(sort: Optional[str], allowed: dict, default: str) -> Tuple[str, int]:
+    """
+    Map an API sort parameter such as "dueDate" or "-dueDate" to a
+    (storage field, direction) pair; raises ValueError for unknown fields.
+    """
+    sort = sort or default
+    direction = -1 if sort.startswith("-") else 1
+    name = sort.lstrip("-")
+    if name not in allowed:
+        raise ValueError(f"Unsupported sort field: {name}")
+    return allowed[name], direction
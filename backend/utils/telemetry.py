@@ -0,0 +1,199 @@
+"""
+Logging, metrics and timing spans.
+
+Modules log through `logging.getLogger(__name__)`; `configure_logging` sets the
+root level from `log_level` plus per-logger overrides from `log_levels`
+(e.g. "services.detector=DEBUG,worker=WARNING").
+
+Metrics are in-process counters and histograms, rendered in the Prometheus
+text format by `render_metrics` (served at /metrics). `span` times a stage,
+records it in `updateq_span_duration_seconds` and nests: a span opened
+inside another is logged with its full path, e.g. "analyze/detect/validate".
+The outermost span also keeps a profile: the summed duration of each nested
+stage plus values added with `add_to_profile` (prompt sizes, tokens, ...).
+"""
+
+from config import settings
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+import bisect
+import logging
+import time
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging() -> None:
+    logging.basicConfig(level=settings.log_level.upper(), format=LOG_FORMAT)
+    logging.getLogger().setLevel(settings.log_level.upper())
+    for name, level in settings.log_level_map.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def _label_key(labels: dict) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = _label_key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(key)} {value:g}" for key, value in self._values.items()]
+        return lines
+
+
+class Gauge(Counter):
+    def set(self, value: float, **labels) -> None:
+        self._values[_label_key(labels)] = value
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        # label key -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+SPAN_SECONDS = Histogram(
+    "updateq_span_duration_seconds",
+    "Duration of analysis stages (extract, detect, validate, persist)"
+)
+UPSTREAM_SECONDS = Histogram(
+    "updateq_upstream_request_duration_seconds",
+    "Latency of individual upstream API attempts by provider and outcome"
+)
+UPSTREAM_TOKENS = Counter(
+    "updateq_upstream_tokens_total",
+    "Tokens reported by upstream LLM APIs by provider, model and direction"
+)
+UPSTREAM_RATE = Gauge(
+    "updateq_upstream_rate_limit",
+    "Current adaptive request rate per provider (requests/second)"
+)
+UPSTREAM_RETRIES = Counter(
+    "updateq_upstream_retries_total",
+    "Retried upstream attempts by provider and reason"
+)
+
+METRICS = [SPAN_SECONDS, UPSTREAM_SECONDS, UPSTREAM_TOKENS, UPSTREAM_RATE, UPSTREAM_RETRIES]
+
+
+def record_tokens(provider: str, model: str, input_tokens: Optional[int], output_tokens: Optional[int]) -> None:
+    if input_tokens:
+        UPSTREAM_TOKENS.inc(input_tokens, provider=provider, model=model, direction="input")
+    if output_tokens:
+        UPSTREAM_TOKENS.inc(output_tokens, provider=provider, model=model, direction="output")
+    add_to_profile(input_tokens=input_tokens or 0, output_tokens=output_tokens or 0)
+
+
+def render_metrics() -> str:
+    lines = []
+    for metric in METRICS:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+class Span:
+    __slots__ = ("name", "path", "attrs", "root", "profile", "started", "duration")
+
+    def __init__(self, name: str, path: str, attrs: dict, root: Optional["Span"] = None):
+        self.name = name
+        self.path = path
+        self.attrs = attrs
+        self.root = root or self
+        # Only used on the outermost span: stage name / counter -> summed value
+        self.profile: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.duration = None
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """
+    Time the enclosed block as stage `name`. Attributes (url, ...) are
+    inherited by nested spans and only appear in the debug log, never as
+    metric labels.
+    """
+    parent = _current_span.get()
+    if parent is not None:
+        attrs = {**parent.attrs, **attrs}
+    current = Span(name, f"{parent.path}/{name}" if parent else name, attrs, parent.root if parent else None)
+    token = _current_span.set(current)
+    outcome = "ok"
+    try:
+        yield current
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.duration = time.perf_counter() - current.started
+        if parent is not None:
+            profile = current.root.profile
+            profile[name] = profile.get(name, 0.0) + current.duration
+        SPAN_SECONDS.observe(current.duration, span=name, outcome=outcome)
+        if logger.isEnabledFor(logging.DEBUG):
+            details = " ".join(f"{key}={value}" for key, value in attrs.items())
+            logger.debug("span %s %s %.1fms %s", current.path, outcome, current.duration * 1000, details)
+
+
+def add_to_profile(**values: float) -> None:
+    """Add values to the profile of the enclosing outermost span, if any"""
+    current = _current_span.get()
+    if current is None:
+        return
+    profile = current.root.profile
+    for key, value in values.items():
+        profile[key] = profile.get(key, 0.0) + value
@@ -1,46 +1,98 @@
+from functools import lru_cache
 import re
 
+# One alternation over the inline constructs the exporter strips. Alternatives
+# are ordered so that, at any position, the same construct wins as in the old
+# pass-by-pass implementation (fences before inline code, an empty-alt image
+# before links, ** before *). The old strong-then-em passes also emptied
+# ***bold italic***, which a single pass only does with its own alternative.
+_MARKDOWN_TOKEN = re.compile(r"""
+      (?P<fence>```[\s\S]*?```)
+    | (?P<rule>^[\-\*_]{3,}$)
+    | `(?P<code>[^`]+)`
+    | (?P<image>!\[\]\([^\)]+\))
+    | \[(?P<link>[^\]]+)\]\([^\)]+\)
+    | \*\*\*(?P<strong_em>[^\*]+)\*\*\*
+    | ___(?P<strong_em_alt>[^_]+)___
+    | \*\*(?P<strong>[^\*]+)\*\*
+    | __(?P<strong_alt>[^_]+)__
+    | \*(?P<em>[^\*]+)\*
+    | _(?P<em_alt>[^_]+)_
+""", re.VERBOSE | re.MULTILINE)
+
+# Inline constructs only, for text inside another construct
+_INLINE_TOKEN = re.compile(r"""
+      `(?P<code>[^`]+)`
+    | (?P<image>!\[\]\([^\)]+\))
+    | \[(?P<link>[^\]]+)\]\([^\)]+\)
+    | \*\*\*(?P<strong_em>[^\*]+)\*\*\*
+    | ___(?P<strong_em_alt>[^_]+)___
+    | \*\*(?P<strong>[^\*]+)\*\*
+    | __(?P<strong_alt>[^_]+)__
+    | \*(?P<em>[^\*]+)\*
+    | _(?P<em_alt>[^_]+)_
+""", re.VERBOSE)
+
+# Line-level markers, removed after the inline constructs and in the old order,
+# so a marker uncovered by stripping emphasis ("**# Heading**") is removed too
+_LINE_MARKERS = (
+    (frozenset("#"), re.compile(r'^#{1,6}\s+', re.MULTILINE)),
+    (frozenset("-*_"), re.compile(r'^[\-\*_]{3,}$', re.MULTILINE)),
+    (frozenset(">"), re.compile(r'^>\s+', re.MULTILINE)),
+)
+
+_MARKDOWN_CHARS = frozenset("`*_[#>-")
+_EXTRA_WHITESPACE = re.compile(r'\n{3,}| {2,}')
+
+# Short strings (titles, snippets, flagged text) repeat across an export
+_MEMO_SIZE = 4096
+_MEMO_MAX_CHARS = 1024
+
+
+def _replace_token(match: re.Match) -> str:
+    inner = match.group(match.lastgroup)
+    if match.lastgroup in ("fence", "rule", "image"):
+        return ""
+    # Later passes of the old implementation also applied to the kept text
+    if _MARKDOWN_CHARS.isdisjoint(inner):
+        return inner
+    return _INLINE_TOKEN.sub(_replace_token, inner)
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    return "\n\n" if match.group()[0] == "\n" else " "
+
+
+def _strip(text: str) -> str:
+    if not _MARKDOWN_CHARS.isdisjoint(text):
+        text = _MARKDOWN_TOKEN.sub(_replace_token, text)
+        for chars, pattern in _LINE_MARKERS:
+            if not chars.isdisjoint(text):
+                text = pattern.sub("", text)
+    if "  " in text or "\n\n\n" in text:
+        text = _EXTRA_WHITESPACE.sub(_collapse_whitespace, text)
+    return text.strip()
+
+
+_strip_memo = lru_cache(maxsize=_MEMO_SIZE)(_strip)
+
 
 def strip_markdown(text: str) -> str:
     """
     Strip common markdown formatting from text to make it clean for CSV export.
     Removes: bold, italic, links, code blocks, headers, etc.
+
+    Matches the old pass-by-pass output, nested markup included, except where
+    those passes fed each other's leftovers (test_text_processing.py pins
+    both): a rule line next to emphasis ("***" then "**6.5%**") is now removed
+    cleanly instead of leaking a "*", and a delimiter nested inside itself
+    ("*_*2023*_*") keeps its inner pair.
     """
     if not text:
         return ""
-    
-    # Remove code blocks (```code```)
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    
-    # Remove inline code (`code`)
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
-    # Remove links but keep the text [text](url) -> text
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    
-    # Remove images ![alt](url)
-    text = re.sub(r'!\[([^\]]*)\]\([^\)]+\)', r'\1', text)
-    
-    # Remove bold/italic (**text** or __text__ or *text* or _text_)
-    text = re.sub(r'\*\*([^\*]+)\*\*', r'\1', text)
-    text = re.sub(r'__([^_]+)__', r'\1', text)
-    text = re.sub(r'\*([^\*]+)\*', r'\1', text)
-    text = re.sub(r'_([^_]+)_', r'\1', text)
-    
-    # Remove headers (# Header)
-    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
-    
-    # Remove horizontal rules (---, ***, ___)
-    text = re.sub(r'^[\-\*_]{3,}$', '', text, flags=re.MULTILINE)
-    
-    # Remove blockquotes (> quote)
-    text = re.sub(r'^>\s+', '', text, flags=re.MULTILINE)
-    
-    # Clean up multiple spaces and newlines
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    
-    return text.strip()
+    if len(text) <= _MEMO_MAX_CHARS:
+        return _strip_memo(text)
+    return _strip(text)
 
 
 def format_issue_with_reason_for_csv(issue: dict) -> str:
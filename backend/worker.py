@@ -0,0 +1,181 @@
+"""
+Analysis job worker.
+
+Claims jobs from the MongoDB queue (crud/jobs.py), runs them and keeps their
+leases alive with heartbeats. Run it as its own process to scale analysis
+independently of the API:
+
+    python -m worker
+
+With EMBEDDED_WORKER=true (the default) the API process also runs a worker
+from its lifespan hook, so a single `uvicorn main:app` still processes runs.
+"""
+
+from config import settings
+from crud.jobs import (
+    claim_job, heartbeat_job, complete_job, fail_job, release_job, reap_abandoned_jobs
+)
+from services.pipeline import process_analysis, mark_run_failed
+from utils.telemetry import configure_logging
+from typing import Optional
+import asyncio
+import logging
+import os
+import signal
+import socket
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+async def run_analysis_job(job: dict) -> None:
+    payload = job["payload"]
+    await process_analysis(
+        str(job["run_id"]),
+        str(job["user_id"]),
+        payload["urls"],
+        payload["domain_context"],
+        payload.get("force_refresh", False),
+        payload.get("offset", 0)
+    )
+
+
+JOB_HANDLERS = {
+    "analysis": run_analysis_job
+}
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+async def _keep_lease(job: dict, worker_id: str) -> None:
+    """Heartbeat until cancelled; returns if the lease is lost"""
+    while True:
+        await asyncio.sleep(settings.job_heartbeat_seconds)
+        try:
+            if not await heartbeat_job(job["_id"], worker_id):
+                logger.warning("Lost lease on job %s", job["_id"])
+                return
+        except Exception as e:
+            logger.warning("Heartbeat failed for job %s: %s", job["_id"], str(e))
+
+
+async def _cancel_work(work: asyncio.Task) -> None:
+    """Cancel the handler and wait until it has finished unwinding"""
+    work.cancel()
+    try:
+        await work
+    except asyncio.CancelledError:
+        # Only the handler's cancellation is ours to swallow
+        if asyncio.current_task().cancelling():
+            raise
+    except Exception as e:
+        logger.warning("Job handler failed while cancelling: %s: %s", type(e).__name__, str(e))
+
+
+async def execute_job(job: dict, worker_id: str) -> None:
+    """Run one claimed job, then complete, retry or fail it"""
+    handler = JOB_HANDLERS.get(job["type"])
+    logger.info("Running %s job %s (attempt %d)", job["type"], job["_id"], job["attempts"])
+
+    work = asyncio.create_task(handler(job)) if handler else None
+    lease = asyncio.create_task(_keep_lease(job, worker_id))
+    try:
+        if work is None:
+            raise ValueError(f"Unknown job type: {job['type']}")
+
+        done, _ = await asyncio.wait({work, lease}, return_when=asyncio.FIRST_COMPLETED)
+        if work not in done:
+            # Another worker owns the job now; stop duplicating its work, and
+            # keep the slot until this shard has stopped writing results
+            await _cancel_work(work)
+            return
+
+        work.result()
+        await complete_job(job["_id"], worker_id)
+        logger.info("Completed job %s", job["_id"])
+    except asyncio.CancelledError:
+        if work is not None:
+            work.cancel()
+        # Shutting down: hand the job back without using up an attempt
+        await asyncio.shield(release_job(job["_id"], worker_id))
+        raise
+    except Exception as e:
+        logger.error("Job %s failed: %s: %s", job["_id"], type(e).__name__, str(e))
+        if await fail_job(job, worker_id, f"{type(e).__name__}: {str(e)}"):
+            await mark_run_failed(str(job["run_id"]))
+    finally:
+        lease.cancel()
+
+
+async def run_worker(stop: asyncio.Event, concurrency: Optional[int] = None) -> None:
+    """
+    Claim and run jobs until stop is set, at most `concurrency` at a time.
+    Jobs still running at shutdown are cancelled and handed back to the queue.
+    """
+    worker_id = new_worker_id()
+    slots = asyncio.Semaphore(concurrency or settings.worker_concurrency)
+    running = set()
+    logger.info("Worker %s started", worker_id)
+
+    while not stop.is_set():
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=settings.job_poll_interval)
+        except asyncio.TimeoutError:
+            continue
+
+        try:
+            job = await claim_job(worker_id)
+        except Exception as e:
+            logger.error("Failed to claim job: %s", str(e))
+            job = None
+
+        if job is None:
+            slots.release()
+            try:
+                for reaped in await reap_abandoned_jobs():
+                    await mark_run_failed(str(reaped["run_id"]))
+            except Exception as e:
+                logger.error("Failed to reap jobs: %s", str(e))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.job_poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        task = asyncio.create_task(execute_job(job, worker_id))
+        running.add(task)
+        task.add_done_callback(running.discard)
+        task.add_done_callback(lambda _: slots.release())
+
+    for task in running:
+        task.cancel()
+    await asyncio.gather(*running, return_exceptions=True)
+    logger.info("Worker %s stopped", worker_id)
+
+
+async def _main() -> None:
+    from database import connect_to_mongo, close_mongo_connection
+    from indexes import ensure_indexes
+    from services.clients import init_clients, close_clients
+
+    configure_logging()
+    await connect_to_mongo()
+    await ensure_indexes()
+    await init_clients()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await run_worker(stop)
+    finally:
+        await close_clients()
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -81,8 +81,9 @@ export default function AnalyzePage() {
   const loadHistoryRuns = async () => {
     setIsLoadingHistory(true);
     try {
-      const runs = await apiService.getAllAnalysisRuns();
-      setHistoryRuns(runs);
+      // The most recent page of runs is enough to pick a context from
+      const page = await apiService.getAnalysisRunsPage();
+      setHistoryRuns(page.runs);
     } catch (error) {
       console.error('Failed to load history:', error);
     } finally {
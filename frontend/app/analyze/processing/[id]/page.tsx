@@ -2,7 +2,7 @@
 
 import React, { useEffect, useState } from 'react';
 import { useRouter, useParams } from 'next/navigation';
-import { apiService } from '@/lib/api';
+import { apiService, RunProgress } from '@/lib/api';
 import { Loader2, AlertTriangle, CheckCircle2 } from 'lucide-react';
 import { Button } from '@/components/ui/button';
 import { Card, CardContent } from '@/components/ui/card';
@@ -23,6 +23,7 @@ export default function ProcessingPage() {
   const [status, setStatus] = useState<'processing' | 'completed' | 'error'>('processing');
   const [run, setRun] = useState<AnalysisRun | null>(null);
   const [error, setError] = useState<string | null>(null);
+  const [progress, setProgress] = useState<RunProgress | null>(null);
 
   useEffect(() => {
     // Check authentication
@@ -32,17 +33,29 @@ export default function ProcessingPage() {
       return;
     }
 
-    // Poll for status
+    const controller = new AbortController();
+    let interval: ReturnType<typeof setInterval> | undefined;
+    let finished = false;
+
+    // Poll for status (fallback when the event stream is unavailable)
     const pollStatus = async () => {
       try {
-        const currentRun = await apiService.getAnalysisRun(runId);
+        // Progress only: no results needed
+        const currentRun = await apiService.getAnalysisRun(runId, { limit: 0 });
         setRun(currentRun);
+        setProgress({
+          completedCount: currentRun.completedCount ?? 0,
+          urlCount: currentRun.urlCount,
+          totalIssues: currentRun.totalIssues,
+        });
         
         if (currentRun.status === 'completed') {
           setStatus('completed');
+          clearInterval(interval);
         } else if (currentRun.status === 'failed') {
           setStatus('error');
           setError('Analysis failed. Please try again.');
+          clearInterval(interval);
         }
       } catch (err) {
         console.error('Error fetching analysis run:', err);
@@ -51,13 +64,45 @@ export default function ProcessingPage() {
       }
     };
 
-    // Initial fetch
-    pollStatus();
+    const startPolling = () => {
+      pollStatus();
+      interval = setInterval(pollStatus, 2000);
+    };
 
-    // Poll every 2 seconds
-    const interval = setInterval(pollStatus, 2000);
+    // Follow per-URL completions as they stream in
+    apiService
+      .streamAnalysisRun(runId, (event) => {
+        if (event.type === 'progress') {
+          setProgress(event.data);
+        } else if (event.type === 'done') {
+          finished = true;
+          setProgress(event.data);
+          setRun({
+            id: runId,
+            status: event.data.status,
+            urlCount: event.data.urlCount,
+            totalIssues: event.data.totalIssues,
+          });
+          if (event.data.status === 'completed') {
+            setStatus('completed');
+          } else {
+            setStatus('error');
+            setError('Analysis failed. Please try again.');
+          }
+        }
+      }, controller.signal)
+      .then(() => {
+        // Stream closed before the run finished (e.g. by a proxy)
+        if (!finished && !controller.signal.aborted) startPolling();
+      })
+      .catch((err) => {
+        if (controller.signal.aborted) return;
+        console.warn('Progress stream unavailable, falling back to polling:', err);
+        startPolling();
+      });
 
     return () => {
+      controller.abort();
       clearInterval(interval);
     };
   }, [runId, router]);
@@ -84,6 +129,11 @@ export default function ProcessingPage() {
               <p className="text-slate-400">
                 Extracting content, checking against domain context, and identifying stale claims.
               </p>
+              {progress && (
+                <p className="text-slate-500 text-sm mt-2">
+                  {progress.completedCount} of {progress.urlCount} pages analyzed
+                </p>
+              )}
             </div>
           </div>
         )}
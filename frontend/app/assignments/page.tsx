@@ -24,6 +24,8 @@ interface ExtendedIssue {
 
 export default function AssignmentsPage() {
   const [issues, setIssues] = useState<ExtendedIssue[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [filterStatus, setFilterStatus] = useState<'all' | 'in_progress' | 'completed' | 'posted'>('in_progress');
   const [searchTerm, setSearchTerm] = useState('');
   const [isLoading, setIsLoading] = useState(true);
@@ -31,16 +33,22 @@ export default function AssignmentsPage() {
 
   useEffect(() => {
     loadIssues();
-  }, []);
+  }, [filterStatus]);
+
+  // The status filter is applied by the API; further pages are fetched on demand
+  // "All" is every issue that has left 'open', whatever its status
+  const fetchPage = (cursor: string | null) => apiService.getIssuesPage({
+    ...(filterStatus === 'all' ? { excludeStatus: 'open' } : { status: filterStatus }),
+    sort: '-created',
+    cursor,
+  });
 
   const loadIssues = async () => {
     setIsLoading(true);
     try {
-      // Get all issues, then filter client-side
-      const allIssues = await apiService.getAllIssues();
-      // Filter to show only assigned or completed issues (exclude 'open' ones from this view)
-      const trackedIssues = allIssues.filter(i => i.issue.status && i.issue.status !== 'open');
-      setIssues(trackedIssues);
+      const page = await fetchPage(null);
+      setIssues(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       toast.error('Failed to load assignments');
       console.error(error);
@@ -49,6 +57,21 @@ export default function AssignmentsPage() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await fetchPage(nextCursor);
+      setIssues(current => [...current, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      toast.error('Failed to load more assignments');
+      console.error(error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleStatusUpdate = async (runId: string, url: string, issueId: string, newStatus: 'completed' | 'in_progress') => {
     try {
       await apiService.updateIssue(runId, issueId, { status: newStatus });
@@ -76,12 +99,11 @@ export default function AssignmentsPage() {
   };
 
   const filteredIssues = issues.filter(item => {
-    const matchesStatus = filterStatus === 'all' ? true : item.issue.status === filterStatus;
     const matchesSearch = 
       item.pageTitle.toLowerCase().includes(searchTerm.toLowerCase()) || 
       item.issue.assignedTo?.toLowerCase().includes(searchTerm.toLowerCase()) ||
       item.issue.description.toLowerCase().includes(searchTerm.toLowerCase());
-    return matchesStatus && matchesSearch;
+    return matchesSearch;
   });
 
   return (
@@ -264,6 +286,11 @@ export default function AssignmentsPage() {
                   </CardContent>
                 </Card>
               ))}
+              {nextCursor && (
+                <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+                  {isLoadingMore ? 'Loading...' : 'Load more'}
+                </Button>
+              )}
             </div>
           )}
         </TabsContent>
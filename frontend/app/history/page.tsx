@@ -12,7 +12,9 @@ import { toast } from 'react-hot-toast';
 
 export default function HistoryPage() {
   const [runs, setRuns] = useState<AnalysisRun[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   useEffect(() => {
     loadRuns();
@@ -21,8 +23,9 @@ export default function HistoryPage() {
   const loadRuns = async () => {
     setIsLoading(true);
     try {
-      const allRuns = await apiService.getAllAnalysisRuns();
-      setRuns(allRuns);
+      const page = await apiService.getAnalysisRunsPage();
+      setRuns(page.runs);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       toast.error('Failed to load analysis history');
       console.error(error);
@@ -31,13 +34,28 @@ export default function HistoryPage() {
     }
   };
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await apiService.getAnalysisRunsPage({ cursor: nextCursor });
+      setRuns(current => [...current, ...page.runs]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      toast.error('Failed to load more history');
+      console.error(error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const handleDelete = async (id: string, e: React.MouseEvent) => {
     e.preventDefault();
     e.stopPropagation();
     if (confirm('Are you sure you want to delete this analysis run?')) {
       try {
         await apiService.deleteAnalysisRun(id);
-        await loadRuns();
+        setRuns(current => current.filter(run => run.id !== id));
         toast.success('Analysis deleted');
       } catch (error) {
         toast.error('Failed to delete analysis');
@@ -140,6 +158,11 @@ export default function HistoryPage() {
               </Card>
             </Link>
           ))}
+          {nextCursor && (
+            <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+              {isLoadingMore ? 'Loading...' : 'Load more'}
+            </Button>
+          )}
         </div>
       )}
     </div>
@@ -6,7 +6,7 @@ import { Button } from '@/components/ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import { ArrowRight, Clock, FileText, ShieldCheck, Zap } from 'lucide-react';
-import { apiService, AnalysisRun, Writer, Issue } from '@/lib/api';
+import { apiService, AnalysisRun, Writer, Issue, IssueSummary, RunSummary } from '@/lib/api';
 import { formatDistanceToNow } from 'date-fns';
 import { IssueTriageStatus } from '@/components/dashboard/issue-triage-status';
 import { TeamWorkload } from '@/components/dashboard/team-workload';
@@ -16,7 +16,9 @@ import { RecentResearchPulse } from '@/components/dashboard/recent-research-puls
 export default function HomePage() {
   const [isLoggedIn, setIsLoggedIn] = useState(false);
   const [recentRuns, setRecentRuns] = useState<AnalysisRun[]>([]);
-  const [allIssues, setAllIssues] = useState<Array<{ runId: string; url: string; pageTitle: string; issue: Issue }>>([]);
+  const [runSummary, setRunSummary] = useState<RunSummary | null>(null);
+  const [recentIssues, setRecentIssues] = useState<Array<{ runId: string; url: string; pageTitle: string; issue: Issue }>>([]);
+  const [issueSummary, setIssueSummary] = useState<IssueSummary | null>(null);
   const [writers, setWriters] = useState<Writer[]>([]);
   const [loading, setLoading] = useState(true);
   const [mounted, setMounted] = useState(false);
@@ -34,14 +36,19 @@ export default function HomePage() {
         setIsLoggedIn(true);
         try {
           // Fetch all data in parallel
-          const [runs, issues, writersList] = await Promise.all([
-            apiService.getAllAnalysisRuns(),
-            apiService.getAllIssues(),
+          // Counts come from the summary endpoints; only the newest runs and issues are loaded
+          const [runPage, runTotals, summary, issuePage, writersList] = await Promise.all([
+            apiService.getAnalysisRunsPage({ limit: 3 }),
+            apiService.getRunSummary(),
+            apiService.getIssueSummary(),
+            apiService.getIssuesPage({ sort: '-created' }),
             apiService.getWriters().catch(() => []), // Don't fail if writers endpoint fails
           ]);
           
-          setRecentRuns(runs);
-          setAllIssues(issues);
+          setRecentRuns(runPage.runs);
+          setRunSummary(runTotals);
+          setIssueSummary(summary);
+          setRecentIssues(issuePage.items);
           setWriters(writersList);
         } catch (error) {
           console.error('Error loading dashboard data:', error);
@@ -66,17 +73,17 @@ export default function HomePage() {
   if (isLoggedIn) {
     // Calculate issue statistics
     const issueStats = {
-      unassigned: allIssues.filter(i => !i.issue.assignedTo && i.issue.status !== 'resolved').length,
-      assigned: allIssues.filter(i => i.issue.assignedTo && i.issue.status !== 'resolved' && !i.issue.suggestedSources?.length).length,
-      researched: allIssues.filter(i => i.issue.suggestedSources && i.issue.suggestedSources.length > 0 && i.issue.status !== 'resolved').length,
-      resolved: allIssues.filter(i => i.issue.status === 'resolved').length,
-      total: allIssues.length,
+      unassigned: issueSummary?.unassigned ?? 0,
+      assigned: issueSummary?.assigned ?? 0,
+      researched: issueSummary?.researched ?? 0,
+      resolved: issueSummary?.resolved ?? 0,
+      total: issueSummary?.total ?? 0,
     };
 
     // Calculate writer workload
     const writerWorkload = writers.map(writer => {
-      const activeTasks = allIssues.filter(i => i.issue.assignedTo === writer.name && i.issue.status !== 'resolved').length;
-      const completedTasks = allIssues.filter(i => i.issue.assignedTo === writer.name && i.issue.status === 'resolved').length;
+      const activeTasks = issueSummary?.writers[writer.name]?.active ?? 0;
+      const completedTasks = issueSummary?.writers[writer.name]?.completed ?? 0;
       return {
         ...writer,
         activeTasks,
@@ -84,8 +91,8 @@ export default function HomePage() {
       };
     });
 
-    // Get researched issues for Recent Research Pulse
-    const researchedIssues = allIssues
+    // Get researched issues (from the newest page) for Recent Research Pulse
+    const researchedIssues = recentIssues
       .filter(i => i.issue.suggestedSources && i.issue.suggestedSources.length > 0)
       .map(i => ({
         runId: i.runId,
@@ -129,7 +136,7 @@ export default function HomePage() {
                   <CardTitle className="text-sm font-medium text-slate-400">Total Analyses</CardTitle>
                 </CardHeader>
                 <CardContent>
-                  <div className="text-3xl font-bold text-white">{recentRuns.length}</div>
+                  <div className="text-3xl font-bold text-white">{runSummary?.runCount ?? 0}</div>
                 </CardContent>
               </Card>
               <Card className="bg-gradient-to-br from-slate-900 to-slate-800 border-white/5">
@@ -138,7 +145,7 @@ export default function HomePage() {
                 </CardHeader>
                 <CardContent>
                   <div className="text-3xl font-bold text-white">
-                    {recentRuns.reduce((acc, run) => acc + run.urlCount, 0)}
+                    {runSummary?.urlCount ?? 0}
                   </div>
                 </CardContent>
               </Card>
@@ -148,7 +155,7 @@ export default function HomePage() {
                 </CardHeader>
                 <CardContent>
                   <div className="text-3xl font-bold text-emerald-400">
-                    {recentRuns.reduce((acc, run) => acc + run.totalIssues, 0)}
+                    {runSummary?.totalIssues ?? 0}
                   </div>
                 </CardContent>
               </Card>
@@ -36,6 +36,7 @@ export default function ResultsPage() {
   const [filterText, setFilterText] = useState('');
   const [sortConfig, setSortConfig] = useState<{ key: 'issueCount' | 'url', direction: 'asc' | 'desc' }>({ key: 'issueCount', direction: 'desc' });
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   
   // Research drawer state
   const [researchDrawerOpen, setResearchDrawerOpen] = useState(false);
@@ -59,6 +60,25 @@ export default function ResultsPage() {
     loadRun();
   }, [runId, router]);
 
+  // Results are loaded a page at a time; append the next page to the table
+  const loadMoreResults = async () => {
+    if (!run?.nextOffset) return;
+    setIsLoadingMore(true);
+    try {
+      const page = await apiService.getAnalysisRun(runId, { offset: run.nextOffset });
+      setRun(current => current && {
+        ...current,
+        results: [...current.results, ...page.results],
+        nextOffset: page.nextOffset,
+      });
+    } catch (error) {
+      toast.error('Failed to load more results');
+      console.error(error);
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const toggleRow = (url: string) => {
     const newExpanded = new Set(expandedRows);
     if (newExpanded.has(url)) {
@@ -131,9 +151,16 @@ export default function ResultsPage() {
     try {
       await apiService.saveIssueSources(runId, currentIssue.id, selectedSources);
       
-      // Refresh run data to show updated sources
-      const updatedRun = await apiService.getAnalysisRun(runId);
-      setRun(updatedRun);
+      // Show the attached sources without reloading every loaded page of results
+      setRun(current => current && {
+        ...current,
+        results: current.results.map(result => ({
+          ...result,
+          issues: result.issues.map(issue =>
+            issue.id === currentIssue.id ? { ...issue, suggestedSources: selectedSources } : issue
+          ),
+        })),
+      });
       
       toast.success(`Attached ${selectedSources.length} source${selectedSources.length !== 1 ? 's' : ''}`);
     } catch (error) {
@@ -232,6 +259,14 @@ export default function ResultsPage() {
                 <div className="col-span-2 md:col-span-2 text-center">
                   {result.status === 'failed' ? (
                     <Badge variant="destructive">Failed</Badge>
+                  ) : result.status === 'partial' ? (
+                    <Badge
+                      variant="outline"
+                      className="border-amber-500/30 text-amber-400 bg-amber-500/10"
+                      title={`${result.failedChunks} section(s) could not be analyzed`}
+                    >
+                      Partially Analyzed
+                    </Badge>
                   ) : (
                     <Badge variant="outline" className="border-emerald-500/30 text-emerald-400 bg-emerald-500/10">
                       Analyzed
@@ -329,6 +364,14 @@ export default function ResultsPage() {
         </div>
       </div>
 
+      {run.nextOffset && (
+        <div className="flex justify-center">
+          <Button variant="outline" onClick={loadMoreResults} disabled={isLoadingMore}>
+            {isLoadingMore ? 'Loading...' : `Load more results (${run.results.length} of ${run.urlCount})`}
+          </Button>
+        </div>
+      )}
+
       {/* Research Drawer */}
       <ResearchDrawer
         open={researchDrawerOpen}
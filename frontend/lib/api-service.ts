@@ -134,8 +134,9 @@ export const analysisAPI = {
     return response.json();
   },
   
-  listAnalysisRuns: async () => {
-    const response = await authFetch(`${API_URL}/analysis/runs`);
+  listAnalysisRuns: async (cursor?: string) => {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await authFetch(`${API_URL}/analysis/runs${query}`);
     
     if (!response.ok) {
       throw new Error('Failed to list analysis runs');
@@ -46,7 +46,8 @@ export interface Issue {
 export interface DetectionResult {
   url: string;
   title: string;
-  status: 'success' | 'failed';
+  status: 'success' | 'partial' | 'failed';
+  failedChunks?: number;
   issues: Issue[];
   issueCount: number;
 }
@@ -60,14 +61,42 @@ export interface AnalysisRun {
   status: 'processing' | 'completed' | 'failed';
   domainContext: DomainContext;
   results: DetectionResult[];
+  completedCount?: number;
+  nextOffset?: number | null; // Offset of the next page of results, if any
 }
 
+export interface RunProgress {
+  completedCount: number;
+  urlCount: number;
+  totalIssues: number;
+}
+
+export type RunEvent =
+  | { type: 'result'; data: { position: number; url: string; status: string; issueCount: number } }
+  | { type: 'progress'; data: RunProgress }
+  | { type: 'done'; data: RunProgress & { status: string } };
+
 export interface Writer {
   id: string;
   name: string;
   email: string;
 }
 
+export interface RunSummary {
+  runCount: number;
+  urlCount: number;
+  totalIssues: number;
+}
+
+export interface IssueSummary {
+  unassigned: number;
+  assigned: number;
+  researched: number;
+  resolved: number;
+  total: number;
+  writers: Record<string, { active: number; completed: number }>;
+}
+
 // Helper function to get auth token
 function getAuthToken(): string | null {
   if (typeof window === 'undefined') return null;
@@ -255,13 +284,68 @@ class ApiService {
     };
   }
 
-  async getAnalysisRun(runId: string): Promise<AnalysisRun> {
+  // Stream run progress as server-sent events until the run finishes.
+  // Uses fetch rather than EventSource so the bearer token can be sent.
+  async streamAnalysisRun(
+    runId: string,
+    onEvent: (event: RunEvent) => void,
+    signal?: AbortSignal
+  ): Promise<void> {
+    const token = getAuthToken();
+    const response = await fetch(`${API_BASE_URL}/analysis/runs/${runId}/events`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+      signal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to stream analysis progress (status ${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const block = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        let type = 'message';
+        let data = '';
+        for (const line of block.split('\n')) {
+          if (line.startsWith('event: ')) type = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        if (data) {
+          onEvent({ type, data: JSON.parse(data) } as RunEvent);
+        }
+      }
+    }
+  }
+
+  async getAnalysisRun(runId: string, options: {
+    offset?: number;
+    limit?: number;
+  } = {}): Promise<AnalysisRun> {
+    // Results come a page at a time; limit 0 fetches the run without results
+    const params = new URLSearchParams();
+    if (options.offset) params.set('offset', String(options.offset));
+    if (options.limit !== undefined) params.set('limit', String(options.limit));
+    const query = params.toString();
     const response = await apiCall<{
       id: string;
       userId: string;
       timestamp: string;
       urlCount: number;
+      completedCount?: number;
       totalIssues: number;
+      nextOffset?: number | null;
       status: string;
       domainContext: {
         description: string;
@@ -272,6 +356,7 @@ class ApiService {
         url: string;
         title: string;
         status: string;
+        failedChunks?: number;
         issueCount: number;
         issues: Array<{
           id: string;
@@ -287,7 +372,7 @@ class ApiService {
           dueDate?: string;
         }>;
       }>;
-    }>(`/analysis/runs/${runId}`);
+    }>(query ? `/analysis/runs/${runId}?${query}` : `/analysis/runs/${runId}`);
 
     // Convert to AnalysisRun format
     return {
@@ -295,7 +380,9 @@ class ApiService {
       userId: response.userId,
       timestamp: new Date(response.timestamp).getTime(),
       urlCount: response.urlCount,
+      completedCount: response.completedCount,
       totalIssues: response.totalIssues,
+      nextOffset: response.nextOffset ?? null,
       status: response.status as 'processing' | 'completed' | 'failed',
       domainContext: {
         description: response.domainContext.description,
@@ -305,7 +392,8 @@ class ApiService {
       results: response.results.map((result) => ({
         url: result.url,
         title: result.title,
-        status: result.status as 'success' | 'failed',
+        status: result.status as 'success' | 'partial' | 'failed',
+        failedChunks: result.failedChunks ?? 0,
         issueCount: result.issueCount,
         issues: result.issues.map((issue) => ({
           id: issue.id,
@@ -324,8 +412,12 @@ class ApiService {
     };
   }
 
-  async getAllAnalysisRuns(): Promise<AnalysisRun[]> {
-    const response = await apiCall<{
+  async getAnalysisRunsPage(options: {
+    cursor?: string | null;
+    limit?: number;
+  } = {}): Promise<{ runs: AnalysisRun[]; nextCursor: string | null }> {
+    type RunPage = {
+      nextCursor?: string | null;
       runs: Array<{
         id: string;
         timestamp: string;
@@ -336,23 +428,37 @@ class ApiService {
           description: string;
         };
       }>;
-    }>('/analysis/runs');
+    };
+
+    // One page per call, newest first; pass nextCursor back in to load the following page
+    const params = new URLSearchParams();
+    if (options.cursor) params.set('cursor', options.cursor);
+    if (options.limit) params.set('limit', String(options.limit));
+    const query = params.toString();
+    const page = await apiCall<RunPage>(query ? `/analysis/runs?${query}` : '/analysis/runs');
 
     // For list view, we need minimal data. If full data needed, fetch individually
-    return response.runs.map((run) => ({
-      id: run.id,
-      userId: '', // Not included in list
-      timestamp: new Date(run.timestamp).getTime(),
-      urlCount: run.urlCount,
-      totalIssues: run.totalIssues,
-      status: run.status as 'processing' | 'completed' | 'failed',
-      domainContext: {
-        description: run.domainContext.description,
-        entityTypes: '',
-        stalenessRules: '',
-      },
-      results: [],
-    }));
+    return {
+      nextCursor: page.nextCursor ?? null,
+      runs: page.runs.map((run) => ({
+        id: run.id,
+        userId: '', // Not included in list
+        timestamp: new Date(run.timestamp).getTime(),
+        urlCount: run.urlCount,
+        totalIssues: run.totalIssues,
+        status: run.status as 'processing' | 'completed' | 'failed',
+        domainContext: {
+          description: run.domainContext.description,
+          entityTypes: '',
+          stalenessRules: '',
+        },
+        results: [],
+      })),
+    };
+  }
+
+  async getRunSummary(): Promise<RunSummary> {
+    return apiCall<RunSummary>('/analysis/runs/summary');
   }
 
   async deleteAnalysisRun(runId: string): Promise<void> {
@@ -416,14 +522,23 @@ class ApiService {
     };
   }
 
-  async getAllIssues(status?: string): Promise<Array<{
-    runId: string;
-    url: string;
-    pageTitle: string;
-    issue: Issue;
-  }>> {
-    const endpoint = status ? `/analysis/issues?status=${status}` : '/analysis/issues';
-    const response = await apiCall<{
+  async getIssuesPage(options: {
+    status?: string;
+    excludeStatus?: string;
+    sort?: string;
+    cursor?: string | null;
+    limit?: number;
+  } = {}): Promise<{
+    items: Array<{
+      runId: string;
+      url: string;
+      pageTitle: string;
+      issue: Issue;
+    }>;
+    nextCursor: string | null;
+  }> {
+    type IssuePage = {
+      nextCursor?: string | null;
       issues: Array<{
         runId: string;
         url: string;
@@ -440,28 +555,47 @@ class ApiService {
           completedAt?: string;
           googleDocUrl?: string;
           dueDate?: string;
+          suggestedSources?: Issue['suggestedSources'];
         };
       }>;
-    }>(endpoint);
-
-    return response.issues.map((item) => ({
-      runId: item.runId,
-      url: item.url,
-      pageTitle: item.pageTitle,
-      issue: {
-        id: item.issue.id,
-        description: item.issue.description,
-        flaggedText: item.issue.flaggedText,
-        contextExcerpt: item.issue.contextExcerpt,
-        reasoning: item.issue.reasoning,
-        status: item.issue.status,
-        assignedTo: item.issue.assignedTo,
-        assignedAt: item.issue.assignedAt ? new Date(item.issue.assignedAt).getTime() : undefined,
-        completedAt: item.issue.completedAt ? new Date(item.issue.completedAt).getTime() : undefined,
-        googleDocUrl: item.issue.googleDocUrl,
-        dueDate: item.issue.dueDate ? new Date(item.issue.dueDate).getTime() : undefined,
-      },
-    }));
+    };
+
+    // One page per call; pass nextCursor back in to load the following page
+    const params = new URLSearchParams();
+    if (options.status) params.set('status', options.status);
+    if (options.excludeStatus) params.set('excludeStatus', options.excludeStatus);
+    if (options.sort) params.set('sort', options.sort);
+    if (options.cursor) params.set('cursor', options.cursor);
+    if (options.limit) params.set('limit', String(options.limit));
+    const query = params.toString();
+    const page = await apiCall<IssuePage>(query ? `/analysis/issues?${query}` : '/analysis/issues');
+
+    return {
+      nextCursor: page.nextCursor ?? null,
+      items: page.issues.map((item) => ({
+        runId: item.runId,
+        url: item.url,
+        pageTitle: item.pageTitle,
+        issue: {
+          id: item.issue.id,
+          description: item.issue.description,
+          flaggedText: item.issue.flaggedText,
+          contextExcerpt: item.issue.contextExcerpt,
+          reasoning: item.issue.reasoning,
+          status: item.issue.status,
+          assignedTo: item.issue.assignedTo,
+          assignedAt: item.issue.assignedAt ? new Date(item.issue.assignedAt).getTime() : undefined,
+          completedAt: item.issue.completedAt ? new Date(item.issue.completedAt).getTime() : undefined,
+          googleDocUrl: item.issue.googleDocUrl,
+          dueDate: item.issue.dueDate ? new Date(item.issue.dueDate).getTime() : undefined,
+          suggestedSources: item.issue.suggestedSources,
+        },
+      })),
+    };
+  }
+
+  async getIssueSummary(): Promise<IssueSummary> {
+    return apiCall<IssueSummary>('/analysis/issues/summary');
   }
 
   async createManualTask(data: {